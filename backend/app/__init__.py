@@ -1,7 +1,8 @@
 import os
 from flask import Flask, jsonify
 from .core.config import Config
-from .core.database import db, cors, init_database
+from .core.database import db, cors, create_schema, init_database
+from .core.metrics import init_metrics
 
 def create_app(config_class=Config):
     """Uygulamayı oluşturan ana fabrika fonksiyonu."""
@@ -20,6 +21,9 @@ def create_app(config_class=Config):
     # Initialize database and extensions
     init_database(app)
 
+    # Request zamanlama middleware'i ve /metrics endpoint'i
+    init_metrics(app)
+
     # Instance folder'ın var olduğundan emin ol
     try:
         os.makedirs(app.instance_path)
@@ -31,19 +35,24 @@ def create_app(config_class=Config):
         from .modules.user import models as user_models
         from .modules.comment import models as comment_models
         from .modules.ads import models as ads_models
+        from .modules.jobs import models as job_models
+        from .shared import models as shared_models
         
         # Import routes from modules
         from .modules.comment.routes import comment_routes
         from .modules.admin.routes import admin_routes
         from .modules.public.routes import public_routes
+        from .modules.jobs.routes import job_routes
         
-        # Create database tables
-        db.create_all()
+        # Eksik tabloları oluştur (production'da run_migration.py yapar, bkz. AUTO_CREATE_SCHEMA)
+        if app.config.get('AUTO_CREATE_SCHEMA', True):
+            create_schema(app)
 
         # Register blueprint routes
         app.register_blueprint(comment_routes)
         app.register_blueprint(admin_routes)
         app.register_blueprint(public_routes)
+        app.register_blueprint(job_routes)
 
         # --- MERKEZİ HATA YÖNETİCİSİ ---
         @app.errorhandler(Exception)
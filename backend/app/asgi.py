@@ -0,0 +1,132 @@
+"""
+ASGI application factory - async serving mode next to create_app().
+
+/api/generate_comment, /api/post_comment and /api/history are served by Starlette with
+non-blocking YouTube (httpx) and Gemini (generate_content_async) calls; every other route
+falls through to the regular Flask app mounted with a2wsgi.
+
+Run with: uvicorn asgi:app --host 0.0.0.0 --port $PORT (backend klasöründen)
+"""
+from contextlib import asynccontextmanager
+
+import anyio
+import httpx
+from a2wsgi import WSGIMiddleware
+from flask import session
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount
+from werkzeug.test import EnvironBuilder
+
+from . import create_app
+from .core.config import Config, db_pool_sizes
+from .integrations.youtube.async_service import AsyncYouTubeClient
+from .modules.comment.async_routes import routes as comment_async_routes
+
+
+class FlaskBridge:
+    """Runs Flask-bound code (validation, sessions, SQLAlchemy) in worker threads for async routes"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _environ(self, request: Request, body: bytes):
+        return EnvironBuilder(
+            path=request.url.path,
+            query_string=request.url.query,
+            method=request.method,
+            headers=list(request.headers.items()),
+            data=body,
+            environ_base={'REMOTE_ADDR': request.client.host if request.client else None}
+        ).get_environ()
+
+    def _call(self, environ, fn):
+        with self.app.request_context(environ):
+            result = fn()
+            # Yeni oluşturulan Flask session'ı (user_session_id) cookie olarak yanıta taşınır
+            cookie_response = self.app.response_class()
+            self.app.session_interface.save_session(self.app, session._get_current_object(), cookie_response)
+            return result, cookie_response.headers.getlist('Set-Cookie')
+
+    async def run(self, request: Request, fn):
+        """fn'i isteğin Flask request context'inde çalıştırır: (result, set_cookie_headers)"""
+        environ = self._environ(request, await request.body())
+        return await anyio.to_thread.run_sync(self._call, environ, fn)
+
+    async def offload(self, fn, *args, **kwargs):
+        """fn'i sadece app context ile (request olmadan) bir thread'de çalıştırır"""
+        def call():
+            with self.app.app_context():
+                return fn(*args, **kwargs)
+        return await anyio.to_thread.run_sync(call)
+
+    async def call_view(self, request: Request, view):
+        """Bir Flask view'ini olduğu gibi çalıştırıp Starlette response'a çevirir"""
+        def call():
+            return self.app.make_response(view())
+        flask_response, cookies = await self.run(request, call)
+        return self.to_response(flask_response, cookies)
+
+    def to_response(self, flask_response, cookies=()):
+        response = Response(flask_response.get_data(), status_code=flask_response.status_code)
+        for name, value in flask_response.headers.items():
+            if name.lower() not in ('content-length', 'set-cookie'):
+                response.headers.append(name, value)
+        for cookie in list(flask_response.headers.getlist('Set-Cookie')) + list(cookies):
+            response.headers.append('set-cookie', cookie)
+        return response
+
+    def json(self, payload, status_code=200, cookies=()):
+        response = JSONResponse(payload, status_code=status_code)
+        for cookie in cookies:
+            response.headers.append('set-cookie', cookie)
+        return response
+
+
+def asgi_config(config_class):
+    """
+    config_class with the DB pool sized for ASGI serving: every anyio worker thread (FlaskBridge)
+    and every a2wsgi worker can hold a db.session at the same time.
+    Returns (config, anyio_threads); anyio_threads is lowered if DB_MAX_CONNECTIONS leaves fewer connections.
+    """
+    request_threads = config_class.ASGI_THREADS + config_class.ASGI_WSGI_WORKERS
+    pool_size, max_overflow = db_pool_sizes(
+        request_threads, config_class.ENRICHMENT_MAX_WORKERS + config_class.ENRICHMENT_SUMMARY_WORKERS,
+        config_class.DB_MAX_CONNECTIONS, config_class.WEB_CONCURRENCY
+    )
+    anyio_threads = config_class.ASGI_THREADS
+    available = pool_size + max_overflow - config_class.ASGI_WSGI_WORKERS
+    if available < anyio_threads:
+        anyio_threads = max(1, available)
+        print(f"ASGI_THREADS lowered to {anyio_threads}: DB pool allows {pool_size + max_overflow} connections per worker")
+    config = type(config_class.__name__, (config_class,), {
+        'DB_POOL_SIZE': pool_size,
+        'DB_MAX_OVERFLOW': max_overflow,
+        'DB_POOL_WARM': min(config_class.DB_POOL_WARM, pool_size),
+    })
+    return config, anyio_threads
+
+
+def create_asgi_app(config_class=Config):
+    """Flask uygulamasını oluşturur ve async route'larla birlikte Starlette altında sunar."""
+    config, anyio_threads = asgi_config(config_class)
+    flask_app = create_app(config)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        # FlaskBridge thread'leri havuzun karşılayabileceği sayıyla sınırlı (varsayılan anyio limiti 40)
+        anyio.to_thread.current_default_thread_limiter().total_tokens = anyio_threads
+        # Tüm istekler tek bağlantı havuzunu paylaşır
+        async with httpx.AsyncClient(timeout=httpx.Timeout(Config.ENRICHMENT_CALL_TIMEOUT)) as http:
+            app.state.youtube = AsyncYouTubeClient(http, flask_app)
+            yield
+
+    app = Starlette(
+        routes=comment_async_routes + [
+            Mount('/', app=WSGIMiddleware(flask_app, workers=config.ASGI_WSGI_WORKERS))
+        ],
+        lifespan=lifespan
+    )
+    app.state.bridge = FlaskBridge(flask_app)
+    return app
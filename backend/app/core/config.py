@@ -6,6 +6,23 @@ load_dotenv(dotenv_path)
 
 basedir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
 
+
+def db_pool_sizes(request_threads, enrichment_workers, max_connections=0, workers=1):
+    """
+    (pool_size, max_overflow) for one worker process. Every request thread holds a connection and
+    enrichment threads use their own for the SQL cache/transcripts; overflow covers nested sessions.
+    DB_POOL_SIZE / DB_MAX_OVERFLOW from the environment win; max_connections caps all workers together.
+    """
+    pool_size = int(os.getenv('DB_POOL_SIZE', str(request_threads + enrichment_workers)))
+    max_overflow = int(os.getenv('DB_MAX_OVERFLOW', str(request_threads)))
+    if max_connections:
+        # Tüm worker'ların havuzları toplam limiti aşmasın
+        per_worker = max(1, max_connections // workers)
+        pool_size = min(pool_size, per_worker)
+        max_overflow = max(0, min(max_overflow, per_worker - pool_size))
+    return pool_size, max_overflow
+
+
 class Config:
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
     YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')
@@ -45,6 +62,8 @@ class Config:
         SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(basedir, 'instance', 'app.db')
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Worker açılışında create_all; production'da false + deploy başına `python run_migration.py`
+    AUTO_CREATE_SCHEMA = os.getenv('AUTO_CREATE_SCHEMA', 'true').lower() == 'true'
     
     # --- SESSION AYARLARI ---
     SESSION_COOKIE_SECURE = os.getenv('FLASK_ENV') == 'production'
@@ -53,6 +72,113 @@ class Config:
     SESSION_PERMANENT = False
     PERMANENT_SESSION_LIFETIME = 3600  # 1 saat (saniye cinsinden)
     
+    # --- ENRICHMENT (YouTube/Gemini paralel çağrılar) ---
+    ENRICHMENT_MAX_WORKERS = int(os.getenv('ENRICHMENT_MAX_WORKERS', '8'))
+    ENRICHMENT_CALL_TIMEOUT = float(os.getenv('ENRICHMENT_CALL_TIMEOUT', '10'))  # YouTube çağrıları (saniye)
+    ENRICHMENT_SUMMARY_TIMEOUT = float(os.getenv('ENRICHMENT_SUMMARY_TIMEOUT', '20'))  # Gemini özeti (saniye)
+    ENRICHMENT_SUMMARY_WORKERS = int(os.getenv('ENRICHMENT_SUMMARY_WORKERS', '4'))  # Özetler için ayrı havuz (bölümleri bekler)
+    ENRICHMENT_QUEUE_TIMEOUT = float(os.getenv('ENRICHMENT_QUEUE_TIMEOUT', '5'))  # Havuz doluyken başlamak için bekleme (saniye)
+    
+    # --- YOUTUBE QUOTA BÜTÇESİ ---
+    YOUTUBE_DAILY_QUOTA = int(os.getenv('YOUTUBE_DAILY_QUOTA', '10000'))  # Günlük birim (Pasifik saatiyle sıfırlanır)
+    YOUTUBE_QUOTA_OPTIONAL_RESERVE = int(os.getenv('YOUTUBE_QUOTA_OPTIONAL_RESERVE', '2000'))  # Altında isteğe bağlı çağrılar atlanır
+    YOUTUBE_QUOTA_REFRESH_INTERVAL = float(os.getenv('YOUTUBE_QUOTA_REFRESH_INTERVAL', '15'))  # DB'den yeniden okuma (saniye)
+    YOUTUBE_QUOTA_FLUSH_INTERVAL = float(os.getenv('YOUTUBE_QUOTA_FLUSH_INTERVAL', '5'))  # Birikmiş harcamanın yazılma aralığı (saniye)
+    
+    # --- GEMINI RATE LIMITER ---
+    # RPM/TPM API anahtarının toplam kotasıdır; limiter process başına çalıştığı için her process
+    # bunun WEB_CONCURRENCY + JOB_WORKER_PROCESSES'e bölünmüş payını kullanır
+    GEMINI_RPM = int(os.getenv('GEMINI_RPM', '15'))  # Dakikalık istek kotası (tüm process'ler)
+    GEMINI_TPM = int(os.getenv('GEMINI_TPM', '1000000'))  # Dakikalık token kotası (tüm process'ler)
+    GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '8'))  # AIMD üst sınırı
+    GEMINI_MAX_QUEUE = int(os.getenv('GEMINI_MAX_QUEUE', '100'))  # Bunun üzerindeki istekler reddedilir
+    GEMINI_QUEUE_TIMEOUT = float(os.getenv('GEMINI_QUEUE_TIMEOUT', '30'))  # Kuyrukta en fazla bekleme (saniye)
+    GEMINI_MAX_RETRIES = int(os.getenv('GEMINI_MAX_RETRIES', '3'))  # 429/5xx için
+    GEMINI_RETRY_BASE_DELAY = float(os.getenv('GEMINI_RETRY_BASE_DELAY', '1'))  # Backoff tabanı (saniye)
+    
+    # --- GEMINI MODEL / PROMPT ---
+    GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-1.5-flash')
+    # Sabit yorum talimatları için context caching (sürümlü model ve minimum token sınırı gerektirir)
+    GEMINI_CONTEXT_CACHE = os.getenv('GEMINI_CONTEXT_CACHE', 'false').lower() == 'true'
+    GEMINI_CONTEXT_CACHE_MODEL = os.getenv('GEMINI_CONTEXT_CACHE_MODEL', 'models/gemini-1.5-flash-002')
+    GEMINI_CONTEXT_CACHE_TTL = int(os.getenv('GEMINI_CONTEXT_CACHE_TTL', '3600'))  # Saniye
+    GEMINI_CONTEXT_CACHE_MIN_TOKENS = int(os.getenv('GEMINI_CONTEXT_CACHE_MIN_TOKENS', '32768'))  # API'nin cache alt sınırı
+    GEMINI_CONTEXT_CACHE_RETRY = int(os.getenv('GEMINI_CONTEXT_CACHE_RETRY', '600'))  # Başarısız cache denemesinden sonra bekleme (saniye)
+    
+    # --- TRANSCRIPT ÖZETLEME (map-reduce) ---
+    TRANSCRIPT_CHUNK_TOKENS = int(os.getenv('TRANSCRIPT_CHUNK_TOKENS', '2000'))  # Bölüm başına tahmini token
+    TRANSCRIPT_MAX_CHUNKS = int(os.getenv('TRANSCRIPT_MAX_CHUNKS', '16'))  # Aşılırsa bölümler büyütülür
+    TRANSCRIPT_CHUNK_CONCURRENCY = int(os.getenv('TRANSCRIPT_CHUNK_CONCURRENCY', '4'))  # Paralel bölüm özeti üst sınırı
+    # Bir özetin GEMINI_RPM bütçesinden alabileceği pay (reduce çağrısı dahil); daha uzun transcript'ler
+    # istek yolunda değil job kuyruğunda özetlenir
+    TRANSCRIPT_INTERACTIVE_RPM_SHARE = float(os.getenv('TRANSCRIPT_INTERACTIVE_RPM_SHARE', '0.2'))
+    TRANSCRIPT_JOB_RPM_SHARE = float(os.getenv('TRANSCRIPT_JOB_RPM_SHARE', '0.5'))
+    
+    # --- HISTORY SAYFALAMA ---
+    HISTORY_PAGE_SIZE = int(os.getenv('HISTORY_PAGE_SIZE', '50'))
+    HISTORY_MAX_PAGE_SIZE = int(os.getenv('HISTORY_MAX_PAGE_SIZE', '100'))
+
+    # --- ADMIN EXPORT (NDJSON/CSV stream) ---
+    EXPORT_FETCH_SIZE = int(os.getenv('EXPORT_FETCH_SIZE', '1000'))  # Veritabanından tek seferde çekilen satır
+    EXPORT_FLUSH_BYTES = int(os.getenv('EXPORT_FLUSH_BYTES', str(64 * 1024)))  # Yanıta yazılan parça boyutu
+    EXPORT_GZIP_LEVEL = int(os.getenv('EXPORT_GZIP_LEVEL', '6'))
+    
+    # --- TOPLU (BATCH) ÜRETİM ---
+    BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', '500'))
+    BATCH_MAX_CONCURRENCY = int(os.getenv('BATCH_MAX_CONCURRENCY', '8'))  # Paralel Gemini çağrısı üst sınırı
+    
+    # --- BACKGROUND JOB KUYRUĞU ---
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '1'))  # Boş kuyrukta bekleme (saniye)
+    JOB_STALE_AFTER = int(os.getenv('JOB_STALE_AFTER', '600'))  # Bu süredir heartbeat'i gelmeyen 'running' işler yeniden alınır
+    JOB_HEARTBEAT_INTERVAL = float(os.getenv('JOB_HEARTBEAT_INTERVAL', '30'))  # JOB_STALE_AFTER'dan çok küçük olmalı
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+    JOB_WORKER_PROCESSES = int(os.getenv('JOB_WORKER_PROCESSES', '1'))  # worker.py process sayısı (Gemini kota payı için)
+    
+    # --- CACHE (YouTube metadata, kanal istatistikleri, yorumlar) ---
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')  # memory | sql
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '5000'))
+    CACHE_DEFAULT_TTL = int(os.getenv('CACHE_DEFAULT_TTL', '300'))
+    CACHE_TTLS = {
+        'video_meta': int(os.getenv('CACHE_TTL_VIDEO_META', '21600')),  # başlık/açıklama: 6 saat
+        'video_stats': int(os.getenv('CACHE_TTL_VIDEO_STATS', '300')),  # izlenme/beğeni: 5 dakika
+        'channel_stats': int(os.getenv('CACHE_TTL_CHANNEL_STATS', '3600')),  # abone sayısı: 1 saat
+        'video_comments': int(os.getenv('CACHE_TTL_VIDEO_COMMENTS', '900')),  # en iyi yorumlar: 15 dakika
+        'transcript_chunk': int(os.getenv('CACHE_TTL_TRANSCRIPT_CHUNK', '604800')),  # bölüm özetleri: 7 gün
+        'generated_comment': int(os.getenv('CACHE_TTL_GENERATED_COMMENT', '60')),  # aynı (video, dil, stil) yorumu: 1 dakika
+    }
+    
+    # --- KULLANICI OTURUMLARI ---
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', '300'))  # session_id -> user_id önbelleği (saniye)
+    USER_CACHE_MAX_ENTRIES = int(os.getenv('USER_CACHE_MAX_ENTRIES', '10000'))
+    LAST_SEEN_INTERVAL = int(os.getenv('LAST_SEEN_INTERVAL', '300'))  # Kullanıcı başına en fazla bu sıklıkta yazılır
+    LAST_SEEN_FLUSH_INTERVAL = float(os.getenv('LAST_SEEN_FLUSH_INTERVAL', '60'))  # Toplu UPDATE aralığı (saniye)
+    
+    # --- REKLAMLAR ---
+    ADS_SNAPSHOT_MAX_AGE = float(os.getenv('ADS_SNAPSHOT_MAX_AGE', '30'))  # Diğer worker'lar en geç bu sürede yeniler
+    ADS_CACHE_MAX_AGE = int(os.getenv('ADS_CACHE_MAX_AGE', '60'))  # Tarayıcı/CDN Cache-Control max-age (saniye)
+    
+    # --- MESAJ BUNDLE'LARI ---
+    MESSAGES_CACHE_MAX_AGE = int(os.getenv('MESSAGES_CACHE_MAX_AGE', '3600'))  # Katalog yalnızca deploy ile değişir
+    
+    # --- VERİTABANI BAĞLANTI HAVUZU (worker başına) ---
+    WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', '1'))  # gunicorn worker sayısı
+    WEB_THREADS = int(os.getenv('WEB_THREADS', os.getenv('GUNICORN_THREADS', '1')))  # Worker başına istek thread'i
+    # ASGI modunda (asgi.py) istek thread'leri anyio thread havuzu ve a2wsgi worker'larıdır;
+    # create_asgi_app bu limitleri uygular ve havuzu ASGI_THREADS + ASGI_WSGI_WORKERS'a göre boyutlar
+    ASGI_THREADS = int(os.getenv('ASGI_THREADS', '40'))  # anyio to_thread limiti (FlaskBridge.run/offload)
+    ASGI_WSGI_WORKERS = int(os.getenv('ASGI_WSGI_WORKERS', '10'))  # a2wsgi ile sunulan Flask route'ları
+    DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', '0'))  # Sunucunun toplam bağlantı limiti (0 = kontrol yok)
+    DB_POOL_SIZE, DB_MAX_OVERFLOW = db_pool_sizes(
+        WEB_THREADS, ENRICHMENT_MAX_WORKERS + ENRICHMENT_SUMMARY_WORKERS, DB_MAX_CONNECTIONS, WEB_CONCURRENCY
+    )
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))  # Boş bağlantı bekleme süresi (saniye)
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))  # Yönetilen Postgres idle kesmesinden önce yenile
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'  # Checkout'ta kopmuş bağlantıyı ele
+    DB_POOL_WARM = int(os.getenv('DB_POOL_WARM', str(WEB_THREADS)))  # Başlangıçta açılacak bağlantı sayısı
+    
+    # --- METRİKLER ---
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')  # Set edilirse /metrics için Bearer token gerekir
+    
     # --- ADMIN ŞIFRE ---
     ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD')
     
@@ -1,22 +1,128 @@
 """
 Core database configuration and utilities
 """
+import time
+
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+from .metrics import REGISTRY
 
 # Initialize extensions
 db = SQLAlchemy()
 cors = CORS()
 
+# --- BAĞLANTI HAVUZU METRİKLERİ ---
+POOL_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_POOL_CHECKOUT = REGISTRY.histogram(
+    'db_pool_checkout_seconds', 'Time to get a connection from the pool (wait + any new connection setup)',
+    buckets=POOL_BUCKETS)
+DB_POOL_CONNECT = REGISTRY.histogram(
+    'db_pool_connect_seconds', 'Time to open a new database connection', buckets=POOL_BUCKETS)
+DB_POOL_TIMEOUTS = REGISTRY.counter(
+    'db_pool_timeouts_total', 'Checkouts that gave up after DB_POOL_TIMEOUT')
+
+_pools = []  # init_database'de oluşturulan engine havuzları (metrik callback'i için)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records checkout wait, connection setup time and timeouts"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT.observe(time.perf_counter() - start)
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            DB_POOL_CONNECT.observe(time.perf_counter() - start)
+
+
+def _pool_stats():
+    samples = []
+    for pool in _pools:
+        if not isinstance(pool, QueuePool):
+            continue
+        samples.extend([
+            ({'state': 'checked_out'}, pool.checkedout()),
+            ({'state': 'idle'}, pool.checkedin()),
+            # overflow() havuz boyutunun üzerindeki (negatifse henüz açılmamış) bağlantı sayısıdır
+            ({'state': 'overflow'}, max(0, pool.overflow())),
+            ({'state': 'size'}, pool.size()),
+        ])
+    return samples
+
+
+REGISTRY.gauge('db_pool_connections', 'Connection pool state per worker', ('state',), callback=_pool_stats)
+
+
+def build_engine_options(config):
+    """Config'teki DB_* ayarlarından SQLALCHEMY_ENGINE_OPTIONS üretir"""
+    uri = config['SQLALCHEMY_DATABASE_URI']
+    options = {
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+    }
+    if uri.startswith('sqlite') and (':memory:' in uri or uri.rstrip('/') == 'sqlite:'):
+        # In-memory SQLite tek bağlantılı havuz kullanır; boyut ayarları uygulanmaz
+        return options
+    options.update({
+        'poolclass': TimedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        # LIFO: az sayıda sıcak bağlantı kullanılır, fazlası recycle/idle ile kapanır
+        'pool_use_lifo': True,
+    })
+    return options
+
+
+def _warm_pool(engine, count):
+    """İlk isteklerin bağlantı kurma maliyetini başlangıca taşır"""
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(engine.connect())
+    except Exception as e:
+        print(f"Connection pool warm-up stopped: {e}")
+    finally:
+        for connection in connections:
+            connection.close()
+
+
 def init_database(app):
     """Initialize database with the Flask app"""
+    # Açıkça verilmiş SQLALCHEMY_ENGINE_OPTIONS varsa o kullanılır
+    if not app.config.get('SQLALCHEMY_ENGINE_OPTIONS') and 'DB_POOL_SIZE' in app.config:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(app.config)
+
     db.init_app(app)
-    
+
     # CORS configuration
-    cors.init_app(app, 
-                  resources={r"/*": {"origins": "*"}}, 
+    cors.init_app(app,
+                  resources={r"/*": {"origins": "*"}},
                   supports_credentials=True)
-    
-    # Create all tables
+
+    with app.app_context():
+        _pools.append(db.engine.pool)
+        _warm_pool(db.engine, min(app.config.get('DB_POOL_WARM', 0), app.config.get('DB_POOL_SIZE', 0)))
+
+
+def create_schema(app):
+    """
+    Create missing tables for every imported model (db.create_all).
+    create_app() calls this only when AUTO_CREATE_SCHEMA is on; production runs it once per
+    deploy from run_migration.py instead of in every worker.
+    """
     with app.app_context():
-        db.create_all()
\ No newline at end of file
+        db.create_all()
@@ -0,0 +1,310 @@
+"""
+Request and external-call instrumentation exported in Prometheus text format on /metrics
+Metrics are kept per process (each gunicorn worker exposes its own series)
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from flask import Response, g, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Harici çağrıların hangi endpoint adına yapıldığını thread'ler arasında taşır
+_endpoint_label = ContextVar('endpoint_label', default='background')
+
+
+def _escape_label_value(value):
+    """Prometheus exposition formatı: ters bölü, çift tırnak ve satır sonu kaçışlanır"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values)) + (extra or [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """Değeri set edilen veya render anında callback ile okunan gauge"""
+    kind = 'gauge'
+
+    def __init__(self, *args, callback=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = {}
+        self._callback = callback
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def _samples(self):
+        if self._callback is not None:
+            try:
+                values = self._callback()
+            except Exception as e:
+                print(f"Metrics callback error ({self.name}): {e}")
+                values = {}
+            items = [(self._key(labels), value) for labels, value in values]
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, *args, buckets=DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._values = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self):
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        lines = []
+        for key, state in items:
+            for index, bound in enumerate(self.buckets):
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {state[index]}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{labels} {state[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), callback=None):
+        return self._register(Gauge(name, documentation, labelnames, callback=callback))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets=buckets))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+# --- ORTAK METRİKLER ---
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    'http_request_duration_seconds', 'HTTP request latency', ('method', 'endpoint', 'status'))
+HTTP_REQUESTS_IN_PROGRESS = REGISTRY.gauge(
+    'http_requests_in_progress', 'HTTP requests currently being served')
+EXTERNAL_CALL_DURATION = REGISTRY.histogram(
+    'external_call_duration_seconds', 'Latency of external calls (YouTube, Gemini, transcript)',
+    ('service', 'operation', 'outcome'))
+YOUTUBE_QUOTA_UNITS = REGISTRY.counter(
+    'youtube_quota_units_total', 'YouTube Data API quota units consumed', ('method', 'endpoint'))
+DB_COMMIT_DURATION = REGISTRY.histogram(
+    'db_commit_duration_seconds', 'SQLAlchemy session commit latency')
+
+
+# --- ENDPOINT ETİKETİ ---
+def current_endpoint():
+    return _endpoint_label.get()
+
+
+def set_endpoint(label):
+    """Bu thread/context'teki harici çağrıları verilen endpoint adına etiketler"""
+    return _endpoint_label.set(label)
+
+
+def bind_endpoint(fn):
+    """fn'i, çağıranın endpoint etiketiyle başka bir thread'de çalışacak şekilde sarar"""
+    label = current_endpoint()
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _endpoint_label.set(label)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _endpoint_label.reset(token)
+    return wrapper
+
+
+# --- ZAMANLAYICILAR ---
+@contextmanager
+def timed(service, operation):
+    """Span tarzı zamanlayıcı; exception olursa outcome=error olarak kaydedilir"""
+    start = time.perf_counter()
+    outcome = 'ok'
+    try:
+        yield
+    except Exception:
+        outcome = 'error'
+        raise
+    finally:
+        EXTERNAL_CALL_DURATION.observe(time.perf_counter() - start, service=service, operation=operation, outcome=outcome)
+
+
+def instrumented(service, operation):
+    """(result, error) döndüren servis fonksiyonları için dekoratör"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = 'ok'
+            try:
+                result = fn(*args, **kwargs)
+                if isinstance(result, tuple) and len(result) == 2 and result[1]:
+                    outcome = 'error'
+                return result
+            except Exception:
+                outcome = 'error'
+                raise
+            finally:
+                EXTERNAL_CALL_DURATION.observe(time.perf_counter() - start, service=service, operation=operation, outcome=outcome)
+        return wrapper
+    return decorator
+
+
+def record_youtube_quota(method, units):
+    YOUTUBE_QUOTA_UNITS.inc(units, method=method, endpoint=current_endpoint())
+
+
+# --- DB COMMIT ZAMANLAMASI ---
+@event.listens_for(Session, 'before_commit')
+def _before_commit(session):
+    session.info['commit_started'] = time.perf_counter()
+
+
+@event.listens_for(Session, 'after_commit')
+def _after_commit(session):
+    started = session.info.pop('commit_started', None)
+    if started is not None:
+        DB_COMMIT_DURATION.observe(time.perf_counter() - started)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _after_rollback(session, previous_transaction):
+    session.info.pop('commit_started', None)
+
+
+def init_metrics(app):
+    """Request zamanlama middleware'ini ve /metrics endpoint'ini uygulamaya ekler"""
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = time.perf_counter()
+        g._metrics_token = set_endpoint(request.endpoint or 'unknown')
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop('_metrics_start', None)
+        if start is not None:
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                method=request.method,
+                endpoint=request.endpoint or 'unknown',
+                status=response.status_code
+            )
+        return response
+
+    @app.teardown_request
+    def _finish_request(exc):
+        token = g.pop('_metrics_token', None)
+        if token is not None:
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            _endpoint_label.reset(token)
+
+    @app.route('/metrics')
+    def metrics():
+        token = app.config.get('METRICS_TOKEN')
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return Response('forbidden\n', status=403, mimetype='text/plain')
+        return Response(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
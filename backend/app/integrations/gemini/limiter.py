@@ -0,0 +1,239 @@
+"""
+Process-wide limiter for Gemini calls:
+token buckets for requests/minute and tokens/minute, an AIMD concurrency limit
+that halves on 429 and grows back on success, and jittered retries for 429/5xx.
+Every web and job worker process has its own limiter, so each gets an equal share of the
+configured GEMINI_RPM / GEMINI_TPM (see gemini_process_count).
+"""
+import asyncio
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from ...core.config import Config
+from ...core.metrics import REGISTRY
+
+# Tekrar denenecek HTTP kodları (google.api_core exception'larının .code alanı)
+RETRYABLE_CODES = {429, 500, 502, 503, 504}
+
+GEMINI_RETRIES = REGISTRY.counter(
+    'gemini_retries_total', 'Gemini calls retried after a retryable error', ('code',))
+GEMINI_SHED = REGISTRY.counter(
+    'gemini_shed_total', 'Gemini calls rejected by the limiter without being sent', ('reason',))
+
+
+class GeminiRateLimited(Exception):
+    """Limiter isteği kuyrukta tutamadığında fırlatılır (istek Gemini'ye hiç gitmez)"""
+
+    def __init__(self, reason):
+        super().__init__(f"Gemini quota limit reached, request not sent ({reason})")
+        self.reason = reason
+
+
+def _error_code(error):
+    code = getattr(error, 'code', None)
+    # google.api_core exception'larında code int, bazı sürümlerde enum olabilir
+    return getattr(code, 'value', code) if code is not None else None
+
+
+class GeminiLimiter:
+    def __init__(self, rpm, tpm, max_concurrency, max_queue, queue_timeout, max_retries, retry_base_delay):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+
+        self._cond = threading.Condition()
+        self._requests = float(rpm)  # bucket'lar dolu başlar
+        self._tokens = float(tpm)
+        self._refilled_at = time.monotonic()
+        self._limit = float(max_concurrency)
+        self._in_flight = 0
+        self._waiting = 0
+
+    # --- DURUM (metrikler için) ---
+    @property
+    def waiting(self):
+        return self._waiting
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    @property
+    def concurrency_limit(self):
+        return self._limit
+
+    # --- KABUL ---
+    def _refill(self, now):
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60.0)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60.0)
+
+    def _try_acquire(self, tokens):
+        """
+        _cond tutulurken çağrılır. Kapasite ayrıldıysa None, aksi halde tekrar denemeden
+        önce beklenecek süreyi döndürür (slot beklerken 0 - notify/poll ile uyanılır).
+        """
+        self._refill(time.monotonic())
+        if self._in_flight >= max(1, int(self._limit)):
+            return 0
+        if self._requests >= 1 and self._tokens >= tokens:
+            self._requests -= 1
+            self._tokens -= tokens
+            self._in_flight += 1
+            return None
+        # Bucket'ın yeterince dolmasına kalan süre
+        return max(
+            (1 - self._requests) * 60.0 / self.rpm,
+            (tokens - self._tokens) * 60.0 / self.tpm,
+            0.01
+        )
+
+    def _enter_queue(self):
+        if self._waiting >= self.max_queue:
+            GEMINI_SHED.inc(reason='queue_full')
+            raise GeminiRateLimited('queue full')
+        self._waiting += 1
+
+    def _acquire(self, tokens):
+        tokens = min(tokens, self.tpm)
+        deadline = time.monotonic() + self.queue_timeout
+        with self._cond:
+            self._enter_queue()
+            try:
+                while True:
+                    wait = self._try_acquire(tokens)
+                    if wait is None:
+                        return
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        GEMINI_SHED.inc(reason='queue_timeout')
+                        raise GeminiRateLimited('queue timeout')
+                    # Slot bekleniyorsa release'deki notify ile uyanılır
+                    self._cond.wait(min(wait or remaining, remaining))
+            finally:
+                self._waiting -= 1
+
+    async def _acquire_async(self, tokens):
+        """_acquire'ın event loop'u bloklamayan versiyonu (thread tutmadan poll eder)"""
+        tokens = min(tokens, self.tpm)
+        deadline = time.monotonic() + self.queue_timeout
+        with self._cond:
+            self._enter_queue()
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_acquire(tokens)
+                if wait is None:
+                    return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    GEMINI_SHED.inc(reason='queue_timeout')
+                    raise GeminiRateLimited('queue timeout')
+                await asyncio.sleep(min(wait or 0.05, remaining))
+        finally:
+            with self._cond:
+                self._waiting -= 1
+
+    def _release(self, throttled):
+        with self._cond:
+            self._in_flight -= 1
+            if throttled:
+                # Multiplicative decrease
+                self._limit = max(1.0, self._limit / 2)
+            else:
+                # Additive increase (~ her tam pencerede +1)
+                self._limit = min(float(self.max_concurrency), self._limit + 1.0 / self._limit)
+            self._cond.notify_all()
+
+    def adjust_tokens(self, delta):
+        """Gerçek token kullanımı tahminden farklıysa bucket'ı düzeltir"""
+        with self._cond:
+            self._tokens -= delta
+
+    @contextmanager
+    def slot(self, tokens):
+        """Bir Gemini çağrısı için rate ve concurrency kapasitesi ayırır (retry yapmaz)"""
+        self._acquire(tokens)
+        throttled = False
+        try:
+            yield
+        except Exception as e:
+            throttled = _error_code(e) == 429
+            raise
+        finally:
+            self._release(throttled)
+
+    def call(self, fn, *args, tokens=0, **kwargs):
+        """fn'i limiter üzerinden çalıştırır; 429/5xx hatalarında jitter'lı backoff ile tekrar dener"""
+        attempt = 0
+        while True:
+            try:
+                with self.slot(tokens):
+                    return fn(*args, **kwargs)
+            except GeminiRateLimited:
+                raise
+            except Exception as e:
+                code = _error_code(e)
+                if code not in RETRYABLE_CODES or attempt >= self.max_retries:
+                    raise
+                GEMINI_RETRIES.inc(code=code)
+                # Full jitter: [0, base * 2^attempt]
+                time.sleep(random.uniform(0, self.retry_base_delay * (2 ** attempt)))
+                attempt += 1
+
+    async def call_async(self, fn, *args, tokens=0, **kwargs):
+        """call() için async versiyon; fn bir coroutine fonksiyonudur"""
+        attempt = 0
+        while True:
+            await self._acquire_async(tokens)
+            throttled = False
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                code = _error_code(e)
+                throttled = code == 429
+                if code not in RETRYABLE_CODES or attempt >= self.max_retries:
+                    raise
+                GEMINI_RETRIES.inc(code=code)
+            finally:
+                self._release(throttled)
+            await asyncio.sleep(random.uniform(0, self.retry_base_delay * (2 ** attempt)))
+            attempt += 1
+
+
+def gemini_process_count():
+    """Aynı Gemini anahtarını paylaşan process sayısı: gunicorn worker'ları + job worker'ları"""
+    return max(1, Config.WEB_CONCURRENCY + Config.JOB_WORKER_PROCESSES)
+
+
+def per_process(limit, processes):
+    """Toplam kotanın bir process'e düşen payı (en az 1)"""
+    return max(1, limit // processes)
+
+
+gemini_limiter = GeminiLimiter(
+    rpm=per_process(Config.GEMINI_RPM, gemini_process_count()),
+    tpm=per_process(Config.GEMINI_TPM, gemini_process_count()),
+    max_concurrency=Config.GEMINI_MAX_CONCURRENCY,
+    max_queue=Config.GEMINI_MAX_QUEUE,
+    queue_timeout=Config.GEMINI_QUEUE_TIMEOUT,
+    max_retries=Config.GEMINI_MAX_RETRIES,
+    retry_base_delay=Config.GEMINI_RETRY_BASE_DELAY
+)
+
+REGISTRY.gauge(
+    'gemini_limiter_queue_depth', 'Gemini calls waiting for limiter capacity',
+    callback=lambda: [({}, gemini_limiter.waiting)])
+REGISTRY.gauge(
+    'gemini_limiter_in_flight', 'Gemini calls currently running',
+    callback=lambda: [({}, gemini_limiter.in_flight)])
+REGISTRY.gauge(
+    'gemini_limiter_concurrency_limit', 'Current AIMD concurrency limit for Gemini calls',
+    callback=lambda: [({}, round(gemini_limiter.concurrency_limit, 2))])
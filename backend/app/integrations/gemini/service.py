@@ -1,22 +1,88 @@
-import google.generativeai as genai
+import asyncio
+import re
+import threading
+import time
+
 from ...core.config import Config
+from ...core.metrics import timed
+from ...utils import estimate_tokens
+from .limiter import gemini_limiter
+
+# TPM bütçesi için yanıt uzunluğu tahmini (token)
+OUTPUT_TOKEN_ESTIMATE = 256
 
-# API anahtarını yapılandır
 GEMINI_API_KEY = Config.GEMINI_API_KEY
 if not GEMINI_API_KEY:
     print("ERROR: GEMINI_API_KEY not found in .env file.")
-    model = None
-else:
-    try:
-        genai.configure(api_key=GEMINI_API_KEY)
-        model = genai.GenerativeModel('gemini-1.5-flash')
-    except Exception as e:
-        print(f"Error configuring Gemini API: {e}")
-        model = None
+
+# google.generativeai (~150ms import) worker açılışında değil, ilk Gemini çağrısında yüklenir
+model = None  # Genel model; get_model() ilk çağrıda oluşturur
+_model_loaded = False
+_model_lock = threading.Lock()
+
+
+def _genai():
+    """google.generativeai modülü (ilk çağrıdan sonra sys.modules'tan gelir)"""
+    import google.generativeai as genai
+    return genai
+
+
+def get_model():
+    """API anahtarını yapılandırıp genel modeli bir kez oluşturur; yapılandırılamazsa None."""
+    global model, _model_loaded
+    if not _model_loaded:
+        with _model_lock:
+            if not _model_loaded:
+                if GEMINI_API_KEY:
+                    try:
+                        genai = _genai()
+                        genai.configure(api_key=GEMINI_API_KEY)
+                        model = genai.GenerativeModel(Config.GEMINI_MODEL)
+                    except Exception as e:
+                        print(f"Error configuring Gemini API: {e}")
+                        model = None
+                _model_loaded = True
+    return model
+
+def _generate(prompt, operation, target=None, prefix_tokens=0):
+    """
+    model.generate_content çağrısını paylaşılan rate/concurrency limiter üzerinden yapar.
+    target: system_instruction'lı model (varsayılan: genel model), prefix_tokens: onun talimat token'ları.
+    """
+    target = target or get_model()
+    estimated = estimate_tokens(prompt) + prefix_tokens + OUTPUT_TOKEN_ESTIMATE
+
+    def attempt():
+        with timed('gemini', operation):
+            return target.generate_content(prompt)
+
+    response = gemini_limiter.call(attempt, tokens=estimated)
+    # Gerçek kullanım biliniyorsa TPM bucket'ını düzelt
+    usage = getattr(response, 'usage_metadata', None)
+    total = getattr(usage, 'total_token_count', None)
+    if total:
+        gemini_limiter.adjust_tokens(total - estimated)
+    return response
+
+async def _generate_async(prompt, operation, target=None, prefix_tokens=0):
+    """_generate'in async versiyonu (ASGI giriş noktası için generate_content_async kullanır)."""
+    target = target or get_model()
+    estimated = estimate_tokens(prompt) + prefix_tokens + OUTPUT_TOKEN_ESTIMATE
+
+    async def attempt():
+        with timed('gemini', operation):
+            return await target.generate_content_async(prompt)
+
+    response = await gemini_limiter.call_async(attempt, tokens=estimated)
+    usage = getattr(response, 'usage_metadata', None)
+    total = getattr(usage, 'total_token_count', None)
+    if total:
+        gemini_limiter.adjust_tokens(total - estimated)
+    return response
 
 def summarize_transcript(transcript_text, language):
     """Video transcript'ini özetler."""
-    if not model:
+    if not get_model():
         return "Gemini API bağlanamadı.", True
     
     if not transcript_text or len(transcript_text.strip()) < 50:
@@ -35,47 +101,77 @@ Bu video transcript'ini {language} dilinde 2-3 cümlelik kısa bir özet haline
 """
     
     try:
-        response = model.generate_content(prompt)
+        response = _generate(prompt, 'summarize')
         return response.text.strip(), None
     except Exception as e:
         print(f"Transcript özetleme hatası: {e}")
         return "Transcript özetlenemedi.", True
 
-def generate_comment_text(details, comment_style, language, existing_comments=None, transcript_summary=None):
-    if not model:
-        return "Gemini API is not configured correctly. Please check your API key.", True
+def _format_timestamp(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}" if seconds >= 3600 else f"{seconds // 60}:{seconds % 60:02d}"
 
-    comment_section = "No comments available to analyze."
-    if existing_comments:
-        comment_section = "\n".join(
-            [f"- '{c['text']}' (by {c['author']})" for c in existing_comments]
-        )
+def summarize_transcript_chunk(chunk_text, language, start=None, end=None):
+    """Uzun bir transcript'in tek bir bölümünü özetler (map adımı)."""
+    if not get_model():
+        return "Gemini API bağlanamadı.", True
+    
+    time_range = f" ({_format_timestamp(start)} - {_format_timestamp(end)})" if start is not None else ""
+    prompt = f"""
+Aşağıda uzun bir videonun transcript'inden bir bölüm{time_range} var. Bu bölümde anlatılan ana noktaları {language} dilinde 3-4 cümleyle özetle:
 
-    # --- GELİŞTİRİLMİŞ YORUM ÜRETME PROMPT'U ---
-    prompt_template = f"""
-### GÖREVİN ###
-Sen Hasan Arthur Altuntaş tarafından geliştirilen CommendAI'sın. Görevin: YouTube videolarına özgün, yaratıcı ve değerli yorumlar üretmek. Yorum dili: **{language}**.
+{chunk_text}
 
-### VİDEO ANALİZİ ###
-**Mevcut Yorumlar (ÖNCELİKLİ):**
-{comment_section}
+ÖNEMLİ: Sadece özetin kendisini yaz, başka açıklama yapma.
+"""
+    
+    try:
+        response = _generate(prompt, 'summarize_chunk')
+        return response.text.strip(), None
+    except Exception as e:
+        print(f"Transcript bölüm özetleme hatası: {e}")
+        return "Transcript bölümü özetlenemedi.", True
 
-**Video İçeriği (ÖNCELİKLİ):**
-{f"- Özet: {transcript_summary}" if transcript_summary else "- İçerik özeti mevcut değil"}
+def combine_transcript_summaries(chunk_summaries, language):
+    """Bölüm özetlerini (sırasıyla) tek bir 2-3 cümlelik video özetine indirger (reduce adımı)."""
+    if not get_model():
+        return "Gemini API bağlanamadı.", True
+    
+    sections = "\n".join(f"{index}. {summary}" for index, summary in enumerate(chunk_summaries, 1))
+    prompt = f"""
+Aşağıda bir videonun baştan sona sıralı bölüm özetleri var. Bunları videonun tamamını kapsayan, {language} dilinde 2-3 cümlelik kısa bir özet haline getir:
+
+{sections}
+
+ÖNEMLİ: Sadece özetin kendisini yaz, başka açıklama yapma.
+"""
+    
+    try:
+        response = _generate(prompt, 'combine_summaries')
+        return response.text.strip(), None
+    except Exception as e:
+        print(f"Özet birleştirme hatası: {e}")
+        return "Transcript özetlenemedi.", True
 
-**Video Bilgileri (YARDIMCI):**
-- Başlık: {details['title']}
-- Kanal: {details['channel_name']}
-- Açıklama: {details['description'][:300]}
+# --- YORUM PROMPT'U ---
+# Sabit talimatlar (görev, strateji, kurallar, örnekler) dil başına bir kez system_instruction'a
+# yazılır; istek başına sadece video bağlamı gönderilir.
+COMMENT_DISCLAIMERS = {
+    'Turkish': "Not: Bu yorum AI tarafından üretilmiştir.",
+    'English': "Note: This comment was generated by AI.",
+    'Russian': "Примечание: Этот комментарий создан ИИ.",
+    'Chinese': "注：此评论由AI生成。",
+    'Japanese': "注：このコメントはAIによって生成されました。",
+}
 
-**İstatistikler (YARDIMCI):**
-- İzlenme: {details.get('view_count', 'Bilinmiyor')}
-- Beğeni: {details.get('like_count', 'Bilinmiyor')}
+COMMENT_SYSTEM_TEMPLATE = """### GÖREVİN ###
+Sen Hasan Arthur Altuntaş tarafından geliştirilen CommendAI'sın. Görevin: YouTube videolarına özgün, yaratıcı ve değerli yorumlar üretmek. Yorum dili: **{language}**.
+Her mesajda videonun mevcut yorumları, içerik özeti, bilgileri ve istenen yorum stili verilir. Mevcut yorumlar ve içerik ÖNCELİKLİ, video bilgileri ve istatistikler YARDIMCI kaynaktır.
 
 ### YORUM STRATEJİSİ ###
-**{comment_style}** stilinde yorum yaz:
+İstenen stilde yorum yaz:
 
-1. **Gerçekçilik:** Normal bir izleyici gibi yaz, abartma. 
+1. **Gerçekçilik:** Normal bir izleyici gibi yaz, abartma.
 2. **Emoji Sınırı:** Hiç emoji kullanma veya en fazla 1 adet kullan.
 3. **Doğallık:** Samimi ama sade bir dil kullan.
 4. **Video Odak:** Videonun içeriğini ve mevcut yorumları ön planda tut.
@@ -86,23 +182,185 @@ Sen Hasan Arthur Altuntaş tarafından geliştirilen CommendAI'sın. Görevin: Y
 - **Uzunluk:** 1-3 cümle arası, kısa ve etkili
 - **Ton:** Video konusuna uygun (ciddi/eğlenceli/destekleyici)
 - **Özgünlük:** Klişe ifadelerden kaçın
-- **Disclaimer:** Yorumun sonuna yeni satırda disclaimer ekle:
-  - Turkish: "Not: Bu yorum AI tarafından üretilmiştir."
-  - English: "Note: This comment was generated by AI."
-  - Russian: "Примечание: Этот комментарий создан ИИ."
-  - Chinese: "注：此评论由AI生成。"
-  - Japanese: "注：このコメントはAIによって生成されました。"
+- **Disclaimer:** Yorumun sonuna yeni satırda şu disclaimer'ı ekle: "{disclaimer}"
 
 ### ÖRNEKLER ###
 Kötü: "Harika video! Çok beğendim!"
 İyi: "3:45'teki o detay gerçekten önemli bir noktaydı, bu konuya hiç bu açıdan bakmamıştım."
 
-**Yorumun:**
-"""
+Sadece yorumun kendisini yaz."""
+
+COMMENT_PROMPT_TEMPLATE = """Mevcut Yorumlar:
+{comments}
+İçerik: {summary}
+Başlık: {title}
+Kanal: {channel}
+Açıklama: {description}
+İzlenme: {views} | Beğeni: {likes}
+Stil: {style}"""
+
+
+def build_comment_system_instruction(language):
+    """Dile özel sabit yorum talimatları (system_instruction)."""
+    disclaimer = COMMENT_DISCLAIMERS.get(language, COMMENT_DISCLAIMERS['English'])
+    return COMMENT_SYSTEM_TEMPLATE.format(language=language, disclaimer=disclaimer)
+
+
+class CommentModelCache:
+    """
+    Dil başına system_instruction'lı GenerativeModel önbelleği.
+    GEMINI_CONTEXT_CACHE açıksa talimatlar CachedContent olarak saklanır ve TTL dolmadan yenilenir.
+    Cache yalnızca talimat minimum token sınırını aşıyorsa ve cache modeli GEMINI_MODEL'in sürümlü
+    karşılığıysa denenir; oluşturulamazsa retry_ttl boyunca normal system_instruction kullanılır.
+    """
+
+    def __init__(self, use_context_cache=False, cache_model=None, cache_ttl=3600, min_tokens=0, retry_ttl=600):
+        self.use_context_cache = use_context_cache
+        self.cache_model = cache_model
+        self.cache_ttl = cache_ttl
+        self.min_tokens = min_tokens
+        self.retry_ttl = retry_ttl
+        self._lock = threading.Lock()
+        self._entries = {}  # language -> (model, prefix_tokens, expires_at)
+
+    def get(self, language):
+        """(model, prefix_tokens) döndürür; prefix_tokens limiter'ın TPM tahmini içindir."""
+        entry = self._entries.get(language)
+        if entry and entry[2] > time.monotonic():
+            return entry[0], entry[1]
+        with self._lock:
+            entry = self._entries.get(language)
+            if not (entry and entry[2] > time.monotonic()):
+                entry = self._build(language)
+                self._entries[language] = entry
+            return entry[0], entry[1]
+
+    @staticmethod
+    def _same_model(cache_model, model):
+        """'models/gemini-1.5-flash-002' ile 'gemini-1.5-flash' aynı modelin sürümüdür; başka model değildir"""
+        cache_name = (cache_model or '').split('/')[-1]
+        name = model.split('/')[-1]
+        return cache_name == name or re.fullmatch(re.escape(name) + r'-\d{3}', cache_name) is not None
+
+    def _cache_skip_reason(self, instruction_tokens):
+        if not self._same_model(self.cache_model, Config.GEMINI_MODEL):
+            return f"cache modeli ({self.cache_model}) GEMINI_MODEL ({Config.GEMINI_MODEL}) ile aynı değil"
+        if instruction_tokens < self.min_tokens:
+            return f"talimat ~{instruction_tokens} token, cache alt sınırı {self.min_tokens}"
+        return None
+
+    def _build(self, language):
+        instruction = build_comment_system_instruction(language)
+        instruction_tokens = estimate_tokens(instruction)
+        # Koşullar değişmediği sürece (model/talimat sabit) normal model süresiz kullanılır
+        expires_at = float('inf')
+        if self.use_context_cache:
+            skip_reason = self._cache_skip_reason(instruction_tokens)
+            if skip_reason:
+                print(f"Gemini context cache atlandı ({language}): {skip_reason}")
+            else:
+                try:
+                    from google.generativeai import caching
+                    cached = caching.CachedContent.create(
+                        model=self.cache_model,
+                        display_name=f"commendai-comment-{language.lower()}",
+                        system_instruction=instruction,
+                        ttl=self.cache_ttl
+                    )
+                    # Cache'lenen token'lar indirimli faturalandırılır; süre dolmadan (%90) yenilenir
+                    return _genai().GenerativeModel.from_cached_content(cached), 0, time.monotonic() + self.cache_ttl * 0.9
+                except Exception as e:
+                    print(f"Gemini context cache oluşturulamadı ({language}), {self.retry_ttl}s system_instruction kullanılıyor: {e}")
+                    expires_at = time.monotonic() + self.retry_ttl
+        return (
+            _genai().GenerativeModel(Config.GEMINI_MODEL, system_instruction=instruction),
+            instruction_tokens,
+            expires_at
+        )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+comment_models = CommentModelCache(
+    use_context_cache=Config.GEMINI_CONTEXT_CACHE,
+    cache_model=Config.GEMINI_CONTEXT_CACHE_MODEL,
+    cache_ttl=Config.GEMINI_CONTEXT_CACHE_TTL,
+    min_tokens=Config.GEMINI_CONTEXT_CACHE_MIN_TOKENS,
+    retry_ttl=Config.GEMINI_CONTEXT_CACHE_RETRY
+)
+
+
+def build_comment_prompt(details, comment_style, language, existing_comments=None, transcript_summary=None):
+    """Yorum üretimi için istek başına değişen prompt kısmını oluşturur (talimatlar system_instruction'da)."""
+    comments = "\n".join(f"- '{c['text']}' (by {c['author']})" for c in existing_comments) if existing_comments else "-"
+
+    return COMMENT_PROMPT_TEMPLATE.format(
+        comments=comments,
+        summary=transcript_summary or "-",
+        title=details['title'],
+        channel=details['channel_name'],
+        description=details['description'][:300],
+        views=details.get('view_count', 'Bilinmiyor'),
+        likes=details.get('like_count', 'Bilinmiyor'),
+        style=comment_style
+    )
+
+def generate_comment_text(details, comment_style, language, existing_comments=None, transcript_summary=None):
+    if not get_model():
+        return "Gemini API is not configured correctly. Please check your API key.", True
+
+    prompt = build_comment_prompt(details, comment_style, language, existing_comments, transcript_summary)
 
     try:
-        response = model.generate_content(prompt_template)
+        comment_model, prefix_tokens = comment_models.get(language)
+        response = _generate(prompt, 'generate_comment', comment_model, prefix_tokens)
         return response.text, None
     except Exception as e:
         print(f"An error occurred during Gemini API call: {e}")
-        return f"Error generating comment: {e}", True
\ No newline at end of file
+        return f"Error generating comment: {e}", True
+
+async def generate_comment_text_async(details, comment_style, language, existing_comments=None, transcript_summary=None):
+    """generate_comment_text'in async versiyonu; aynı (text, error) sözleşmesini döndürür."""
+    if not get_model():
+        return "Gemini API is not configured correctly. Please check your API key.", True
+
+    prompt = build_comment_prompt(details, comment_style, language, existing_comments, transcript_summary)
+
+    try:
+        # İlk oluşturma (context cache açıksa ağ çağrısı) event loop dışında yapılır
+        comment_model, prefix_tokens = await asyncio.to_thread(comment_models.get, language)
+        response = await _generate_async(prompt, 'generate_comment', comment_model, prefix_tokens)
+        return response.text, None
+    except Exception as e:
+        print(f"An error occurred during Gemini API call: {e}")
+        return f"Error generating comment: {e}", True
+
+def stream_comment_text(details, comment_style, language, existing_comments=None, transcript_summary=None):
+    """
+    generate_comment_text'in streaming versiyonu.
+    Her parça için (chunk, None), hata durumunda bir kez (None, error) üretir.
+    """
+    if not get_model():
+        yield None, "Gemini API is not configured correctly. Please check your API key."
+        return
+
+    prompt = build_comment_prompt(details, comment_style, language, existing_comments, transcript_summary)
+
+    try:
+        comment_model, prefix_tokens = comment_models.get(language)
+        # Slot ve süre, son parça alınana kadar tutulur
+        with gemini_limiter.slot(estimate_tokens(prompt) + prefix_tokens + OUTPUT_TOKEN_ESTIMATE), timed('gemini', 'stream_comment'):
+            response = comment_model.generate_content(prompt, stream=True)
+            for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Güvenlik filtresine takılan / boş parçalar
+                    continue
+                if text:
+                    yield text, None
+    except Exception as e:
+        print(f"An error occurred during Gemini streaming call: {e}")
+        yield None, f"Error generating comment: {e}"
\ No newline at end of file
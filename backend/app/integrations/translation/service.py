@@ -2,6 +2,10 @@
 """
 Multi-language error/success message service
 """
+import hashlib
+import json
+import string
+import sys
 
 MESSAGES = {
     'en': {
@@ -215,36 +219,96 @@ MESSAGES = {
     }
 }
 
+# Dil adı -> dil kodu (routes "Turkish" gibi tam adlar da gönderebilir)
+LANGUAGE_ALIASES = {
+    'turkish': 'tr',
+    'english': 'en',
+    'russian': 'ru',
+    'chinese': 'zh',
+    'japanese': 'ja'
+}
+
+FALLBACK_LANGUAGE = 'en'
+
+
+def _compile_catalog():
+    """
+    Builds per-language tables at import time: English fallbacks are merged in,
+    strings are interned and each message is paired with its format field names.
+    """
+    formatter = string.Formatter()
+    fallback = MESSAGES[FALLBACK_LANGUAGE]
+    catalog = {}
+    for language_code, messages in MESSAGES.items():
+        table = {}
+        for key, message in {**fallback, **messages}.items():
+            try:
+                fields = frozenset(name for _, name, _, _ in formatter.parse(message) if name)
+            except ValueError:
+                fields = frozenset()
+            # Parametresiz çağrının sonucu önceden hesaplanır
+            static = message if fields else _safe_format(message, {})
+            table[sys.intern(key)] = (sys.intern(static), fields)
+        catalog[language_code] = table
+    return catalog
+
+
+def _safe_format(message, kwargs):
+    try:
+        return message.format(**kwargs)
+    except (KeyError, ValueError, IndexError):
+        return message
+
+
+def _compile_bundles():
+    """Dil başına frontend bundle'ı (JSON gövdesi + ETag)"""
+    bundles = {}
+    for language_code, table in CATALOG.items():
+        body = json.dumps({
+            'language': language_code,
+            'messages': {key: message for key, (message, _) in table.items()}
+        }, ensure_ascii=False, sort_keys=True)
+        bundles[language_code] = {
+            'body': body,
+            'etag': hashlib.sha256(body.encode('utf-8')).hexdigest()[:32]
+        }
+    return bundles
+
+
+CATALOG = _compile_catalog()
+BUNDLES = _compile_bundles()
+
+
+def normalize_language(language_code):
+    """Dil adı/kodunu katalogdaki bir dil koduna çevirir; bilinmeyenler İngilizce'ye düşer"""
+    code = (language_code or '').lower()
+    code = LANGUAGE_ALIASES.get(code, code)
+    return code if code in CATALOG else FALLBACK_LANGUAGE
+
+
+def get_bundle(language_code):
+    """Returns the precomputed {'body', 'etag'} bundle for a language"""
+    return BUNDLES[normalize_language(language_code)]
+
+
 def get_message(language_code, message_key, **kwargs):
     """
     Get localized message by language code and message key
     
     Args:
-        language_code (str): Language code (en, tr, ru, zh, ja)
+        language_code (str): Language code (en, tr, ru, zh, ja) or language name
         message_key (str): Message key from MESSAGES dict
         **kwargs: Format parameters for the message
     
     Returns:
         str: Localized message
     """
-    # Normalize language code
-    lang_map = {
-        'turkish': 'tr',
-        'english': 'en', 
-        'russian': 'ru',
-        'chinese': 'zh',
-        'japanese': 'ja'
-    }
-    
-    if language_code.lower() in lang_map:
-        language_code = lang_map[language_code.lower()]
-    
-    # Get message from dict with fallback to English
-    messages = MESSAGES.get(language_code, MESSAGES['en'])
-    message = messages.get(message_key, MESSAGES['en'].get(message_key, f"Message not found: {message_key}"))
-    
-    # Format message with parameters
-    try:
-        return message.format(**kwargs)
-    except (KeyError, ValueError):
-        return message
\ No newline at end of file
+    entry = CATALOG[normalize_language(language_code)].get(message_key)
+    if entry is None:
+        return f"Message not found: {message_key}"
+
+    message, fields = entry
+    # Alan içermeyen mesajlar ya da parametresiz çağrılar format'a hiç girmez
+    if not fields or not kwargs:
+        return message
+    return _safe_format(message, kwargs)
@@ -0,0 +1,169 @@
+"""
+Non-blocking YouTube Data API client (httpx) used by the ASGI entry point.
+Shares credentials, cache, quota accounting and response parsing with service.py;
+blocking pieces (token refresh, SQL cache reads/writes, quota reads) run in worker threads.
+"""
+
+import anyio
+import httpx
+
+from ...core.metrics import record_youtube_quota, timed
+from ...shared.cache import MemoryCacheBackend, get_cache
+from ...shared.quota import QuotaExceeded, quota_budget
+from ...utils import extract_video_id
+from . import service
+from .service import QUOTA_COSTS, _parse_video_meta, _parse_video_stats
+
+API_BASE = 'https://www.googleapis.com/youtube/v3'
+
+
+class AsyncYouTubeClient:
+    """Async counterparts of get_video_details, get_channel_details, get_video_comments and post_youtube_comment"""
+
+    def __init__(self, http: httpx.AsyncClient, app=None):
+        self.http = http
+        self.app = app
+        if app is not None:
+            quota_budget.start(app)
+
+    async def _offload(self, fn, *args, **kwargs):
+        """Bloklayan çağrıyı (app context ile) bir worker thread'de çalıştırır"""
+        def run():
+            if self.app is None:
+                return fn(*args, **kwargs)
+            with self.app.app_context():
+                return fn(*args, **kwargs)
+        return await anyio.to_thread.run_sync(run)
+
+    async def _cache(self, method, *args):
+        cache = get_cache()
+        if isinstance(cache.backend, MemoryCacheBackend):
+            return getattr(cache, method)(*args)
+        return await self._offload(getattr(cache, method), *args)
+
+    async def _token(self):
+        creds = service.get_cached_credentials()
+        if creds is None:
+            # İlk yükleme/yenileme senkron ve lock altında; event loop'u bloklamasın
+            creds = await anyio.to_thread.run_sync(service.get_credentials)
+        return creds.token
+
+    async def _request(self, method, http_method, path, params, json=None):
+        units = QUOTA_COSTS[method]
+        if not await self._offload(quota_budget.can_spend, units):
+            raise QuotaExceeded(method, units, await self._offload(quota_budget.remaining))
+
+        token = await self._token()
+        try:
+            with timed('youtube', method):
+                response = await self.http.request(
+                    http_method, f"{API_BASE}/{path}",
+                    params=params, json=json,
+                    headers={'Authorization': f'Bearer {token}'}
+                )
+                response.raise_for_status()
+                return response.json()
+        finally:
+            # Hata dönen istekler de quota'dan düşülür
+            record_youtube_quota(method, units)
+            quota_budget.record(method, units)
+
+    async def get_video_details(self, video_url):
+        try:
+            video_id = extract_video_id(video_url)
+            if not video_id:
+                return None, "Geçersiz YouTube URL'si"
+
+            meta_hit, meta = await self._cache('get', 'video_meta', video_id)
+            stats_hit, stats = await self._cache('get', 'video_stats', video_id)
+
+            if not (meta_hit and stats_hit):
+                parts = []
+                if not meta_hit:
+                    parts.append("snippet,contentDetails")
+                if not stats_hit:
+                    parts.append("statistics")
+
+                response = await self._request('videos.list', 'GET', 'videos', {'part': ",".join(parts), 'id': video_id})
+                if not response.get('items'):
+                    return None, "Video bulunamadı"
+
+                item = response['items'][0]
+                if not meta_hit:
+                    meta = _parse_video_meta(item)
+                    await self._cache('set', 'video_meta', video_id, meta)
+                if not stats_hit:
+                    stats = _parse_video_stats(item)
+                    await self._cache('set', 'video_stats', video_id, stats)
+
+            return {**meta, **stats}, None
+        except QuotaExceeded as e:
+            return None, str(e)
+        except Exception as e:
+            print(f"Video detayları alınırken hata oluştu: {e}")
+            return None, "Video detayları alınırken bir hata oluştu."
+
+    async def get_channel_details(self, channel_id):
+        try:
+            hit, details = await self._cache('get', 'channel_stats', channel_id)
+            if hit:
+                return dict(details), None
+
+            response = await self._request('channels.list', 'GET', 'channels', {'part': 'statistics', 'id': channel_id})
+            if not response.get('items'):
+                return None, "Kanal bulunamadı"
+
+            stats = response['items'][0].get('statistics', {})
+            details = {'subscriber_count': int(stats.get('subscriberCount', 0))}
+            await self._cache('set', 'channel_stats', channel_id, details)
+            return dict(details), None
+        except Exception as e:
+            print(f"Kanal detayları alınırken hata oluştu: {e}")
+            return None, "Kanal detayları alınırken bir hata oluştu."
+
+    async def get_video_comments(self, video_id, max_results=20):
+        try:
+            cache_key = f"{video_id}:{max_results}"
+            hit, comments = await self._cache('get', 'video_comments', cache_key)
+            if hit:
+                return list(comments), None
+
+            response = await self._request('commentThreads.list', 'GET', 'commentThreads', {
+                'part': 'snippet',
+                'videoId': video_id,
+                'maxResults': max_results,
+                'order': 'relevance'
+            })
+
+            comments = []
+            for item in response.get('items', []):
+                top_comment = item['snippet']['topLevelComment']['snippet']
+                comments.append({
+                    'author': top_comment.get('authorDisplayName'),
+                    'text': top_comment.get('textDisplay')
+                })
+            await self._cache('set', 'video_comments', cache_key, comments)
+            return list(comments), None
+        except Exception as e:
+            print(f"Yorumlar alınırken hata oluştu: {e}")
+            return None, "Videodan yorumlar alınırken bir hata oluştu."
+
+    async def post_comment(self, video_id, comment_text):
+        try:
+            request_body = {
+                "snippet": {
+                    "videoId": video_id,
+                    "topLevelComment": {"snippet": {"textOriginal": comment_text}}
+                }
+            }
+            response = await self._request('commentThreads.insert', 'POST', 'commentThreads', {'part': 'snippet'}, json=request_body)
+            return response, None
+        except QuotaExceeded as e:
+            return None, str(e)
+        except httpx.HTTPStatusError as e:
+            print(f"Yorum gönderilirken hata oluştu: {e}")
+            # Route'taki hata eşleştirmesi (permission/quota/not found) için durum kodu mesajda kalır
+            return None, f"Yorum gönderilirken bir hata oluştu. ({e.response.status_code} {e.response.reason_phrase})"
+        except Exception as e:
+            print(f"Yorum gönderilirken hata oluştu: {e}")
+            return None, "Yorum gönderilirken bir hata oluştu."
@@ -1,82 +1,171 @@
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
 import re
 from ...core.config import Config
+from ...shared.cache import get_cache
+from ...shared.quota import QuotaExceeded, quota_budget
+from ...core.metrics import instrumented, record_youtube_quota, timed
 import os
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
 import isodate # Videonun süresini parse etmek için
+import json
+import threading
 
-    
+# Gerekli kapsamlar (API'nin hangi verilere erişebileceğini belirler)
+SCOPES = ['https://www.googleapis.com/auth/youtube.force-ssl']
+TOKEN_FILE = 'token.json'
+CLIENT_SECRETS_FILE = 'client_secret.json'
+
+# Process genelinde paylaşılan credentials; yenileme işlemi lock ile korunur
+_credentials = None
+_credentials_lock = threading.Lock()
+
+# httplib2 thread-safe olmadığı için her thread kendi servis nesnesini bir kez oluşturur
+_thread_local = threading.local()
 
-def get_authenticated_service():
-    """OAuth 2.0 ile YouTube API kimlik doğrulaması yapar ve servis nesnesini döndürür."""
-    import json
-    import tempfile
-    
-    # Environment variable'dan client secret'ı oku
-    CLIENT_SECRET_JSON = os.getenv('CLIENT_SECRET_JSON')
-    if CLIENT_SECRET_JSON:
-        try:
-            # JSON'u parse et (validation için)
-            json_data = json.loads(CLIENT_SECRET_JSON)
-            # Temporary file oluştur
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as temp_file:
-                json.dump(json_data, temp_file)
-                CLIENT_SECRETS_FILE = temp_file.name
-        except json.JSONDecodeError as e:
-            print(f"CLIENT_SECRET_JSON parse error: {e}")
-            CLIENT_SECRETS_FILE = 'client_secret.json'  # Fallback
-    else:
-        CLIENT_SECRETS_FILE = 'client_secret.json'
 
-    # Gerekli kapsamlar (API'nin hangi verilere erişebileceğini belirler)
-    SCOPES = ['https://www.googleapis.com/auth/youtube.force-ssl']
+def _load_credentials():
+    """TOKEN_JSON, token.json veya OAuth akışından credentials yükler (process başına bir kez)."""
+    # google-auth/oauthlib worker açılışında değil, ilk YouTube çağrısında import edilir
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
     
     # Production ortamında TOKEN_JSON environment variable'dan token'ı oku
     TOKEN_JSON = os.getenv('TOKEN_JSON')
     if TOKEN_JSON:
         try:
-            # Environment variable'dan token'ı al ve Credentials oluştur
             token_data = json.loads(TOKEN_JSON)
-            creds = Credentials.from_authorized_user_info(token_data, SCOPES)
-            
-            # Token expire olmuşsa refresh et
-            if creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            
-            return build('youtube', 'v3', credentials=creds)
+            return Credentials.from_authorized_user_info(token_data, SCOPES)
         except Exception as e:
             print(f"TOKEN_JSON parse error: {e}")
     
     # Fallback: Local token.json dosyasını dene
-    TOKEN_FILE = 'token.json'
-    creds = None
     if os.path.exists(TOKEN_FILE):
-        creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
-        if creds and not creds.valid:
-            if creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                # Token geçersiz ve browser kullanılamıyor
-                raise Exception("OAuth token geçersiz. Local ortamda yeniden authorize edin.")
-        return build('youtube', 'v3', credentials=creds)
+        return Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
     
-    # Eğer client_secret.json varsa OAuth akışını başlat
-    if os.path.exists(CLIENT_SECRETS_FILE):
-        print("OAuth authorization başlatılıyor...")
+    # Client secret'ı environment variable'dan (temp dosya yazmadan) veya dosyadan oku
+    flow = None
+    CLIENT_SECRET_JSON = os.getenv('CLIENT_SECRET_JSON')
+    if CLIENT_SECRET_JSON:
+        try:
+            flow = InstalledAppFlow.from_client_config(json.loads(CLIENT_SECRET_JSON), SCOPES)
+        except json.JSONDecodeError as e:
+            print(f"CLIENT_SECRET_JSON parse error: {e}")
+    if flow is None and os.path.exists(CLIENT_SECRETS_FILE):
         flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRETS_FILE, SCOPES)
+    
+    # Eğer client secret varsa OAuth akışını başlat
+    if flow is not None:
+        print("OAuth authorization başlatılıyor...")
         creds = flow.run_local_server(port=0)
         # Token'ı kaydet
         with open(TOKEN_FILE, 'w') as token:
             token.write(creds.to_json())
         print(f"OAuth başarılı! Token {TOKEN_FILE} dosyasına kaydedildi.")
-        return build('youtube', 'v3', credentials=creds)
+        return creds
     
     # Ne token.json var ne de TOKEN_JSON environment variable ne de client_secret.json
     raise Exception("YouTube API kimlik doğrulaması bulunamadı. client_secret.json dosyası veya TOKEN_JSON environment variable'ı gerekli.")
 
+
+def _get_credentials():
+    """Paylaşılan credentials'ı döndürür; yalnızca süresi dolduğunda yeniler."""
+    global _credentials
+    with _credentials_lock:
+        if _credentials is None:
+            _credentials = _load_credentials()
+        
+        if not _credentials.valid:
+            if _credentials.expired and _credentials.refresh_token:
+                from google.auth.transport.requests import Request
+                _credentials.refresh(Request())
+            else:
+                # Token geçersiz ve browser kullanılamıyor
+                _credentials = None
+                raise Exception("OAuth token geçersiz. Local ortamda yeniden authorize edin.")
+        
+        return _credentials
+
+
+def get_credentials():
+    """Geçerli credentials'ı döndürür; ilk yükleme veya yenileme gerekiyorsa (bloklayarak) yapar."""
+    return _get_credentials()
+
+
+def get_cached_credentials():
+    """Yüklenmiş ve hâlâ geçerli credentials'ı lock/IO olmadan döndürür; yoksa None."""
+    creds = _credentials
+    if creds is None or not creds.valid:
+        return None
+    return creds
+
+
+def get_authenticated_service():
+    """OAuth 2.0 ile YouTube API kimlik doğrulaması yapar ve (thread başına önbelleğe alınmış) servis nesnesini döndürür."""
+    creds = _get_credentials()
+    
+    client = getattr(_thread_local, 'client', None)
+    if client is None or _thread_local.credentials is not creds:
+        # Discovery dokümanı paket içinden okunur; build thread başına yalnızca bir kez yapılır
+        from googleapiclient.discovery import build
+        client = build('youtube', 'v3', credentials=creds, cache_discovery=False)
+        _thread_local.client = client
+        _thread_local.credentials = creds
+    
+    return client
+
+# YouTube Data API quota maliyetleri (birim / çağrı)
+QUOTA_COSTS = {
+    'videos.list': 1,
+    'channels.list': 1,
+    'commentThreads.list': 1,
+    'commentThreads.insert': 50
+}
+
+# Her API çağrısının sonucunu tutan cache namespace'leri; videos.list ancak ikisi de hit olursa atlanır
+CACHE_NAMESPACES = {
+    'videos.list': ('video_meta', 'video_stats'),
+    'channels.list': ('channel_stats',),
+    'commentThreads.list': ('video_comments',)
+}
+
+def _execute(request, method):
+    """API isteğini bütçe kontrolüyle çalıştırır; süreyi ve harcanan quota birimlerini kaydeder."""
+    units = QUOTA_COSTS[method]
+    if not quota_budget.can_spend(units):
+        raise QuotaExceeded(method, units, quota_budget.remaining())
+    try:
+        with timed('youtube', method):
+            return request.execute()
+    finally:
+        # Hata dönen istekler de quota'dan düşülür
+        record_youtube_quota(method, units)
+        quota_budget.record(method, units)
+
+def _parse_video_meta(item):
+    """videos().list item'ından uzun ömürlü alanları (başlık, açıklama, süre) çıkarır."""
+    snippet = item['snippet']
+    content = item.get('contentDetails', {})
+
+    # Süreyi okunabilir bir formata çevir
+    duration_iso = content.get('duration', 'PT0S')
+    duration_seconds = isodate.parse_duration(duration_iso).total_seconds()
+    duration_formatted = f"{int(duration_seconds // 60)} dakika {int(duration_seconds % 60)} saniye"
+
+    return {
+        'title': snippet.get('title'),
+        'channel_name': snippet.get('channelTitle'),
+        'channel_id': snippet.get('channelId'), # Kanal istatistikleri için
+        'description': snippet.get('description'),
+        'duration': duration_formatted
+    }
+
+def _parse_video_stats(item):
+    """videos().list item'ından sık değişen istatistikleri çıkarır."""
+    stats = item.get('statistics', {})
+    return {
+        'view_count': int(stats.get('viewCount', 0)),
+        'like_count': int(stats.get('likeCount', 0)),
+        'comment_count': int(stats.get('commentCount', 0))
+    }
+
 def get_video_details(video_url):
     """Verilen YouTube URL'sinden metinsel, istatistiksel ve içerik detaylarını çeker."""
     try:
@@ -85,38 +174,40 @@ def get_video_details(video_url):
             return None, "Geçersiz YouTube URL'si"
         video_id = video_id_match.group(0)
 
-        youtube = get_authenticated_service()
-        # İsteğe 'statistics' ve 'contentDetails' bölümlerini ekliyoruz
-        request = youtube.videos().list(
-            part="snippet,statistics,contentDetails",
-            id=video_id
-        )
-        response = request.execute()
+        # Metadata ve istatistikler farklı TTL'lerle cache'lenir; sadece eksik kısımlar istenir
+        cache = get_cache()
+        meta_hit, meta = cache.get('video_meta', video_id)
+        stats_hit, stats = cache.get('video_stats', video_id)
 
-        if not response.get('items'):
-            return None, "Video bulunamadı"
+        if not (meta_hit and stats_hit):
+            parts = []
+            if not meta_hit:
+                parts.append("snippet,contentDetails")
+            if not stats_hit:
+                parts.append("statistics")
 
-        item = response['items'][0]
-        snippet = item['snippet']
-        stats = item.get('statistics', {})
-        content = item.get('contentDetails', {})
+            youtube = get_authenticated_service()
+            request = youtube.videos().list(
+                part=",".join(parts),
+                id=video_id
+            )
+            response = _execute(request, 'videos.list')
 
-        # Süreyi okunabilir bir formata çevir
-        duration_iso = content.get('duration', 'PT0S')
-        duration_seconds = isodate.parse_duration(duration_iso).total_seconds()
-        duration_formatted = f"{int(duration_seconds // 60)} dakika {int(duration_seconds % 60)} saniye"
+            if not response.get('items'):
+                return None, "Video bulunamadı"
 
-        details = {
-            'title': snippet.get('title'),
-            'channel_name': snippet.get('channelTitle'),
-            'channel_id': snippet.get('channelId'), # Kanal istatistikleri için
-            'description': snippet.get('description'),
-            'view_count': int(stats.get('viewCount', 0)),
-            'like_count': int(stats.get('likeCount', 0)),
-            'comment_count': int(stats.get('commentCount', 0)),
-            'duration': duration_formatted
-        }
+            item = response['items'][0]
+            if not meta_hit:
+                meta = _parse_video_meta(item)
+                cache.set('video_meta', video_id, meta)
+            if not stats_hit:
+                stats = _parse_video_stats(item)
+                cache.set('video_stats', video_id, stats)
+
+        details = {**meta, **stats}
         return details, None
+    except QuotaExceeded as e:
+        return None, str(e)
     except Exception as e:
         print(f"Video detayları alınırken hata oluştu: {e}")
         return None, "Video detayları alınırken bir hata oluştu."
@@ -125,12 +216,17 @@ def get_video_details(video_url):
 def get_channel_details(channel_id):
     """Verilen kanal ID'sinden kanal istatistiklerini çeker."""
     try:
+        cache = get_cache()
+        hit, details = cache.get('channel_stats', channel_id)
+        if hit:
+            return dict(details), None
+
         youtube = get_authenticated_service()
         request = youtube.channels().list(
             part="statistics",
             id=channel_id
         )
-        response = request.execute()
+        response = _execute(request, 'channels.list')
 
         if not response.get('items'):
             return None, "Kanal bulunamadı"
@@ -139,11 +235,87 @@ def get_channel_details(channel_id):
         details = {
             'subscriber_count': int(stats.get('subscriberCount', 0))
         }
-        return details, None
+        cache.set('channel_stats', channel_id, details)
+        return dict(details), None
     except Exception as e:
         print(f"Kanal detayları alınırken hata oluştu: {e}")
         return None, "Kanal detayları alınırken bir hata oluştu."
 
+# YouTube Data API list çağrıları tek istekte en fazla 50 ID kabul eder
+MAX_IDS_PER_CALL = 50
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def get_videos_details_batch(video_ids):
+    """Birden fazla videonun detaylarını 50'lik videos().list çağrılarıyla çeker. {video_id: details} döndürür."""
+    try:
+        cache = get_cache()
+        results = {}
+        missing = []
+        for video_id in dict.fromkeys(video_ids):
+            meta_hit, meta = cache.get('video_meta', video_id)
+            stats_hit, stats = cache.get('video_stats', video_id)
+            if meta_hit and stats_hit:
+                results[video_id] = {**meta, **stats}
+            else:
+                missing.append(video_id)
+
+        if missing:
+            youtube = get_authenticated_service()
+            for chunk in _chunks(missing, MAX_IDS_PER_CALL):
+                response = _execute(youtube.videos().list(
+                    part="snippet,statistics,contentDetails",
+                    id=",".join(chunk),
+                    maxResults=MAX_IDS_PER_CALL
+                ), 'videos.list')
+                for item in response.get('items', []):
+                    meta = _parse_video_meta(item)
+                    stats = _parse_video_stats(item)
+                    cache.set('video_meta', item['id'], meta)
+                    cache.set('video_stats', item['id'], stats)
+                    results[item['id']] = {**meta, **stats}
+
+        return results, None
+    except QuotaExceeded as e:
+        return None, str(e)
+    except Exception as e:
+        print(f"Toplu video detayları alınırken hata oluştu: {e}")
+        return None, "Video detayları alınırken bir hata oluştu."
+
+def get_channels_details_batch(channel_ids):
+    """Tekilleştirilmiş kanal ID'leri için istatistikleri 50'lik channels().list çağrılarıyla çeker."""
+    try:
+        cache = get_cache()
+        results = {}
+        missing = []
+        for channel_id in dict.fromkeys(channel_ids):
+            hit, details = cache.get('channel_stats', channel_id)
+            if hit:
+                results[channel_id] = dict(details)
+            else:
+                missing.append(channel_id)
+
+        if missing:
+            youtube = get_authenticated_service()
+            for chunk in _chunks(missing, MAX_IDS_PER_CALL):
+                response = _execute(youtube.channels().list(
+                    part="statistics",
+                    id=",".join(chunk),
+                    maxResults=MAX_IDS_PER_CALL
+                ), 'channels.list')
+                for item in response.get('items', []):
+                    stats = item.get('statistics', {})
+                    details = {'subscriber_count': int(stats.get('subscriberCount', 0))}
+                    cache.set('channel_stats', item['id'], details)
+                    results[item['id']] = dict(details)
+
+        return results, None
+    except Exception as e:
+        print(f"Toplu kanal detayları alınırken hata oluştu: {e}")
+        return None, "Kanal detayları alınırken bir hata oluştu."
+
 def post_youtube_comment(video_id, comment_text):
     """Verilen video ID'sine, belirtilen metinle bir yorum gönderir."""
     try:
@@ -154,8 +326,10 @@ def post_youtube_comment(video_id, comment_text):
                 "topLevelComment": {"snippet": {"textOriginal": comment_text}}
             }
         }
-        response = youtube.commentThreads().insert(part="snippet", body=request_body).execute()
+        response = _execute(youtube.commentThreads().insert(part="snippet", body=request_body), 'commentThreads.insert')
         return response, None
+    except QuotaExceeded as e:
+        return None, str(e)
     except Exception as e:
         print(f"Yorum gönderilirken hata oluştu: {e}")
         return None, "Yorum gönderilirken bir hata oluştu."
@@ -163,6 +337,12 @@ def post_youtube_comment(video_id, comment_text):
 def get_video_comments(video_id, max_results=20):
     """Belirtilen video ID'sine ait en alakalı ilk yorumları çeker."""
     try:
+        cache = get_cache()
+        cache_key = f"{video_id}:{max_results}"
+        hit, comments = cache.get('video_comments', cache_key)
+        if hit:
+            return list(comments), None
+
         youtube = get_authenticated_service()
         request = youtube.commentThreads().list(
             part="snippet",
@@ -170,7 +350,7 @@ def get_video_comments(video_id, max_results=20):
             maxResults=max_results,
             order="relevance"
         )
-        response = request.execute()
+        response = _execute(request, 'commentThreads.list')
 
         comments = []
         for item in response.get('items', []):
@@ -179,13 +359,15 @@ def get_video_comments(video_id, max_results=20):
                 'author': top_comment.get('authorDisplayName'),
                 'text': top_comment.get('textDisplay')
             })
-        return comments, None
+        cache.set('video_comments', cache_key, comments)
+        return list(comments), None
     except Exception as e:
         print(f"Yorumlar alınırken hata oluştu: {e}")
         return None, "Videodan yorumlar alınırken bir hata oluştu."
 
-def get_video_transcript(video_id):
-    """Video için transcript/altyazı çeker (eğer varsa)."""
+@instrumented('youtube_transcript', 'fetch')
+def get_video_transcript_segments(video_id):
+    """Video için zaman damgalı altyazı parçalarını çeker: [{'text', 'start', 'duration'}, ...]"""
     try:
         # YouTube API v3 doğrudan transcript desteği sunmuyor
         # Bu durumda youtube-transcript-api kullanabiliriz
@@ -211,11 +393,26 @@ def get_video_transcript(video_id):
         # Transcript verilerini al
         transcript_data = transcript.fetch()
         
-        # Metni birleştir
-        full_text = ' '.join([entry['text'] for entry in transcript_data])
-        
-        return full_text, None
+        segments = [
+            {
+                'text': entry['text'],
+                'start': float(entry.get('start', 0)),
+                'duration': float(entry.get('duration', 0))
+            } for entry in transcript_data if entry['text'].strip()
+        ]
+        return segments, None
         
     except Exception as e:
         print(f"Transcript alınırken hata: {e}")
-        return None, "Transcript alınamadı"
\ No newline at end of file
+        return None, "Transcript alınamadı"
+
+def get_video_transcript(video_id):
+    """Video için transcript/altyazı çeker (eğer varsa)."""
+    segments, error = get_video_transcript_segments(video_id)
+    if error:
+        return None, error
+    
+    # Metni birleştir
+    full_text = ' '.join([segment['text'] for segment in segments])
+    
+    return full_text, None
@@ -0,0 +1,54 @@
+"""
+Database migration to add the indexes behind keyset-paginated /api/history
+(created_at, id), posted_at and (user_id, created_at, id) on comment table
+
+Indexes are built CONCURRENTLY so the table stays writable during the migration.
+Run with: python -m app.migrations.add_history_indexes (backend klasöründen)
+"""
+
+import os
+import psycopg2
+
+HISTORY_INDEXES = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_comment_created_at_id ON comment (created_at, id);",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_comment_posted_at ON comment (posted_at);",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_comment_user_id_created_at_id ON comment (user_id, created_at, id);",
+]
+
+def migrate_history_indexes():
+    """Create history pagination/filter indexes on comment table"""
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL not found")
+        return False
+
+    # Handle postgres:// to postgresql:// conversion for newer versions
+    if database_url.startswith('postgres://'):
+        database_url = database_url.replace('postgres://', 'postgresql://', 1)
+
+    try:
+        conn = psycopg2.connect(database_url)
+        # CREATE INDEX CONCURRENTLY transaction içinde çalışamaz
+        conn.autocommit = True
+        cur = conn.cursor()
+
+        print("🔄 Creating history indexes...")
+        for query in HISTORY_INDEXES:
+            cur.execute(query)
+            print(f"✅ {query}")
+
+        print("✅ History index migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return False
+    finally:
+        if 'cur' in locals():
+            cur.close()
+        if 'conn' in locals():
+            conn.close()
+
+if __name__ == "__main__":
+    print("=== Database Migration: History Indexes ===")
+    migrate_history_indexes()
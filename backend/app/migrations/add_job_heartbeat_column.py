@@ -0,0 +1,47 @@
+"""
+Database migration to add heartbeat_at to job table
+Running workers refresh it periodically; stale-job detection uses it instead of started_at,
+so long jobs (large batches) are not reclaimed while their worker is still alive.
+
+Run with: python -m app.migrations.add_job_heartbeat_column (backend klasöründen)
+"""
+
+import os
+import psycopg2
+
+def migrate_job_heartbeat_column():
+    """Add heartbeat_at column to job table"""
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL not found")
+        return False
+
+    # Handle postgres:// to postgresql:// conversion for newer versions
+    if database_url.startswith('postgres://'):
+        database_url = database_url.replace('postgres://', 'postgresql://', 1)
+
+    try:
+        conn = psycopg2.connect(database_url)
+        cur = conn.cursor()
+
+        print("🔄 Adding heartbeat_at column...")
+        cur.execute("ALTER TABLE job ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP;")
+        conn.commit()
+
+        print("✅ Job heartbeat migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        if 'conn' in locals():
+            conn.rollback()
+        return False
+    finally:
+        if 'cur' in locals():
+            cur.close()
+        if 'conn' in locals():
+            conn.close()
+
+if __name__ == "__main__":
+    print("=== Database Migration: Job Heartbeat ===")
+    migrate_job_heartbeat_column()
@@ -0,0 +1,47 @@
+"""
+Database migration to add segment_starts to video_transcript table
+Stores caption segment offsets/timestamps used for transcript chunking.
+Existing rows stay NULL and are chunked on sentence boundaries instead.
+
+Run with: python -m app.migrations.add_transcript_segments_column (backend klasöründen)
+"""
+
+import os
+import psycopg2
+
+def migrate_transcript_segments_column():
+    """Add segment_starts column to video_transcript table"""
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL not found")
+        return False
+
+    # Handle postgres:// to postgresql:// conversion for newer versions
+    if database_url.startswith('postgres://'):
+        database_url = database_url.replace('postgres://', 'postgresql://', 1)
+
+    try:
+        conn = psycopg2.connect(database_url)
+        cur = conn.cursor()
+
+        print("🔄 Adding segment_starts column...")
+        cur.execute("ALTER TABLE video_transcript ADD COLUMN IF NOT EXISTS segment_starts TEXT;")
+        conn.commit()
+
+        print("✅ Transcript segments migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        if 'conn' in locals():
+            conn.rollback()
+        return False
+    finally:
+        if 'cur' in locals():
+            cur.close()
+        if 'conn' in locals():
+            conn.close()
+
+if __name__ == "__main__":
+    print("=== Database Migration: Transcript Segments ===")
+    migrate_transcript_segments_column()
@@ -0,0 +1,95 @@
+"""
+Database migration to add the normalized video_id column to comment table
+Backfills existing rows in batches and creates the (video_id, posted_at) index
+
+Run with: python -m app.migrations.add_video_id_column (backend klasöründen)
+"""
+
+import os
+import psycopg2
+from psycopg2.extras import execute_values
+
+from ..utils import extract_video_id
+
+BATCH_SIZE = 1000
+
+def migrate_video_id_column():
+    """Add video_id column to comment table, backfill it and index it"""
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL not found")
+        return False
+
+    # Handle postgres:// to postgresql:// conversion for newer versions
+    if database_url.startswith('postgres://'):
+        database_url = database_url.replace('postgres://', 'postgresql://', 1)
+
+    try:
+        conn = psycopg2.connect(database_url)
+        cur = conn.cursor()
+
+        print("🔄 Adding video_id column...")
+        cur.execute("ALTER TABLE comment ADD COLUMN IF NOT EXISTS video_id VARCHAR(11);")
+        conn.commit()
+
+        # Mevcut kayıtları batch'ler halinde doldur (uzun süreli lock tutmamak için)
+        total = 0
+        last_id = ''
+        while True:
+            cur.execute(
+                """
+                SELECT id, video_url FROM comment
+                WHERE video_id IS NULL AND id > %s
+                ORDER BY id
+                LIMIT %s;
+                """,
+                (last_id, BATCH_SIZE)
+            )
+            rows = cur.fetchall()
+            if not rows:
+                break
+
+            last_id = rows[-1][0]
+            updates = []
+            for comment_id, video_url in rows:
+                video_id = extract_video_id(video_url)
+                if video_id:
+                    updates.append((comment_id, video_id))
+            if updates:
+                execute_values(
+                    cur,
+                    """
+                    UPDATE comment SET video_id = data.video_id
+                    FROM (VALUES %s) AS data (id, video_id)
+                    WHERE comment.id = data.id;
+                    """,
+                    updates
+                )
+            conn.commit()
+            total += len(updates)
+            print(f"  ↳ {total} rows backfilled")
+
+        print("🔄 Creating (video_id, posted_at) index...")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS ix_comment_video_id_posted_at "
+            "ON comment (video_id, posted_at);"
+        )
+        conn.commit()
+
+        print(f"✅ video_id migration completed successfully! ({total} rows backfilled)")
+        return True
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        if 'conn' in locals():
+            conn.rollback()
+        return False
+    finally:
+        if 'cur' in locals():
+            cur.close()
+        if 'conn' in locals():
+            conn.close()
+
+if __name__ == "__main__":
+    print("=== Database Migration: Add video_id Column ===")
+    migrate_video_id_column()
@@ -1,10 +1,15 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from ...core.config import Config
 import jwt
+import csv
 import datetime
+import io
+import json
+import zlib
 from functools import wraps
 from ...core.database import db
 from ..ads.models import Ad
+from ..ads.services import active_ads_snapshot
 
 # Blueprint'i /api/admin prefix'i ile oluştur
 admin_routes = Blueprint('admin', __name__, url_prefix='/api/admin')
@@ -144,6 +149,7 @@ def create_ad():
     )
     db.session.add(new_ad)
     db.session.commit()
+    active_ads_snapshot.invalidate()
     return jsonify({"status": "success", "message": "Ad created successfully.", "id": new_ad.id}), 201
 
 @admin_routes.route('/ads/<int:ad_id>', methods=['PUT'])
@@ -173,6 +179,7 @@ def update_ad(ad_id):
         ad.is_active = data['is_active']
     
     db.session.commit()
+    active_ads_snapshot.invalidate()
     return jsonify({"status": "success", "message": "Ad updated successfully."})
 
 @admin_routes.route('/ads/<int:ad_id>', methods=['DELETE'])
@@ -182,6 +189,7 @@ def delete_ad(ad_id):
     ad = Ad.query.get_or_404(ad_id)
     db.session.delete(ad)
     db.session.commit()
+    active_ads_snapshot.invalidate()
     return jsonify({"status": "success", "message": "Ad deleted successfully."})
 
 @admin_routes.route('/ads/<int:ad_id>/toggle', methods=['PUT'])
@@ -191,8 +199,129 @@ def toggle_ad(ad_id):
     ad = Ad.query.get_or_404(ad_id)
     ad.is_active = not ad.is_active
     db.session.commit()
+    active_ads_snapshot.invalidate()
     return jsonify({"status": "success", "message": f"Ad status changed to {'active' if ad.is_active else 'inactive'}."})
 
+# --- CACHE İSTATİSTİKLERİ ---
+@admin_routes.route('/cache-stats', methods=['GET'])
+@admin_required
+def cache_stats():
+    """Cache hit/miss sayaçlarını ve cache sayesinde atlanan YouTube API çağrılarını döndürür."""
+    from ...integrations.youtube.service import CACHE_NAMESPACES
+    from ...shared.cache import get_cache
+    stats = get_cache().stats()
+    # Sadece YouTube namespace'leri; bir videos.list çağrısı hem video_meta hem video_stats hit'i
+    # gerektirdiği için tek sayılır (transcript_chunk / generated_comment Gemini çağrılarıdır)
+    saved = {
+        method: min(stats['namespaces'].get(namespace, {}).get('hits', 0) for namespace in namespaces)
+        for method, namespaces in CACHE_NAMESPACES.items()
+    }
+    stats['youtube_calls_saved_by_method'] = saved
+    stats['youtube_calls_saved'] = sum(saved.values())
+    return jsonify({"status": "success", "cache": stats})
+
+# --- YOUTUBE QUOTA ---
+@admin_routes.route('/youtube-quota', methods=['GET'])
+@admin_required
+def youtube_quota():
+    """Günlük YouTube API quota bütçesini, harcanan ve kalan birimleri döndürür."""
+    from ...shared.quota import quota_budget
+    return jsonify({"status": "success", "quota": quota_budget.status()})
+
+# --- YORUM GEÇMİŞİ EXPORT ---
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+}
+
+def _parse_export_date(value, end=False):
+    """YYYY-MM-DD veya ISO datetime (UTC). Sadece tarih verilen 'until' o günü de kapsar."""
+    if not value:
+        return None
+    parsed = datetime.datetime.fromisoformat(value.rstrip('Z'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    if end and len(value) == 10:
+        parsed += datetime.timedelta(days=1)
+    return parsed
+
+def _export_lines(rows, export_format):
+    """Satırları NDJSON/CSV metin satırlarına çevirir (CSV'de önce başlık)"""
+    from ..comment.services import CommentService
+    if export_format == 'ndjson':
+        for row in rows:
+            yield json.dumps(row, ensure_ascii=False) + '\n'
+        return
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CommentService.EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    for row in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow([row[column] for column in CommentService.EXPORT_COLUMNS])
+        yield buffer.getvalue()
+
+def _export_chunks(lines, use_gzip):
+    """Satırları EXPORT_FLUSH_BYTES'lık parçalar halinde (isteğe bağlı gzip ile) yazar; ilk parça hemen gönderilir"""
+    compressor = zlib.compressobj(Config.EXPORT_GZIP_LEVEL, zlib.DEFLATED, 31) if use_gzip else None
+    pending, size, first = [], 0, True
+    for line in lines:
+        pending.append(line)
+        size += len(line)
+        if not first and size < Config.EXPORT_FLUSH_BYTES:
+            continue
+        data = ''.join(pending).encode('utf-8')
+        pending, size = [], 0
+        if compressor is not None:
+            # İlk parçada sync flush: gzip header'ı ve ilk satır beklemeden istemciye gider
+            data = compressor.compress(data) + (compressor.flush(zlib.Z_SYNC_FLUSH) if first else b'')
+        first = False
+        if data:
+            yield data
+    data = ''.join(pending).encode('utf-8')
+    if compressor is not None:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
+
+@admin_routes.route('/export/comments', methods=['GET'])
+@admin_required
+def export_comments():
+    """
+    Tüm yorum geçmişini en eskiden yeniye stream eder.
+    Query: format (ndjson/csv), since, until (YYYY-MM-DD veya ISO datetime), posted (true/false),
+    user_id, gzip (true/false). Bellek kullanımı tablo boyutundan bağımsızdır.
+    """
+    from ..comment.services import CommentService
+
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"status": "error", "message": "format must be 'ndjson' or 'csv'."}), 400
+    try:
+        since = _parse_export_date(request.args.get('since'))
+        until = _parse_export_date(request.args.get('until'), end=True)
+        user_id = int(request.args['user_id']) if request.args.get('user_id') else None
+    except ValueError:
+        return jsonify({"status": "error", "message": "since/until must be ISO dates and user_id an integer."}), 400
+    posted_arg = request.args.get('posted')
+    posted = None if posted_arg is None else posted_arg.lower() in ('1', 'true', 'yes')
+    use_gzip = request.args.get('gzip', 'false').lower() in ('1', 'true', 'yes')
+
+    rows = CommentService.iter_export_rows(since, until, posted, user_id, chunk_size=Config.EXPORT_FETCH_SIZE)
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    filename = f"comments-{datetime.datetime.utcnow():%Y%m%d-%H%M%S}.{extension}"
+    if use_gzip:
+        mimetype, filename = 'application/gzip', filename + '.gz'
+
+    # stream_with_context: sorgu yanıt yazılırken aynı app/DB session'ı üzerinde ilerler
+    return Response(stream_with_context(_export_chunks(_export_lines(rows, export_format), use_gzip)),
+                    mimetype=mimetype, headers={
+                        'Content-Disposition': f'attachment; filename="{filename}"',
+                        'Cache-Control': 'no-store',
+                        'X-Accel-Buffering': 'no'  # Proxy buffering'i kapat
+                    })
+
 # --- DATABASE MIGRATION ENDPOINT ---
 @admin_routes.route('/run-migration', methods=['POST'])
 @admin_required
@@ -202,6 +331,9 @@ def run_migration():
         # Import migration functions
         from ..migrations.add_created_at_column import migrate_database
         from ..migrations.update_user_table import migrate_user_table
+        from ..migrations.add_video_id_column import migrate_video_id_column
+        from ..migrations.add_history_indexes import migrate_history_indexes
+        from ..migrations.add_transcript_segments_column import migrate_transcript_segments_column
         
         output = []
         
@@ -215,6 +347,21 @@ def run_migration():
         result2 = migrate_user_table()
         output.append("✅ User table migration completed")
         
+        # Run Comment video_id migration
+        output.append("=== Running Comment video_id migration ===")
+        result3 = migrate_video_id_column()
+        output.append("✅ Comment video_id migration completed")
+        
+        # Run history index migration
+        output.append("=== Running history index migration ===")
+        result4 = migrate_history_indexes()
+        output.append("✅ History index migration completed")
+        
+        # Run transcript segments migration
+        output.append("=== Running transcript segments migration ===")
+        result5 = migrate_transcript_segments_column()
+        output.append("✅ Transcript segments migration completed")
+        
         output.append("🎉 All migrations completed successfully!")
         
         return jsonify({
@@ -0,0 +1,80 @@
+"""
+Ad services - versioned in-memory snapshot of active ads
+"""
+import hashlib
+import json
+import threading
+import time
+from typing import Dict, Optional
+
+from ...core.config import Config
+from .models import Ad
+
+
+class ActiveAdsSnapshot:
+    """
+    Active ads serialized once per version, grouped by position.
+    Admin writes call invalidate() so this worker rebuilds on the next read; other
+    workers pick up changes once their copy is older than max_age seconds.
+    """
+
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self._snapshot = None
+        self._built_at = 0.0
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._snapshot = None
+
+    def get(self, position: Optional[str] = None) -> Optional[Dict]:
+        """Returns {'body', 'etag', 'version'} for all active ads or a single position"""
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - self._built_at > self.max_age:
+            snapshot = self._rebuild()
+        if position is None:
+            return snapshot['all']
+        return snapshot['positions'].get(position) or snapshot['empty']
+
+    def _rebuild(self):
+        with self._lock:
+            # Başka bir thread bu sırada yeniden oluşturduysa onu kullan
+            if self._snapshot is not None and time.monotonic() - self._built_at <= self.max_age:
+                return self._snapshot
+
+            active_ads = Ad.query.filter_by(is_active=True).order_by(Ad.id.asc()).all()
+            items = [
+                {
+                    "id": ad.id,
+                    "content": ad.content,
+                    "link_url": ad.link_url,
+                    "position": ad.position
+                } for ad in active_ads
+            ]
+
+            grouped = {}
+            for item in items:
+                grouped.setdefault(item['position'], []).append(item)
+
+            self._version += 1
+            self._snapshot = {
+                'all': self._entry(items),
+                'positions': {position: self._entry(group) for position, group in grouped.items()},
+                'empty': self._entry([])
+            }
+            self._built_at = time.monotonic()
+            return self._snapshot
+
+    def _entry(self, items):
+        body = json.dumps(items, ensure_ascii=False)
+        # İçerik hash'i: aynı reklamlar tüm worker'larda aynı (strong) ETag'i üretir
+        return {
+            'body': body,
+            'etag': hashlib.sha256(body.encode('utf-8')).hexdigest()[:32],
+            'version': self._version
+        }
+
+
+active_ads_snapshot = ActiveAdsSnapshot(Config.ADS_SNAPSHOT_MAX_AGE)
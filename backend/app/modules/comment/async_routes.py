@@ -0,0 +1,294 @@
+"""
+Async (Starlette) versions of /api/generate_comment, /api/post_comment and /api/history.
+
+YouTube and Gemini calls are awaited on httpx / generate_content_async, so a worker holds
+many in-flight generations on one event loop. Validation, database work and the transcript
+stage reuse the Flask code and run in worker threads through the FlaskBridge (app/asgi.py).
+"""
+import asyncio
+import functools
+import json
+import time
+
+from flask import jsonify
+from starlette.requests import Request
+from starlette.routing import Route
+
+from ...core.config import Config
+from ...core.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_PROGRESS, set_endpoint
+from ...integrations.gemini.service import generate_comment_text_async
+from ...integrations.translation.service import get_message
+from ...shared.cache import AsyncSingleFlight, get_cache
+from ...shared.quota import quota_budget
+from ...utils import extract_video_id
+from ..user.services import get_user_id
+from .routes import (
+    _ai_error, _post_error, _validate_generate_request, _validate_post_request, _video_error,
+    get_history_route
+)
+from .services import GENERATE_REQUESTS, CommentGenerationService, CommentService, TranscriptService
+
+# Flask tarafındaki _generate_flight'ın event loop karşılığı
+_generate_flight = AsyncSingleFlight()
+
+
+def _instrumented(endpoint):
+    """Flask'taki init_metrics hook'larının karşılığı: süre, in-progress ve endpoint etiketi"""
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(request: Request):
+            start = time.perf_counter()
+            # Her istek kendi task context'inde çalışır; etiket thread'lere de kopyalanır
+            set_endpoint(endpoint)
+            HTTP_REQUESTS_IN_PROGRESS.inc()
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            finally:
+                HTTP_REQUESTS_IN_PROGRESS.dec()
+                HTTP_REQUEST_DURATION.observe(
+                    time.perf_counter() - start, method=request.method, endpoint=endpoint, status=status)
+        return wrapper
+    return decorator
+
+
+async def _read_json(request: Request):
+    body = await request.body()
+    try:
+        return json.loads(body) if body else None
+    except ValueError:
+        return None
+
+
+async def _gather_video_context(request: Request, video_url: str, language: str):
+    """CommentGenerationService.gather_video_context'in async karşılığı: (context, error)"""
+    bridge = request.app.state.bridge
+    youtube = request.app.state.youtube
+    video_id = extract_video_id(video_url)
+    call_timeout = Config.ENRICHMENT_CALL_TIMEOUT
+
+    # Bütçe azaldıysa isteğe bağlı YouTube çağrıları (kanal, yorumlar) atlanır
+    optional_allowed = await bridge.offload(quota_budget.allows_optional)
+
+    async def details_and_channel():
+        details, error = await youtube.get_video_details(video_url)
+        if error or not details:
+            return None, error or "Video detayları alınamadı"
+        if details.get('channel_id') and optional_allowed:
+            try:
+                channel_stats, _ = await asyncio.wait_for(youtube.get_channel_details(details['channel_id']), call_timeout)
+            except asyncio.TimeoutError:
+                channel_stats = None
+            if channel_stats:
+                details = {**details, **channel_stats}
+        return details, None
+
+    async def existing_comments():
+        if not (video_id and optional_allowed):
+            return []
+        comments, error = await youtube.get_video_comments(video_id, max_results=10)
+        return comments if not error else []
+
+    async def transcript_summary():
+        # Transcript kazıma ve (map-reduce) özet senkron kalır; event loop yerine thread'de çalışır
+        if not video_id:
+            return None
+        transcript, error = await bridge.offload(TranscriptService.get_transcript, video_id, language)
+        if error or not transcript:
+            return None
+        if transcript['summary']:
+            return transcript['summary']
+        summary, error = await bridge.offload(TranscriptService.summarize, video_id, language, transcript,
+                                              deadline=time.monotonic() + Config.ENRICHMENT_SUMMARY_TIMEOUT)
+        return summary if not error else None
+
+    async def optional(coro, timeout, default):
+        try:
+            return await asyncio.wait_for(coro, timeout)
+        except Exception as e:
+            print(f"Async enrichment stage failed: {e}")
+            return default
+
+    details_result, comments, summary = await asyncio.gather(
+        asyncio.wait_for(details_and_channel(), call_timeout * 2),
+        optional(existing_comments(), call_timeout, []),
+        optional(transcript_summary(), call_timeout + Config.ENRICHMENT_SUMMARY_TIMEOUT, None),
+        return_exceptions=True
+    )
+
+    if isinstance(details_result, BaseException):
+        return None, "Video detayları zaman aşımına uğradı" if isinstance(details_result, asyncio.TimeoutError) else str(details_result)
+    details, error = details_result
+    if error:
+        return None, error
+
+    return {
+        'details': details,
+        'existing_comments': comments if isinstance(comments, list) else [],
+        'transcript_summary': summary if isinstance(summary, str) else None
+    }, None
+
+
+@_instrumented('asgi.generate_comment')
+async def generate_comment(request: Request):
+    """Async /api/generate_comment - same request/response contract as the Flask route"""
+    bridge = request.app.state.bridge
+    data = await _read_json(request)
+
+    def prepare():
+        body, interface_lang, error_response = _validate_generate_request(data)
+        if error_response:
+            return None, interface_lang, bridge.app.make_response(error_response), None
+        return body, interface_lang, None, get_user_id()
+
+    (body, interface_lang, error_response, user_id), cookies = await bridge.run(request, prepare)
+    if error_response is not None:
+        return bridge.to_response(error_response, cookies)
+
+    # Duplicate yorum kontrolü (generate etmeden önce uyar)
+    if await bridge.offload(CommentService.check_duplicate_comment, body.video_url):
+        comment_count = await bridge.offload(CommentService.get_video_comment_count, body.video_url)
+        return bridge.json({
+            "status": "warning",
+            "message": get_message(interface_lang, 'duplicate_warning', count=comment_count),
+            "message_key": "duplicate_warning",
+            "comment_count": comment_count,
+            "can_generate": True,
+            "can_post": False,
+            "user_friendly": True
+        }, 200, cookies)
+
+    comment_text, error_stage, error, reused = await _generate_shared(request, body)
+    if error_stage == 'system':
+        return bridge.json({
+            "status": "error",
+            "message": get_message(interface_lang, 'system_error', error=error),
+            "message_key": "system_error",
+            "technical_error": error,
+            "user_friendly": True
+        }, 500, cookies)
+    if error_stage == 'video':
+        return bridge.json({
+            "status": "error",
+            **_video_error(interface_lang, error),
+            "technical_error": error,
+            "user_friendly": True
+        }, 500, cookies)
+    if error_stage == 'ai':
+        return bridge.json({
+            "status": "error",
+            **_ai_error(interface_lang, error),
+            "technical_error": error,
+            "user_friendly": True
+        }, 500, cookies)
+
+    comment_id = await bridge.offload(CommentService.add_generated_comment, body.video_url, comment_text, user_id=user_id)
+
+    return bridge.json({
+        "status": "success",
+        "generated_text": comment_text,
+        "comment_id": comment_id,
+        "cached": reused,
+        "can_post": True
+    }, 200, cookies)
+
+
+async def _generate_shared(request: Request, body):
+    """CommentGenerationService.generate_shared'in async karşılığı: (text, error_stage, error, reused)"""
+    bridge = request.app.state.bridge
+    key = CommentGenerationService.generation_key(body.video_url, body.language, body.comment_style)
+
+    if body.fresh:
+        GENERATE_REQUESTS.inc(source='fresh')
+        return await _run_generation(request, body, key) + (False,)
+
+    hit, comment_text = await bridge.offload(get_cache().get, 'generated_comment', key)
+    if hit:
+        GENERATE_REQUESTS.inc(source='cache')
+        return comment_text, None, None, True
+
+    result, shared = await _generate_flight.do(key, _run_generation, request, body, key)
+    GENERATE_REQUESTS.inc(source='coalesced' if shared else 'pipeline')
+    return result + (shared,)
+
+
+async def _run_generation(request: Request, body, key):
+    try:
+        context, error = await _gather_video_context(request, body.video_url, body.language)
+    except Exception as e:
+        return None, 'system', str(e)
+    if error:
+        return None, 'video', error
+
+    comment_text, error = await generate_comment_text_async(
+        context['details'], body.comment_style, body.language,
+        context['existing_comments'], context['transcript_summary']
+    )
+    if error:
+        return None, 'ai', error if isinstance(error, str) else comment_text
+
+    await request.app.state.bridge.offload(get_cache().set, 'generated_comment', key, comment_text)
+    return comment_text, None, None
+
+
+@_instrumented('asgi.post_comment')
+async def post_comment(request: Request):
+    """Async /api/post_comment - same request/response contract as the Flask route"""
+    bridge = request.app.state.bridge
+    data = await _read_json(request)
+
+    def prepare():
+        # Doğrulama ve duplicate kontrolü Flask route'uyla ortak
+        body, video_id, interface_lang, error_response = _validate_post_request(data)
+        if error_response:
+            return None, *error_response
+        return (body, video_id, interface_lang, get_user_id()), None, None
+
+    (prepared, error_response, status), cookies = await bridge.run(request, lambda: _with_status(bridge, prepare))
+    if error_response is not None:
+        return bridge.to_response(error_response, cookies)
+    body, video_id, interface_lang, user_id = prepared
+
+    response, error = await request.app.state.youtube.post_comment(video_id, body.comment_text)
+    if error:
+        return bridge.json({
+            "status": "error",
+            **_post_error(interface_lang, error),
+            "technical_error": error,
+            "user_friendly": True
+        }, 500, cookies)
+
+    if body.comment_id:
+        await bridge.offload(CommentService.mark_comment_as_posted, body.comment_id)
+    else:
+        await bridge.offload(CommentService.add_posted_comment, body.video_url, body.comment_text, user_id=user_id)
+
+    return bridge.json({
+        "status": "success",
+        "message": get_message(interface_lang, 'comment_posted_success'),
+        "message_key": "comment_posted_success",
+        "data": response
+    }, 200, cookies)
+
+
+def _with_status(bridge, prepare):
+    """prepare()'in (değer, jsonify, status) sonucunu Flask response'a çevirir"""
+    value, error_response, status = prepare()
+    if error_response is not None:
+        return None, bridge.app.make_response((error_response, status)), status
+    return value, None, None
+
+
+@_instrumented('asgi.history')
+async def history(request: Request):
+    """History sadece veritabanı işi yapar: Flask view'i (ETag/304 dahil) thread'de çalıştırılır"""
+    return await request.app.state.bridge.call_view(request, get_history_route)
+
+
+routes = [
+    Route('/api/generate_comment', generate_comment, methods=['POST']),
+    Route('/api/post_comment', post_comment, methods=['POST']),
+    Route('/api/history', history, methods=['GET']),
+]
@@ -1,12 +1,47 @@
 # Comment model
 from ...core.database import db
+from datetime import datetime
 
 class Comment(db.Model):
     id = db.Column(db.String(36), primary_key=True)
     text = db.Column(db.Text, nullable=False)
     video_url = db.Column(db.String(255), nullable=False)
+    # Normalize edilmiş YouTube video ID'si - duplicate kontrolleri için indexli
+    video_id = db.Column(db.String(11), nullable=True)
     created_at = db.Column(db.DateTime, nullable=False)
     posted_at = db.Column(db.DateTime, nullable=True)  # Nullable - henüz gönderilmemiş olabilir
 
     # Kullanıcı ile ilişki (Foreign Key) - Production için nullable
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True, default=1)
\ No newline at end of file
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True, default=1)
+
+    __table_args__ = (
+        db.Index('ix_comment_video_id_posted_at', 'video_id', 'posted_at'),
+        # History keyset pagination ve filtreleri için
+        db.Index('ix_comment_created_at_id', 'created_at', 'id'),
+        db.Index('ix_comment_posted_at', 'posted_at'),
+        db.Index('ix_comment_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+    )
+
+
+class VideoTranscript(db.Model):
+    """Videonun ham transcript'i - transcript'ler değişmediği için video_id başına bir kez çekilir"""
+    video_id = db.Column(db.String(11), primary_key=True)
+    text = db.Column(db.Text, nullable=False)
+    text_hash = db.Column(db.String(64), nullable=False)
+    # Altyazı parçaları (JSON): [[text içindeki karakter offset'i, başlangıç saniyesi, süre], ...]
+    segment_starts = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class TranscriptSummary(db.Model):
+    """Gemini transcript özeti - sadece (video_id, language, transcript_hash) üçlüsüne bağlıdır"""
+    id = db.Column(db.Integer, primary_key=True)
+    video_id = db.Column(db.String(11), nullable=False)
+    language = db.Column(db.String(32), nullable=False)
+    transcript_hash = db.Column(db.String(64), nullable=False)
+    summary = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('video_id', 'language', 'transcript_hash', name='uq_transcript_summary_video_language_hash'),
+    )
@@ -1,12 +1,16 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from pydantic import BaseModel, Field
 from flask_pydantic import validate
-from typing import Literal, Optional
-from ...integrations.youtube.service import get_video_details, post_youtube_comment, get_video_comments, get_channel_details, get_video_transcript
-from ...integrations.gemini.service import generate_comment_text, summarize_transcript
+from typing import List, Literal, Optional
+from ...integrations.youtube.service import post_youtube_comment
+from ...integrations.gemini.service import stream_comment_text
 from ...integrations.translation.service import get_message
+from ...core.config import Config
+from ...utils import extract_video_id
+from ..user.services import get_user_id
 from .services import CommentService, CommentGenerationService
-import re
+import hashlib
+import json
 
 
 comment_routes = Blueprint('comment', __name__)
@@ -16,6 +20,14 @@ class GenerateCommentRequest(BaseModel):
     video_url: str = Field(..., min_length=15, description="YouTube video URL'si")
     language: Literal['Turkish', 'English', 'Russian', 'Chinese', 'Japanese']
     comment_style: str
+    fresh: bool = Field(default=False, description="Skip the shared result cache and generate a new variation")
+    interface_language: Optional[str] = Field(default='tr', description="Interface language for error messages")
+
+class BatchGenerateRequest(BaseModel):
+    video_urls: List[str] = Field(..., min_length=1, max_length=Config.BATCH_MAX_ITEMS)
+    language: Literal['Turkish', 'English', 'Russian', 'Chinese', 'Japanese']
+    comment_style: str = 'default'
+    include_comments: bool = Field(default=True, description="Fetch existing top comments per video (1 quota unit each)")
     interface_language: Optional[str] = Field(default='tr', description="Interface language for error messages")
 
 class PostCommentRequest(BaseModel):
@@ -24,225 +36,370 @@ class PostCommentRequest(BaseModel):
     comment_id: Optional[str] = Field(default=None, description="Generated comment ID if available")
     interface_language: Optional[str] = Field(default='tr', description="Interface language for error messages")
 
-@comment_routes.route('/api/generate_comment', methods=['POST'])
-def generate_comment_route():
-    """Generate comment with detailed error handling."""
-    from flask import request
-    
-    # Manuel validation with detailed error info
-    data = request.get_json()
-    
+# --- ORTAK YARDIMCI FONKSİYONLAR ---
+def _validate_generate_request(data):
+    """Generate isteğini doğrular: (body, interface_lang, error_response) döndürür."""
     # Get interface language for error messages
     interface_lang = data.get('interface_language', 'tr') if data else 'tr'
     
     if not data:
-        return jsonify({
+        return None, interface_lang, (jsonify({
             "status": "error", 
             "message": get_message(interface_lang, 'no_data_sent'),
+            "message_key": "no_data_sent",
             "user_friendly": True
-        }), 400
+        }), 400)
     
     # Validate required fields
-    if 'video_url' not in data:
-        return jsonify({
-            "status": "error", 
-            "message": get_message(interface_lang, 'missing_video_url'),
-            "user_friendly": True
-        }), 400
-    if 'language' not in data:
-        return jsonify({
-            "status": "error", 
-            "message": get_message(interface_lang, 'missing_language'),
-            "user_friendly": True
-        }), 400
-    if 'comment_style' not in data:
-        return jsonify({
-            "status": "error", 
-            "message": get_message(interface_lang, 'missing_comment_style'),
-            "user_friendly": True
-        }), 400
+    for field, message_key in (('video_url', 'missing_video_url'),
+                               ('language', 'missing_language'),
+                               ('comment_style', 'missing_comment_style')):
+        if field not in data:
+            return None, interface_lang, (jsonify({
+                "status": "error", 
+                "message": get_message(interface_lang, message_key),
+                "message_key": message_key,
+                "user_friendly": True
+            }), 400)
         
     # Create validated object
     try:
         body = GenerateCommentRequest(
             video_url=data['video_url'],
             language=data['language'], 
-            comment_style=data['comment_style']
+            comment_style=data['comment_style'],
+            fresh=data.get('fresh', False)
         )
     except Exception as validation_error:
-        return jsonify({
+        return None, interface_lang, (jsonify({
             "status": "error", 
             "message": get_message(interface_lang, 'form_validation_error', error=str(validation_error)),
+            "message_key": "form_validation_error",
             "technical_error": str(validation_error),
             "user_friendly": True
-        }), 400
+        }), 400)
     
+    return body, interface_lang, None
+
+def _validate_post_request(data):
+    """Post isteğini doğrular: (body, video_id, interface_lang, error_response) döndürür."""
+    interface_lang = data.get('interface_language', 'tr') if data else 'tr'
+    
+    if not data:
+        return None, None, interface_lang, (jsonify({
+            "status": "error", 
+            "message": get_message(interface_lang, 'no_data_sent'),
+            "message_key": "no_data_sent",
+            "user_friendly": True
+        }), 400)
+    
+    # Validate required fields
+    if 'video_url' not in data or 'comment_text' not in data:
+        return None, None, interface_lang, (jsonify({
+            "status": "error", 
+            "message": get_message(interface_lang, 'missing_comment_data'),
+            "message_key": "missing_comment_data",
+            "user_friendly": True
+        }), 400)
+        
+    # Create validated object (comment_id sadece varsa ve None değilse eklenir)
     try:
-        # 1. Video detaylarını ve istatistiklerini çek
-        details, error = get_video_details(body.video_url)
-        if error:
-            if "not found" in error.lower():
-                message = get_message(interface_lang, 'video_details_failed') + "\n\n" + get_message(interface_lang, 'video_not_found')
-            elif "private" in error.lower():
-                message = get_message(interface_lang, 'video_details_failed') + "\n\n" + get_message(interface_lang, 'video_private')
-            else:
-                message = get_message(interface_lang, 'video_details_failed') + "\n\n" + get_message(interface_lang, 'video_generic_error', error=error)
-                
-            return jsonify({
-                "status": "error", 
-                "message": message,
-                "technical_error": error,
-                "user_friendly": True
-            }), 500
-    except Exception as e:
-        return jsonify({
+        request_data = {
+            'video_url': data['video_url'],
+            'comment_text': data['comment_text']
+        }
+        if data.get('comment_id') is not None:
+            request_data['comment_id'] = data['comment_id']
+        body = PostCommentRequest(**request_data)
+    except Exception as validation_error:
+        return None, None, interface_lang, (jsonify({
             "status": "error", 
-            "message": get_message(interface_lang, 'system_error', error=str(e)),
-            "technical_error": str(e),
+            "message": get_message(interface_lang, 'form_validation_error', error=str(validation_error)),
+            "message_key": "form_validation_error",
+            "technical_error": str(validation_error),
             "user_friendly": True
-        }), 500
-
-    # 2. Kanal istatistiklerini çek
-    if details and details.get('channel_id'):
-        channel_stats, error = get_channel_details(details['channel_id'])
-        if channel_stats:
-            details.update(channel_stats) # Kanal istatistiklerini ana 'details' sözlüğüne ekle
-
-    # 3. Video ID'sini çıkar
-    video_id_match = re.search(r"(?<=v=)[^&#]+", body.video_url) or re.search(r"(?<=be/)[^&#]+", body.video_url)
-    video_id = video_id_match.group(0) if video_id_match else None
+        }), 400)
     
-    # 4. Mevcut yorumları çek
-    existing_comments = []
-    if video_id:
-        existing_comments, _ = get_video_comments(video_id, max_results=10)
+    # Duplicate yorum kontrolü
+    if CommentService.check_duplicate_comment(body.video_url):
+        comment_count = CommentService.get_video_comment_count(body.video_url)
+        return None, None, interface_lang, (jsonify({
+            "status": "error", 
+            "message": get_message(interface_lang, 'duplicate_error', count=comment_count),
+            "message_key": "duplicate_error",
+            "comment_count": comment_count,
+            "user_friendly": True
+        }), 409)
+
+    video_id = extract_video_id(body.video_url)
+    if not video_id:
+        return None, None, interface_lang, (jsonify({
+            "status": "error", 
+            "message": get_message(interface_lang, 'invalid_youtube_url'),
+            "message_key": "invalid_youtube_url",
+            "user_friendly": True
+        }), 400)
     
-    # 5. Video transcript'ini çek ve özetle
-    transcript_summary = None
-    if video_id:
-        transcript_text, transcript_error = get_video_transcript(video_id)
-        if transcript_text and not transcript_error:
-            transcript_summary, summary_error = summarize_transcript(transcript_text, body.language)
-            if summary_error:
-                transcript_summary = None
+    return body, video_id, interface_lang, None
+
+def _error_fields(interface_lang, message_key, detail_key, **kwargs):
+    """Başlık + detay mesajını ve frontend bundle'ı için iki anahtarı döndürür."""
+    return {
+        "message": get_message(interface_lang, message_key) + "\n\n" + get_message(interface_lang, detail_key, **kwargs),
+        "message_key": message_key,
+        "detail_key": detail_key
+    }
+
+def _video_error(interface_lang, error):
+    """Video detayı hatasını kullanıcı dostu mesaja çevirir."""
+    if "not found" in error.lower():
+        return _error_fields(interface_lang, 'video_details_failed', 'video_not_found')
+    if "private" in error.lower():
+        return _error_fields(interface_lang, 'video_details_failed', 'video_private')
+    return _error_fields(interface_lang, 'video_details_failed', 'video_generic_error', error=error)
 
-    # 6. Duplicate yorum kontrolü (generate etmeden önce uyar)
+def _ai_error(interface_lang, error):
+    """Gemini hatasını kullanıcı dostu mesaja çevirir."""
+    if "api key" in error.lower():
+        return _error_fields(interface_lang, 'ai_generation_failed', 'ai_api_key_error')
+    if "quota" in error.lower() or "limit" in error.lower():
+        return _error_fields(interface_lang, 'ai_generation_failed', 'ai_quota_error')
+    if "network" in error.lower() or "connection" in error.lower():
+        return _error_fields(interface_lang, 'ai_generation_failed', 'ai_network_error')
+    return _error_fields(interface_lang, 'ai_generation_failed', 'ai_generic_error', error=error)
+
+def _post_error(interface_lang, error):
+    """YouTube yorum gönderme hatasını kullanıcı dostu mesaja çevirir."""
+    if "permission" in error.lower() or "forbidden" in error.lower():
+        return _error_fields(interface_lang, 'youtube_post_failed', 'youtube_permission_error')
+    if "quota" in error.lower() or "limit" in error.lower():
+        return _error_fields(interface_lang, 'youtube_post_failed', 'youtube_quota_error')
+    if "not found" in error.lower():
+        return _error_fields(interface_lang, 'youtube_post_failed', 'youtube_not_found_error')
+    return _error_fields(interface_lang, 'youtube_post_failed', 'youtube_generic_error', error=error)
+
+@comment_routes.route('/api/generate_comment', methods=['POST'])
+def generate_comment_route():
+    """Generate comment with detailed error handling."""
+    # Manuel validation with detailed error info
+    body, interface_lang, error_response = _validate_generate_request(request.get_json())
+    if error_response:
+        return error_response
+    
+    # 1. Duplicate yorum kontrolü (generate etmeden önce uyar)
     if CommentService.check_duplicate_comment(body.video_url):
         comment_count = CommentService.get_video_comment_count(body.video_url)
         return jsonify({
             "status": "warning", 
             "message": get_message(interface_lang, 'duplicate_warning', count=comment_count),
+            "message_key": "duplicate_warning",
             "comment_count": comment_count,
             "can_generate": True,
             "can_post": False,
             "user_friendly": True
         }), 200
 
-    # 7. Tüm verilerle Gemini'den yorum üret (transcript özeti dahil)
-    comment_text, error = generate_comment_text(details, body.comment_style, body.language, existing_comments, transcript_summary)
-    if error:
-        if "api key" in error.lower():
-            message = get_message(interface_lang, 'ai_generation_failed') + "\n\n" + get_message(interface_lang, 'ai_api_key_error')
-        elif "quota" in error.lower() or "limit" in error.lower():
-            message = get_message(interface_lang, 'ai_generation_failed') + "\n\n" + get_message(interface_lang, 'ai_quota_error')
-        elif "network" in error.lower() or "connection" in error.lower():
-            message = get_message(interface_lang, 'ai_generation_failed') + "\n\n" + get_message(interface_lang, 'ai_network_error')
-        else:
-            message = get_message(interface_lang, 'ai_generation_failed') + "\n\n" + get_message(interface_lang, 'ai_generic_error', error=error)
-        
+    # 2. Video bağlamı + Gemini; aynı istekler son sonucu veya devam eden çalıştırmayı paylaşır
+    comment_text, error_stage, error, reused = CommentGenerationService.generate_shared(
+        body.video_url, body.language, body.comment_style, fresh=body.fresh
+    )
+    if error_stage == 'system':
+        return jsonify({
+            "status": "error", 
+            "message": get_message(interface_lang, 'system_error', error=error),
+            "message_key": "system_error",
+            "technical_error": error,
+            "user_friendly": True
+        }), 500
+    if error_stage == 'video':
+        return jsonify({
+            "status": "error", 
+            **_video_error(interface_lang, error),
+            "technical_error": error,
+            "user_friendly": True
+        }), 500
+    if error_stage == 'ai':
         return jsonify({
             "status": "error", 
-            "message": message,
+            **_ai_error(interface_lang, error),
             "technical_error": error,
             "user_friendly": True
         }), 500
     
-    # 8. Generate edilen yorumu history'e kaydet
+    # 3. Generate edilen yorumu history'e kaydet (paylaşılan sonuçta da her istek kendi kaydını alır)
     comment_id = CommentService.add_generated_comment(body.video_url, comment_text)
     
     return jsonify({
         "status": "success",
         "generated_text": comment_text,
         "comment_id": comment_id,
+        "cached": reused,
         "can_post": True
     })
 
-@comment_routes.route('/api/post_comment', methods=['POST'])
-def post_comment_route():
-    from flask import request
+def _sse(event, data):
+    """Server-sent event formatında tek bir mesaj üretir."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _sse_response(events):
+    return Response(events, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Proxy buffering'i kapat
+    })
+
+@comment_routes.route('/api/generate_comment/stream', methods=['GET', 'POST'])
+def generate_comment_stream_route():
+    """
+    Streaming generate (server-sent events).
+    Events: start, stage (details/channel/comments/summary), token, then done, warning or error.
+    GET query parametreleri EventSource ile kullanım içindir.
+    SSE isteyen istemcilere (GET veya Accept: text/event-stream) doğrulama hataları ve duplicate
+    uyarısı da tek bir error/warning event'i olarak (HTTP 200) gönderilir; EventSource 4xx gövdelerini okuyamaz.
+    Diğer POST istemcileri bunları /api/generate_comment'teki gibi JSON olarak alır.
+    """
+    data = request.get_json(silent=True) if request.method == 'POST' else request.args.to_dict()
+    wants_sse = request.method == 'GET' or 'text/event-stream' in request.accept_mimetypes.values()
+    body, interface_lang, error_response = _validate_generate_request(data)
+    if error_response:
+        if wants_sse:
+            return _sse_response([_sse('error', error_response[0].get_json())])
+        return error_response
     
-    # Manuel validation
-    data = request.get_json()
-    if not data:
-        return jsonify({
-            "status": "error", 
-            "message": "📡 Veri gönderilmedi!",
+    # Duplicate kontrolü indexli ve ucuz; pipeline başlamadan önce yapılır
+    if CommentService.check_duplicate_comment(body.video_url):
+        comment_count = CommentService.get_video_comment_count(body.video_url)
+        warning = {
+            "status": "warning", 
+            "message": get_message(interface_lang, 'duplicate_warning', count=comment_count),
+            "message_key": "duplicate_warning",
+            "comment_count": comment_count,
+            "can_generate": True,
+            "can_post": False,
             "user_friendly": True
-        }), 400
+        }
+        if wants_sse:
+            return _sse_response([_sse('warning', warning)])
+        return jsonify(warning), 200
     
-    # Validate required fields
-    if 'video_url' not in data or 'comment_text' not in data:
+    # Session cookie'si response başlamadan ayarlanmalı; kullanıcı burada çözülür
+    user_id = get_user_id()
+    
+    def generate():
+        yield _sse('start', {"stages": ['details', 'channel', 'comments', 'summary']})
+        
+        details, channel_stats = None, None
+        existing_comments, transcript_summary = [], None
+        try:
+            for stage, result in CommentGenerationService.iter_video_context(body.video_url, body.language):
+                if stage == 'details':
+                    details, error = result
+                    if error:
+                        yield _sse('error', {
+                            "status": "error",
+                            **_video_error(interface_lang, error),
+                            "technical_error": error,
+                            "user_friendly": True
+                        })
+                        return
+                elif stage == 'channel':
+                    channel_stats = result
+                elif stage == 'comments':
+                    existing_comments = result or []
+                elif stage == 'summary':
+                    transcript_summary = result
+                yield _sse('stage', {"stage": stage, "ok": stage == 'details' or result is not None})
+        except Exception as e:
+            yield _sse('error', {
+                "status": "error",
+                "message": get_message(interface_lang, 'system_error', error=str(e)),
+                "message_key": "system_error",
+                "technical_error": str(e),
+                "user_friendly": True
+            })
+            return
+        
+        if channel_stats:
+            details.update(channel_stats)
+        
+        # Gemini token'larını geldikçe ilet
+        parts = []
+        for chunk, error in stream_comment_text(details, body.comment_style, body.language, existing_comments, transcript_summary):
+            if error:
+                yield _sse('error', {
+                    "status": "error",
+                    **_ai_error(interface_lang, error),
+                    "technical_error": error,
+                    "user_friendly": True
+                })
+                return
+            parts.append(chunk)
+            yield _sse('token', {"text": chunk})
+        
+        comment_text = "".join(parts)
+        comment_id = CommentService.add_generated_comment(body.video_url, comment_text, user_id=user_id)
+        yield _sse('done', {
+            "status": "success",
+            "generated_text": comment_text,
+            "comment_id": comment_id,
+            "can_post": True
+        })
+    
+    return _sse_response(stream_with_context(generate()))
+
+@comment_routes.route('/api/generate_comments/batch', methods=['POST'])
+def generate_comments_batch_route():
+    """Generate comments for a list of videos; every item carries its own status."""
+    data = request.get_json(silent=True)
+    interface_lang = data.get('interface_language', 'tr') if isinstance(data, dict) else 'tr'
+    if not data:
         return jsonify({
             "status": "error", 
-            "message": "📝 Eksik bilgi! Video URL'si ve yorum metni gerekli.",
+            "message": get_message(interface_lang, 'no_data_sent'),
+            "message_key": "no_data_sent",
             "user_friendly": True
         }), 400
-        
-    # Create validated object
+    
     try:
-        # comment_id'yi sadece varsa ekle
-        request_data = {
-            'video_url': data['video_url'],
-            'comment_text': data['comment_text']
-        }
-        
-        # comment_id varsa ve None değilse ekle
-        if 'comment_id' in data and data['comment_id'] is not None:
-            request_data['comment_id'] = data['comment_id']
-            
-        body = PostCommentRequest(**request_data)
+        body = BatchGenerateRequest(**data)
     except Exception as validation_error:
         return jsonify({
             "status": "error", 
-            "message": f"📋 Form bilgileri hatalı! {str(validation_error)}",
+            "message": get_message(interface_lang, 'form_validation_error', error=str(validation_error)),
+            "message_key": "form_validation_error",
+            "technical_error": str(validation_error),
             "user_friendly": True
         }), 400
-    # Duplicate yorum kontrolü
-    if CommentService.check_duplicate_comment(body.video_url):
-        comment_count = CommentService.get_video_comment_count(body.video_url)
-        return jsonify({
-            "status": "error", 
-            "message": f"🚫 Yorum gönderilemedi!\n\nBu videoya daha önce {comment_count} kez yorum gönderildi. Sistem güvenliği ve spam önleme politikası gereği aynı videoya birden fazla yorum gönderilmesine izin verilmiyor.\n\n💡 Başka bir videoyu deneyin veya daha önce yorum yapmadığınız bir video seçin.",
-            "comment_count": comment_count,
-            "user_friendly": True
-        }), 409
+    
+    results = CommentGenerationService.generate_batch(
+        body.video_urls,
+        body.language,
+        body.comment_style,
+        include_comments=body.include_comments,
+        user_id=get_user_id()
+    )
+    
+    counts = {"success": 0, "warning": 0, "error": 0}
+    for result in results:
+        counts[result['status']] += 1
+    
+    return jsonify({
+        "status": "success",
+        "results": results,
+        "summary": counts
+    })
 
-    video_id_match = re.search(r"(?<=v=)[^&#]+", body.video_url) or re.search(r"(?<=be/)[^&#]+", body.video_url)
-    if not video_id_match:
-        return jsonify({
-            "status": "error", 
-            "message": "🔗 Geçersiz YouTube URL!\n\nLütfen geçerli bir YouTube video linki girin. Örnek formatlar:\n• https://www.youtube.com/watch?v=VIDEO_ID\n• https://youtu.be/VIDEO_ID\n\n💡 Linki kopyalarken tamamını seçtiğinizden emin olun.",
-            "user_friendly": True
-        }), 400
-    video_id = video_id_match.group(0)
+@comment_routes.route('/api/post_comment', methods=['POST'])
+def post_comment_route():
+    data = request.get_json()
+    body, video_id, interface_lang, error_response = _validate_post_request(data)
+    if error_response:
+        return error_response
 
     response, error = post_youtube_comment(video_id, body.comment_text)
     if error:
-        # Hata mesajını kullanıcı dostu hale getir
-        user_friendly_message = "🚫 Yorum gönderilirken hata oluştu!\n\n"
-        
-        if "permission" in error.lower() or "forbidden" in error.lower():
-            user_friendly_message += "📝 Yorum gönderme izniniz yok. Bu durum şu sebeplerden olabilir:\n• YouTube hesabınız yorum yapma kısıtlamasına sahip\n• Video sahibi yorumları devre dışı bırakmış\n• Hesabınız henüz doğrulanmamış\n\n💡 YouTube hesabınızı kontrol edin ve daha sonra tekrar deneyin."
-        elif "quota" in error.lower() or "limit" in error.lower():
-            user_friendly_message += "⏰ API limit aşıldı. Sistem geçici olarak yoğun.\n\n💡 Birkaç dakika bekledikten sonra tekrar deneyin."
-        elif "not found" in error.lower():
-            user_friendly_message += "📹 Video bulunamadı veya erişilemiyor.\n\n💡 Video linkini kontrol edin ve geçerli, erişilebilir bir video olduğundan emin olun."
-        else:
-            user_friendly_message += f"Teknik detay: {error}\n\n💡 Sorun devam ederse farklı bir video deneyin veya daha sonra tekrar deneyin."
-        
         return jsonify({
             "status": "error", 
-            "message": user_friendly_message,
+            **_post_error(interface_lang, error),
             "technical_error": error,
             "user_friendly": True
         }), 500
@@ -255,16 +412,64 @@ def post_comment_route():
         # Eğer comment_id yoksa, yeni kayıt ekle (direct post)
         CommentService.add_posted_comment(body.video_url, body.comment_text)
     
-    # Get interface language for success message
-    interface_lang = data.get('interface_language', 'tr')
-    
-    return jsonify({"status": "success", "message": get_message(interface_lang, 'comment_posted_success'), "data": response})
+    return jsonify({"status": "success", "message": get_message(interface_lang, 'comment_posted_success'), "message_key": "comment_posted_success", "data": response})
 
 
 @comment_routes.route('/api/history', methods=['GET'])
 def get_history_route():
-    comments = CommentService.get_all_comments()
-    return jsonify({
+    """
+    Keyset-paginated history.
+    Query: limit, cursor, posted (true/false), user_id, video (URL or ID).
+    Supports If-None-Match: unchanged history answers 304 without running the page query.
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', Config.HISTORY_PAGE_SIZE)), 1), Config.HISTORY_MAX_PAGE_SIZE)
+        user_id = int(request.args['user_id']) if request.args.get('user_id') else None
+    except ValueError:
+        return jsonify({"status": "error", "message": "limit and user_id must be integers."}), 400
+    
+    posted_arg = request.args.get('posted')
+    posted = None if posted_arg is None else posted_arg.lower() in ('1', 'true', 'yes')
+    video = request.args.get('video')
+    cursor = request.args.get('cursor')
+    
+    # ETag: sorgu parametreleri + en yeni created_at/posted_at (index lookup, tablo taraması yok)
+    try:
+        version = CommentService.get_history_version()
+    except Exception as e:
+        print(f"Database error in get_history_version: {e}")
+        version = None
+    etag = None
+    if version:
+        etag = hashlib.sha1(f"{version}|{request.query_string.decode()}".encode('utf-8')).hexdigest()
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+    
+    try:
+        comments, next_cursor = CommentService.get_comments_page(limit, cursor, posted, user_id, video)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        # Boş sayfa 200 + ETag ile dönerse istemci onu cache'ler ve sonraki yazmaya kadar 304 alır
+        print(f"Database error in get_history_route: {e}")
+        interface_lang = request.args.get('interface_language', 'tr')
+        return jsonify({
+            "status": "error",
+            "message": get_message(interface_lang, 'system_error', error=str(e)),
+            "message_key": "system_error",
+            "technical_error": str(e),
+            "user_friendly": True
+        }), 500
+    
+    response = jsonify({
         "status": "success",
-        "history": comments
-    })
\ No newline at end of file
+        "history": comments,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
+    })
+    if etag:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
\ No newline at end of file
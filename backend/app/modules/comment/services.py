@@ -1,41 +1,160 @@
 """
 Comment generation and management services
 """
+import base64
+import hashlib
+import json
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait, FIRST_COMPLETED
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import Any, Iterator, List, Dict, Optional, Tuple
 
+from flask import current_app, has_app_context
+from sqlalchemy.exc import IntegrityError
+
+from ...core.config import Config
 from ...core.database import db
-from .models import Comment
-from ...integrations.youtube.service import get_video_details, post_youtube_comment, get_video_comments, get_channel_details, get_video_transcript
-from ...integrations.gemini.service import generate_comment_text, summarize_transcript
+from ...core.metrics import REGISTRY, bind_endpoint
+from ...shared.cache import SingleFlight, get_cache
+from ...shared.quota import quota_budget
+from ...utils import chunk_transcript, estimate_tokens, extract_video_id
+from .models import Comment, VideoTranscript, TranscriptSummary
+from ...integrations.youtube.service import (
+    get_video_details, post_youtube_comment, get_video_comments, get_channel_details, get_video_transcript_segments,
+    get_videos_details_batch, get_channels_details_batch
+)
+from ...integrations.gemini.limiter import gemini_limiter
+from ...integrations.gemini.service import (
+    generate_comment_text, summarize_transcript, summarize_transcript_chunk, combine_transcript_summaries
+)
 from ...modules.user.services import get_user_id
 
 
 class CommentService:
     """Service class for comment operations"""
     
+    @staticmethod
+    def to_dict(comment: Comment) -> Dict:
+        """Serialize a comment for the history API"""
+        return {
+            "id": comment.id,
+            "text": comment.text,
+            "video_url": comment.video_url,
+            "created_at": comment.created_at.isoformat() + "Z" if comment.created_at else None,
+            "posted_at": comment.posted_at.isoformat() + "Z" if comment.posted_at else None,
+            "user_id": comment.user_id,
+            "is_posted": comment.posted_at is not None
+        }
+    
     @staticmethod
     def get_all_comments() -> List[Dict]:
         """Get all comments from all users - Public history"""
         try:
             comments = Comment.query.order_by(Comment.created_at.desc()).all()
-            return [
-                {
-                    "id": comment.id,
-                    "text": comment.text,
-                    "video_url": comment.video_url,
-                    "created_at": comment.created_at.isoformat() + "Z" if comment.created_at else None,
-                    "posted_at": comment.posted_at.isoformat() + "Z" if comment.posted_at else None,
-                    "user_id": comment.user_id,
-                    "is_posted": comment.posted_at is not None
-                }
-                for comment in comments
-            ]
+            return [CommentService.to_dict(comment) for comment in comments]
         except Exception as e:
             print(f"Database error in get_all_comments: {e}")
             return []
     
+    @staticmethod
+    def get_comments_page(limit: int, cursor: Optional[str] = None, posted: Optional[bool] = None,
+                          user_id: Optional[int] = None, video_url: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Keyset-paginated history ordered by (created_at, id) descending.
+        Returns (items, next_cursor); next_cursor is None on the last page.
+        Raises ValueError for a malformed cursor.
+        """
+        query = CommentService._history_query(posted, user_id, video_url)
+        
+        if cursor:
+            created_at, comment_id = CommentService._decode_cursor(cursor)
+            query = query.filter(db.or_(
+                Comment.created_at < created_at,
+                db.and_(Comment.created_at == created_at, Comment.id < comment_id)
+            ))
+        
+        # Bir fazla kayıt çekerek sonraki sayfanın varlığını anla
+        comments = query.order_by(Comment.created_at.desc(), Comment.id.desc()).limit(limit + 1).all()
+        has_more = len(comments) > limit
+        comments = comments[:limit]
+        
+        next_cursor = CommentService._encode_cursor(comments[-1]) if has_more else None
+        return [CommentService.to_dict(comment) for comment in comments], next_cursor
+    
+    EXPORT_COLUMNS = ('id', 'video_url', 'video_id', 'text', 'created_at', 'posted_at', 'user_id', 'is_posted')
+
+    @staticmethod
+    def iter_export_rows(since: Optional[datetime] = None, until: Optional[datetime] = None,
+                         posted: Optional[bool] = None, user_id: Optional[int] = None,
+                         chunk_size: int = 1000) -> Iterator[Dict]:
+        """
+        Stream comments oldest first for the admin export (since inclusive, until exclusive).
+        Only plain columns are selected (no ORM identity map) and yield_per fetches chunk_size
+        rows at a time - on PostgreSQL through a server-side cursor - so memory stays flat.
+        """
+        query = CommentService._history_query(posted, user_id, None).with_entities(
+            Comment.id, Comment.video_url, Comment.video_id, Comment.text,
+            Comment.created_at, Comment.posted_at, Comment.user_id
+        )
+        if since is not None:
+            query = query.filter(Comment.created_at >= since)
+        if until is not None:
+            query = query.filter(Comment.created_at < until)
+
+        # ix_comment_created_at_id sırasıyla okunur
+        for row in query.order_by(Comment.created_at, Comment.id).yield_per(chunk_size):
+            yield {
+                "id": row.id,
+                "video_url": row.video_url,
+                "video_id": row.video_id,
+                "text": row.text,
+                "created_at": row.created_at.isoformat() + "Z" if row.created_at else None,
+                "posted_at": row.posted_at.isoformat() + "Z" if row.posted_at else None,
+                "user_id": row.user_id,
+                "is_posted": row.posted_at is not None
+            }
+
+    @staticmethod
+    def get_history_version() -> str:
+        """
+        Cheap change marker for ETags: newest created_at and posted_at.
+        Both are single index lookups (min/max), not table scans.
+        """
+        latest_created, latest_posted = db.session.query(
+            db.func.max(Comment.created_at),
+            db.func.max(Comment.posted_at)
+        ).one()
+        return f"{latest_created.isoformat() if latest_created else '-'}|{latest_posted.isoformat() if latest_posted else '-'}"
+    
+    @staticmethod
+    def _history_query(posted: Optional[bool], user_id: Optional[int], video_url: Optional[str]):
+        query = Comment.query
+        if posted is True:
+            query = query.filter(Comment.posted_at.isnot(None))
+        elif posted is False:
+            query = query.filter(Comment.posted_at.is_(None))
+        if user_id is not None:
+            query = query.filter(Comment.user_id == user_id)
+        if video_url:
+            video_id = extract_video_id(video_url)
+            query = query.filter(Comment.video_id == video_id) if video_id else query.filter(Comment.video_url == video_url)
+        return query
+    
+    @staticmethod
+    def _encode_cursor(comment: Comment) -> str:
+        raw = json.dumps([comment.created_at.isoformat(), comment.id])
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            created_at, comment_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            return datetime.fromisoformat(created_at), str(comment_id)
+        except Exception:
+            raise ValueError("Invalid cursor")
+    
     @staticmethod
     def add_generated_comment(video_url: str, comment_text: str, user_id: Optional[int] = None) -> Optional[str]:
         """Add a generated comment (not yet posted)"""
@@ -52,6 +171,7 @@ class CommentService:
                 id=comment_id,
                 text=comment_text,
                 video_url=video_url,
+                video_id=extract_video_id(video_url),
                 created_at=datetime.utcnow(),
                 posted_at=None,
                 user_id=user_id
@@ -80,6 +200,7 @@ class CommentService:
                 id=comment_id,
                 text=comment_text,
                 video_url=video_url,
+                video_id=extract_video_id(video_url),
                 created_at=datetime.utcnow(),
                 posted_at=datetime.utcnow(),
                 user_id=user_id
@@ -111,16 +232,8 @@ class CommentService:
     def check_duplicate_comment(video_url: str) -> bool:
         """Check if a comment has already been posted for this video"""
         try:
-            normalized_url = CommentService._normalize_youtube_url(video_url)
-            posted_comments = Comment.query.filter(
-                Comment.posted_at.isnot(None)
-            ).all()
-            
-            for comment in posted_comments:
-                stored_normalized = CommentService._normalize_youtube_url(comment.video_url)
-                if stored_normalized == normalized_url:
-                    return True
-            return False
+            query = CommentService.posted_comments_query(video_url)
+            return bool(db.session.query(query.exists()).scalar())
         except Exception as e:
             print(f"Database error in check_duplicate_comment: {e}")
             return False
@@ -129,92 +242,565 @@ class CommentService:
     def get_video_comment_count(video_url: str) -> int:
         """Get the count of posted comments for a specific video"""
         try:
-            normalized_url = CommentService._normalize_youtube_url(video_url)
-            posted_comments = Comment.query.filter(
-                Comment.posted_at.isnot(None)
-            ).all()
-            
-            count = 0
-            for comment in posted_comments:
-                stored_normalized = CommentService._normalize_youtube_url(comment.video_url)
-                if stored_normalized == normalized_url:
-                    count += 1
-            
-            return count
+            query = CommentService.posted_comments_query(video_url)
+            return query.with_entities(db.func.count(Comment.id)).scalar() or 0
         except Exception as e:
             print(f"Database error in get_video_comment_count: {e}")
             return 0
     
+    @staticmethod
+    def posted_comments_query(video_url: str):
+        """Indexed query for posted comments of the same video (video_id, posted_at) - shared with database_service"""
+        video_id = extract_video_id(video_url)
+        query = Comment.query.filter(Comment.posted_at.isnot(None))
+        if video_id:
+            return query.filter(Comment.video_id == video_id)
+        # Video ID çıkarılamayan URL'ler için birebir URL eşleşmesi
+        return query.filter(Comment.video_id.is_(None), Comment.video_url == video_url)
+    
     @staticmethod
     def _normalize_youtube_url(url: str) -> str:
         """Normalize YouTube URLs to standard format"""
-        import re
-        
         if not url:
             return ""
         
-        # Extract video ID patterns
-        video_id_patterns = [
-            r'(?:v=|/)([0-9A-Za-z_-]{11}).*',
-            r'(?:embed/)([0-9A-Za-z_-]{11})',
-            r'(?:watch\?v=)([0-9A-Za-z_-]{11})',
-            r'(?:youtu\.be/)([0-9A-Za-z_-]{11})'
+        video_id = extract_video_id(url)
+        if video_id:
+            return f"https://www.youtube.com/watch?v={video_id}"
+        
+        return url
+
+
+class TranscriptService:
+    """Durable transcript and summary store - lookup before fetching or calling Gemini"""
+    
+    @staticmethod
+    def get_transcript(video_id: str, language: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Return {'text', 'hash', 'summary'} for the video.
+        
+        Stored transcripts are reused; the scrape only runs for unseen videos. 'summary' is
+        filled when a summary for (video_id, language, hash) already exists.
+        """
+        transcript = db.session.get(VideoTranscript, video_id)
+        if transcript is None:
+            segments, error = get_video_transcript_segments(video_id)
+            if error or not segments:
+                return None, error or "Transcript alınamadı"
+            transcript = TranscriptService._store_transcript(video_id, segments)
+        
+        stored = TranscriptSummary.query.filter_by(
+            video_id=video_id,
+            language=language,
+            transcript_hash=transcript.text_hash
+        ).first()
+        
+        return {
+            'text': transcript.text,
+            'hash': transcript.text_hash,
+            'segments': TranscriptService._load_segments(transcript),
+            'summary': stored.summary if stored else None
+        }, None
+    
+    @staticmethod
+    def summarize(video_id: str, language: str, transcript: Dict, deadline: Optional[float] = None,
+                  background: bool = False) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Summarize the transcript with Gemini and persist the result.
+        
+        Long transcripts are chunked and summarized in parallel (map), then combined into
+        one summary (reduce), so the whole video is covered instead of its first minutes.
+        The number of Gemini calls is capped by a share of the limiter's per-minute budget.
+        On the request path (background=False) a transcript that needs more calls gets a partial
+        summary of its first chunks (not stored) while a job prepares and stores the full one.
+        deadline (time.monotonic()) bounds the wait.
+        """
+        max_chunks = TranscriptService.max_chunks(background)
+        if not background and estimate_tokens(transcript['text']) > Config.TRANSCRIPT_CHUNK_TOKENS * max_chunks:
+            TranscriptService._enqueue_summary(video_id, language)
+            return TranscriptService._partial_summary(transcript, language, max_chunks, deadline)
+        
+        chunks = TranscriptService._chunk(transcript, max_chunks)
+        if len(chunks) <= 1:
+            summary, error = summarize_transcript(transcript['text'], language)
+        else:
+            summary, error = TranscriptService._map_reduce(chunks, language, deadline)
+        if error:
+            return None, summary
+        
+        try:
+            db.session.add(TranscriptSummary(
+                video_id=video_id,
+                language=language,
+                transcript_hash=transcript['hash'],
+                summary=summary
+            ))
+            db.session.commit()
+        except IntegrityError:
+            # Paralel bir istek aynı özeti zaten kaydetti
+            db.session.rollback()
+        except Exception as e:
+            print(f"Database error in TranscriptService.summarize: {e}")
+            db.session.rollback()
+        
+        return summary, None
+    
+    @staticmethod
+    def _partial_summary(transcript: Dict, language: str, max_chunks: int,
+                         deadline: Optional[float] = None) -> Tuple[Optional[str], Optional[str]]:
+        """Bütçenin izin verdiği ilk bölümlerin özeti; tek bölümlük bütçede ilk 8000 karakterin özeti"""
+        if max_chunks <= 1:
+            summary, error = summarize_transcript(transcript['text'], language)
+        else:
+            chunks = chunk_transcript(transcript.get('segments') or transcript['text'], Config.TRANSCRIPT_CHUNK_TOKENS)
+            summary, error = TranscriptService._map_reduce(chunks[:max_chunks], language, deadline)
+        # Kısmi özet saklanmaz: tam özeti job yazar
+        return (None, summary) if error else (summary, None)
+    
+    @staticmethod
+    def max_chunks(background: bool) -> int:
+        """Bir özetin yapabileceği bölüm çağrısı sayısı: limiter RPM'inin payı eksi reduce çağrısı"""
+        share = Config.TRANSCRIPT_JOB_RPM_SHARE if background else Config.TRANSCRIPT_INTERACTIVE_RPM_SHARE
+        return max(1, min(Config.TRANSCRIPT_MAX_CHUNKS, int(gemini_limiter.rpm * share) - 1))
+    
+    @staticmethod
+    def _enqueue_summary(video_id: str, language: str) -> None:
+        # jobs.services bu modülü import ettiği için burada import edilir
+        from ..jobs.services import JobService
+        try:
+            JobService.enqueue_unique('summarize_transcript', {'video_id': video_id, 'language': language})
+        except Exception as e:
+            print(f"Transcript summary job could not be queued ({video_id}): {e}")
+            db.session.rollback()
+    
+    @staticmethod
+    def _chunk(transcript: Dict, max_chunks: int) -> List[Dict]:
+        """Timestamp'li parçalar varsa onları, yoksa düz metni token bütçesine göre böler"""
+        total_tokens = estimate_tokens(transcript['text'])
+        # Bölüm sayısı max_chunks'ı aşmasın diye gerekirse bölümler büyütülür
+        max_tokens = max(Config.TRANSCRIPT_CHUNK_TOKENS, -(-total_tokens // max_chunks))
+        return chunk_transcript(transcript.get('segments') or transcript['text'], max_tokens)
+    
+    @staticmethod
+    def _map_reduce(chunks: List[Dict], language: str, deadline: Optional[float] = None) -> Tuple[str, Optional[bool]]:
+        app = current_app._get_current_object() if has_app_context() else None
+        futures = [
+            _transcript_chunk_executor.submit(
+                _run_in_app_context, app, bind_endpoint(TranscriptService._summarize_chunk), chunk, language
+            ) for chunk in chunks
         ]
+        partials = []
+        for future in futures:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                partials.append(future.result(timeout=timeout))
+            except FutureTimeoutError:
+                partials.append(("Transcript bölümü zaman aşımına uğradı.", True))
+        if deadline is not None and time.monotonic() >= deadline:
+            # Süre doldu: başlamamış bölümler iptal edilir, reduce çağrısı yapılmaz
+            for future in futures:
+                future.cancel()
+            return "Transcript özeti zaman aşımına uğradı.", True
+        
+        # Başarısız bölümler atlanır; kapsama kısmi olsa da özet üretilir
+        chunk_summaries = [summary for summary, error in partials if not error]
+        if not chunk_summaries:
+            return "Transcript özetlenemedi.", True
+        if len(chunk_summaries) == 1:
+            return chunk_summaries[0], None
+        return combine_transcript_summaries(chunk_summaries, language)
+    
+    @staticmethod
+    def _summarize_chunk(chunk: Dict, language: str) -> Tuple[str, Optional[bool]]:
+        """Bölüm özeti içerik hash'iyle cache'lenir; aynı bölümü içeren istekler tekrar kullanır"""
+        cache = get_cache()
+        key = hashlib.sha256(f"{language}|{chunk['text']}".encode('utf-8')).hexdigest()
+        hit, summary = cache.get('transcript_chunk', key)
+        if hit:
+            return summary, None
         
-        for pattern in video_id_patterns:
-            match = re.search(pattern, url)
-            if match:
-                video_id = match.group(1)
-                return f"https://www.youtube.com/watch?v={video_id}"
+        summary, error = summarize_transcript_chunk(chunk['text'], language, chunk['start'], chunk['end'])
+        if not error:
+            cache.set('transcript_chunk', key, summary)
+        return summary, error
+    
+    @staticmethod
+    def _load_segments(transcript: VideoTranscript) -> Optional[List[Dict]]:
+        """segment_starts'tan [{'text', 'start', 'duration'}] listesini yeniden kurar"""
+        if not transcript.segment_starts:
+            return None
+        # Girdiler [offset, start, duration]; eski kayıtlarda duration yoktur
+        starts = json.loads(transcript.segment_starts)
+        bounds = [entry[0] for entry in starts[1:]] + [len(transcript.text)]
+        return [
+            {
+                'text': transcript.text[entry[0]:end].strip(),
+                'start': entry[1],
+                'duration': entry[2] if len(entry) > 2 else None
+            }
+            for entry, end in zip(starts, bounds)
+        ]
+    
+    @staticmethod
+    def _store_transcript(video_id: str, segments: List[Dict]) -> VideoTranscript:
+        # Parçalar tek metin olarak saklanır; zaman damgaları offset listesiyle korunur
+        texts, segment_starts, offset = [], [], 0
+        for segment in segments:
+            segment_starts.append([offset, segment['start'], segment.get('duration')])
+            texts.append(segment['text'])
+            offset += len(segment['text']) + 1
+        text = ' '.join(texts)
         
-        return url
+        transcript = VideoTranscript(
+            video_id=video_id,
+            text=text,
+            text_hash=hashlib.sha256(text.encode('utf-8')).hexdigest(),
+            segment_starts=json.dumps(segment_starts)
+        )
+        try:
+            db.session.add(transcript)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            transcript = db.session.get(VideoTranscript, video_id) or transcript
+        except Exception as e:
+            print(f"Database error in TranscriptService._store_transcript: {e}")
+            db.session.rollback()
+        return transcript
+
+
+# Enrichment çağrıları için tüm istekler arasında paylaşılan, sınırlı thread havuzu
+_enrichment_executor = ThreadPoolExecutor(
+    max_workers=Config.ENRICHMENT_MAX_WORKERS,
+    thread_name_prefix='enrichment'
+)
+
+# Transcript özetleri bölüm sonuçlarını (ENRICHMENT_SUMMARY_TIMEOUT'a kadar) beklediği için ayrı havuzda
+# çalışır; paylaşılan enrichment havuzunu bloklayıp yeni isteklerin detay çağrılarını sıraya sokmaz
+_summary_executor = ThreadPoolExecutor(
+    max_workers=Config.ENRICHMENT_SUMMARY_WORKERS,
+    thread_name_prefix='enrichment-summary'
+)
+
+# Transcript bölüm özetleri için ayrı havuz: enrichment havuzundan çağrıldığı için
+# aynı havuza iş göndermek kilitlenmeye yol açabilirdi; boyutu paralel Gemini çağrılarını sınırlar
+_transcript_chunk_executor = ThreadPoolExecutor(
+    max_workers=Config.TRANSCRIPT_CHUNK_CONCURRENCY,
+    thread_name_prefix='transcript-chunk'
+)
+
+
+# Aynı (video, dil, stil) için eşzamanlı generate istekleri tek pipeline çalıştırır
+_generate_flight = SingleFlight()
+
+GENERATE_REQUESTS = REGISTRY.counter(
+    'comment_generate_requests_total', 'Generate requests by how they were served', ('source',))
+
+
+def _run_in_app_context(app, fn, *args, **kwargs):
+    """SQL cache/depolama erişimi için worker thread'lerine app context taşınır"""
+    if app is None:
+        return fn(*args, **kwargs)
+    with app.app_context():
+        return fn(*args, **kwargs)
 
 
 class CommentGenerationService:
     """Service for AI comment generation"""
     
+    @staticmethod
+    def iter_video_context(video_url: str, language: str) -> Iterator[Tuple[str, Any]]:
+        """
+        Run the enrichment calls concurrently and yield (stage, result) as each one finishes.
+        
+        Branches: details -> channel, comments, transcript -> summary (transcripts and summaries
+        are read from TranscriptService before scraping or calling Gemini). Every call has its own
+        timeout, counted from when it starts running; a call still queued behind a busy pool after
+        ENRICHMENT_QUEUE_TIMEOUT is cancelled. Optional stages that fail or time out yield None
+        instead of aborting the run.
+        Stages: 'details' yields (details, error); 'channel', 'comments' and 'summary' yield
+        their value or None. If details fails, nothing else is yielded. 'channel' and 'comments'
+        are skipped (None) while the YouTube quota budget is below its optional reserve.
+        """
+        video_id = extract_video_id(video_url)
+        call_timeout = Config.ENRICHMENT_CALL_TIMEOUT
+        
+        pending = {}  # future -> (stage, timeout, queue_deadline, started)
+        app = current_app._get_current_object() if has_app_context() else None
+        
+        def submit(stage, timeout, fn, *args, executor=_enrichment_executor, **kwargs):
+            started = []  # Çağrı başladığında başlangıç zamanı eklenir
+            call = bind_endpoint(fn)
+            
+            def run():
+                started.append(time.monotonic())
+                return _run_in_app_context(app, call, *args, **kwargs)
+            
+            future = executor.submit(run)
+            pending[future] = (stage, timeout, time.monotonic() + Config.ENRICHMENT_QUEUE_TIMEOUT, started)
+        
+        def deadline(entry):
+            _, timeout, queue_deadline, started = entry
+            return started[0] + timeout if started else queue_deadline
+        
+        def summarize(transcript):
+            # Özet süresi de çağrı başladığında başlar
+            return TranscriptService.summarize(video_id, language, transcript,
+                                               deadline=time.monotonic() + Config.ENRICHMENT_SUMMARY_TIMEOUT)
+        
+        # Bütçe azaldıysa isteğe bağlı YouTube çağrıları (kanal, yorumlar) atlanır
+        optional_allowed = quota_budget.allows_optional()
+        
+        submit('details', call_timeout, get_video_details, video_url)
+        if video_id and optional_allowed:
+            submit('comments', call_timeout, get_video_comments, video_id, max_results=10)
+        else:
+            yield 'comments', None
+        if video_id:
+            submit('transcript', call_timeout, TranscriptService.get_transcript, video_id, language)
+        else:
+            yield 'summary', None
+        
+        while pending:
+            next_deadline = min(deadline(entry) for entry in pending.values())
+            done, _ = wait(list(pending), timeout=max(0.0, next_deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            
+            # Süresi dolan çağrıları kısmi sonuç olarak işaretle; kuyrukta bekleyenler iptal edilir
+            now = time.monotonic()
+            expired = []
+            for future, entry in pending.items():
+                if future in done or deadline(entry) > now:
+                    continue
+                if not entry[3] and not future.cancel():
+                    continue  # Tam şu an başladı: süresi başlangıçtan sayılır
+                expired.append(future)
+            
+            for future in list(done) + expired:
+                stage, _, _, started = pending.pop(future)
+                if future in done:
+                    try:
+                        value, error = future.result()
+                    except Exception as e:
+                        value, error = None, str(e)
+                else:
+                    reason = "timed out" if started else "was not started (pool busy)"
+                    print(f"Enrichment stage '{stage}' {reason}")
+                    value, error = None, f"{stage} zaman aşımına uğradı"
+                
+                if stage == 'details':
+                    if error or not value:
+                        yield 'details', (None, error or "Video detayları alınamadı")
+                        return
+                    yield 'details', (value, None)
+                    if value.get('channel_id') and optional_allowed:
+                        submit('channel', call_timeout, get_channel_details, value['channel_id'])
+                    else:
+                        yield 'channel', None
+                elif stage == 'transcript':
+                    if value and not error and value['summary']:
+                        # Kayıtlı özet var: Gemini çağrısı atlanır
+                        yield 'summary', value['summary']
+                    elif value and not error:
+                        submit('summary', Config.ENRICHMENT_SUMMARY_TIMEOUT, summarize, value, executor=_summary_executor)
+                    else:
+                        yield 'summary', None
+                else:
+                    yield stage, value if not error else None
+    
+    @staticmethod
+    def gather_video_context(video_url: str, language: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """Collect details, channel stats, existing comments and transcript summary concurrently"""
+        context = {
+            'details': None,
+            'existing_comments': [],
+            'transcript_summary': None
+        }
+        channel_stats = None
+        
+        for stage, result in CommentGenerationService.iter_video_context(video_url, language):
+            if stage == 'details':
+                details, error = result
+                if error:
+                    return None, error
+                context['details'] = details
+            elif stage == 'channel':
+                channel_stats = result
+            elif stage == 'comments':
+                context['existing_comments'] = result or []
+            elif stage == 'summary':
+                context['transcript_summary'] = result
+        
+        if channel_stats:
+            context['details'].update(channel_stats)
+        
+        return context, None
+    
+    @staticmethod
+    def generation_key(video_url: str, language: str, comment_style: str) -> str:
+        """Sonuç cache'i ve single-flight için anahtar (stil serbest metin olduğu için hash'lenir)"""
+        video_key = extract_video_id(video_url) or CommentService._normalize_youtube_url(video_url)
+        style_hash = hashlib.sha1(comment_style.encode('utf-8')).hexdigest()[:16]
+        return f"{video_key}:{language}:{style_hash}"
+    
+    @staticmethod
+    def generate_shared(video_url: str, language: str, comment_style: str,
+                        fresh: bool = False) -> Tuple[Optional[str], Optional[str], Optional[str], bool]:
+        """
+        Generate pipeline'ını (context + Gemini) kısa TTL'li sonuç cache'i ve single-flight ile çalıştırır.
+        Returns (comment_text, error_stage, error, reused): error_stage 'video' | 'ai' | 'system'.
+        fresh=True cache'i ve bekleyen ortak çalıştırmayı atlar (yeni bir varyasyon üretir).
+        """
+        key = CommentGenerationService.generation_key(video_url, language, comment_style)
+        
+        if fresh:
+            GENERATE_REQUESTS.inc(source='fresh')
+            return CommentGenerationService._run_generation(key, video_url, language, comment_style) + (False,)
+        
+        hit, comment_text = get_cache().get('generated_comment', key)
+        if hit:
+            GENERATE_REQUESTS.inc(source='cache')
+            return comment_text, None, None, True
+        
+        result, shared = _generate_flight.do(
+            key, CommentGenerationService._run_generation, key, video_url, language, comment_style
+        )
+        GENERATE_REQUESTS.inc(source='coalesced' if shared else 'pipeline')
+        return result + (shared,)
+    
+    @staticmethod
+    def _run_generation(key: str, video_url: str, language: str,
+                        comment_style: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        try:
+            context, error = CommentGenerationService.gather_video_context(video_url, language)
+        except Exception as e:
+            return None, 'system', str(e)
+        if error:
+            return None, 'video', error
+        
+        comment_text, error = generate_comment_text(
+            context['details'], comment_style, language,
+            context['existing_comments'], context['transcript_summary']
+        )
+        if error:
+            # generate_comment_text hata durumunda mesajı text olarak, error'ı True olarak döndürür
+            return None, 'ai', error if isinstance(error, str) else comment_text
+        
+        # Sadece başarılı sonuçlar cache'lenir
+        get_cache().set('generated_comment', key, comment_text)
+        return comment_text, None, None
+    
     @staticmethod
     def generate_comment(video_url: str, language: str, comment_style: str = 'default') -> Tuple[Optional[str], Optional[str]]:
         """Generate a comment for a YouTube video"""
         try:
-            # Get video details
-            details, error = get_video_details(video_url)
+            context, error = CommentGenerationService.gather_video_context(video_url, language)
             if error:
                 return None, error
             
-            # Get channel statistics
-            if details and details.get('channel_id'):
-                channel_stats, _ = get_channel_details(details['channel_id'])
-                if channel_stats:
-                    details.update(channel_stats)
+            # Generate comment with all data
+            comment_text, error = generate_comment_text(
+                context['details'], comment_style, language,
+                context['existing_comments'], context['transcript_summary']
+            )
+            
+            return comment_text, error
             
-            # Extract video ID and get existing comments
-            import re
-            video_id_match = re.search(r"(?<=v=)[^&#]+", video_url) or re.search(r"(?<=be/)[^&#]+", video_url)
-            video_id = video_id_match.group(0) if video_id_match else None
+        except Exception as e:
+            return None, str(e)
+    
+    @staticmethod
+    def generate_batch(video_urls: List[str], language: str, comment_style: str = 'default',
+                       include_comments: bool = True, user_id: Optional[int] = None) -> List[Dict]:
+        """
+        Generate comments for many videos in one pass.
+        
+        Video details and channel stats are fetched with multi-id list calls (50 ids per call,
+        channels de-duplicated); per-video Gemini work runs with bounded concurrency.
+        Returns one result dict per input URL, in input order, each with its own status.
+        """
+        results = [{"index": index, "video_url": url} for index, url in enumerate(video_urls)]
+        
+        # 1. Geçersiz URL'leri ve daha önce yorum gönderilmiş videoları ayıkla
+        pending = []
+        for result in results:
+            video_id = extract_video_id(result['video_url'])
+            if not video_id:
+                result.update(status="error", error="Geçersiz YouTube URL'si")
+            elif CommentService.check_duplicate_comment(result['video_url']):
+                result.update(
+                    status="warning",
+                    error="duplicate",
+                    comment_count=CommentService.get_video_comment_count(result['video_url']),
+                    can_post=False
+                )
+            else:
+                result['video_id'] = video_id
+                pending.append(result)
+        
+        if not pending:
+            return results
+        
+        # 2. Detaylar ve kanal istatistikleri toplu çağrılarla
+        details_by_id, error = get_videos_details_batch([r['video_id'] for r in pending])
+        if error:
+            for result in pending:
+                result.update(status="error", error=error)
+            return results
+        
+        # Bütçe azaldıysa isteğe bağlı çağrılar (kanal istatistikleri, mevcut yorumlar) atlanır
+        optional_allowed = quota_budget.allows_optional()
+        include_comments = include_comments and optional_allowed
+        
+        channel_ids = {d['channel_id'] for d in details_by_id.values() if d.get('channel_id')} if optional_allowed else set()
+        channels_by_id, _ = get_channels_details_batch(list(channel_ids)) if channel_ids else ({}, None)
+        channels_by_id = channels_by_id or {}
+        
+        # 3. Video başına yorumlar, özet ve Gemini üretimi sınırlı paralellikle
+        app = current_app._get_current_object() if has_app_context() else None
+        
+        def generate_one(result):
+            details = details_by_id.get(result['video_id'])
+            if not details:
+                return {"status": "error", "error": "Video bulunamadı"}
+            details = {**details, **channels_by_id.get(details.get('channel_id'), {})}
             
             existing_comments = []
-            if video_id:
-                existing_comments, _ = get_video_comments(video_id, max_results=10)
+            if include_comments:
+                existing_comments, _ = get_video_comments(result['video_id'], max_results=10)
             
-            # Get and summarize transcript
             transcript_summary = None
-            if video_id:
-                transcript_text, transcript_error = get_video_transcript(video_id)
-                if transcript_text and not transcript_error:
-                    transcript_summary, summary_error = summarize_transcript(transcript_text, language)
-                    if summary_error:
-                        transcript_summary = None
+            transcript, transcript_error = TranscriptService.get_transcript(result['video_id'], language)
+            if transcript and not transcript_error:
+                transcript_summary = transcript['summary']
+                if not transcript_summary:
+                    transcript_summary, _ = TranscriptService.summarize(result['video_id'], language, transcript)
             
-            # Generate comment with all data
             comment_text, error = generate_comment_text(
-                details, comment_style, language, existing_comments, transcript_summary
+                details, comment_style, language, existing_comments or [], transcript_summary
             )
+            if error:
+                return {"status": "error", "error": comment_text}
             
-            return comment_text, error
-            
-        except Exception as e:
-            return None, str(e)
+            comment_id = CommentService.add_generated_comment(result['video_url'], comment_text, user_id=user_id)
+            return {
+                "status": "success",
+                "generated_text": comment_text,
+                "comment_id": comment_id,
+                "can_post": True
+            }
+        
+        with ThreadPoolExecutor(max_workers=Config.BATCH_MAX_CONCURRENCY, thread_name_prefix='batch') as executor:
+            futures = {
+                executor.submit(_run_in_app_context, app, bind_endpoint(generate_one), result): result
+                for result in pending
+            }
+            for future, result in futures.items():
+                try:
+                    result.update(future.result())
+                except Exception as e:
+                    result.update(status="error", error=str(e))
+        
+        return results
     
     @staticmethod
     def post_comment(video_id: str, comment_text: str) -> Tuple[Optional[Dict], Optional[str]]:
@@ -223,4 +809,4 @@ class CommentGenerationService:
             response, error = post_youtube_comment(video_id, comment_text)
             return response, error
         except Exception as e:
-            return None, str(e)
\ No newline at end of file
+            return None, str(e)
@@ -0,0 +1 @@
+# Background job module
\ No newline at end of file
@@ -0,0 +1,64 @@
+from flask import Blueprint, request, jsonify
+from ...integrations.translation.service import get_message
+from ..comment.routes import GenerateCommentRequest, PostCommentRequest, BatchGenerateRequest
+from ..user.services import get_user_id
+from .services import JobService
+
+job_routes = Blueprint('jobs', __name__, url_prefix='/api/jobs')
+
+# Job tipi -> istek doğrulama modeli
+JOB_REQUEST_MODELS = {
+    'generate': GenerateCommentRequest,
+    'post': PostCommentRequest,
+    'generate_batch': BatchGenerateRequest
+}
+
+@job_routes.route('', methods=['POST'])
+def enqueue_job():
+    """Generate/post işini kuyruğa ekler ve hemen job id döndürür."""
+    data = request.get_json(silent=True)
+    interface_lang = data.get('interface_language', 'tr') if isinstance(data, dict) else 'tr'
+    if not data:
+        return jsonify({
+            "status": "error", 
+            "message": get_message(interface_lang, 'no_data_sent'),
+            "message_key": "no_data_sent",
+            "user_friendly": True
+        }), 400
+    
+    kind = data.get('type', 'generate')
+    request_model = JOB_REQUEST_MODELS.get(kind)
+    if request_model is None:
+        return jsonify({
+            "status": "error",
+            "message": f"Invalid job type. Must be one of: {', '.join(JOB_REQUEST_MODELS)}"
+        }), 400
+    
+    try:
+        body = request_model(**{k: v for k, v in data.items() if k != 'type' and v is not None})
+    except Exception as validation_error:
+        return jsonify({
+            "status": "error", 
+            "message": get_message(interface_lang, 'form_validation_error', error=str(validation_error)),
+            "message_key": "form_validation_error",
+            "technical_error": str(validation_error),
+            "user_friendly": True
+        }), 400
+    
+    payload = body.model_dump(exclude={'interface_language'})
+    payload['user_id'] = get_user_id()
+    job_id = JobService.enqueue(kind, payload)
+    
+    return jsonify({
+        "status": "queued",
+        "job_id": job_id,
+        "status_url": f"/api/jobs/{job_id}"
+    }), 202
+
+@job_routes.route('/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Job durumunu ve (bittiyse) sonucunu döndürür."""
+    job = JobService.get_job(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Job not found."}), 404
+    return jsonify({"status": "success", "job": job})
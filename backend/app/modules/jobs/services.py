@@ -0,0 +1,277 @@
+"""
+Background job services - the Job table doubles as the broker
+"""
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from flask import current_app
+
+from ...core.config import Config
+from ...core.database import db
+from ...core.metrics import set_endpoint
+from ...utils import extract_video_id
+from ..comment.services import CommentService, CommentGenerationService, TranscriptService
+from .models import Job
+
+
+class JobService:
+    """Enqueue, claim and run generate/post jobs off the request path"""
+
+    # summarize_transcript sadece içeriden (TranscriptService) kuyruğa eklenir
+    KINDS = ('generate', 'post', 'generate_batch', 'summarize_transcript')
+
+    @staticmethod
+    def enqueue(kind: str, payload: Dict) -> str:
+        """Create a queued job and return its id"""
+        if kind not in JobService.KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job = Job(
+            id=str(uuid.uuid4()),
+            kind=kind,
+            status='queued',
+            payload=json.dumps(payload, ensure_ascii=False),
+            created_at=datetime.utcnow()
+        )
+        db.session.add(job)
+        db.session.commit()
+        return job.id
+
+    @staticmethod
+    def enqueue_unique(kind: str, payload: Dict) -> str:
+        """Aynı tür ve payload ile bekleyen/çalışan bir job varsa onun id'sini, yoksa yeni job id'sini döndürür"""
+        existing = Job.query.filter(
+            Job.kind == kind,
+            Job.payload == json.dumps(payload, ensure_ascii=False),
+            Job.status.in_(('queued', 'running'))
+        ).first()
+        if existing is not None:
+            return existing.id
+        return JobService.enqueue(kind, payload)
+
+    @staticmethod
+    def get_job(job_id: str) -> Optional[Dict]:
+        job = db.session.get(Job, job_id)
+        return JobService.to_dict(job) if job else None
+
+    @staticmethod
+    def to_dict(job: Job) -> Dict:
+        return {
+            "id": job.id,
+            "kind": job.kind,
+            "status": job.status,
+            "result": json.loads(job.result) if job.result else None,
+            "error": job.error,
+            "attempts": job.attempts,
+            "created_at": job.created_at.isoformat() + "Z" if job.created_at else None,
+            "started_at": job.started_at.isoformat() + "Z" if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() + "Z" if job.finished_at else None
+        }
+
+    @staticmethod
+    def claim_next() -> Optional[Job]:
+        """
+        Atomically claim the oldest runnable job.
+        Running jobs whose heartbeat is older than JOB_STALE_AFTER (crashed worker) are reclaimed;
+        stale jobs that used all attempts, and stale 'post' jobs, are marked 'failed' instead.
+        The conditional UPDATE makes the claim safe across worker processes.
+        """
+        stale_before = datetime.utcnow() - timedelta(seconds=Config.JOB_STALE_AFTER)
+        JobService._fail_lost(stale_before)
+        runnable = db.or_(
+            Job.status == 'queued',
+            db.and_(JobService._stale(stale_before), Job.kind != 'post')
+        )
+
+        while True:
+            candidate = (
+                Job.query.filter(runnable, Job.attempts < Config.JOB_MAX_ATTEMPTS)
+                .order_by(Job.created_at.asc())
+                .first()
+            )
+            if candidate is None:
+                db.session.rollback()
+                return None
+
+            now = datetime.utcnow()
+            claimed = Job.query.filter(Job.id == candidate.id, runnable).update({
+                Job.status: 'running',
+                Job.started_at: now,
+                Job.heartbeat_at: now,
+                Job.attempts: Job.attempts + 1
+            }, synchronize_session=False)
+            db.session.commit()
+
+            if claimed:
+                db.session.refresh(candidate)
+                return candidate
+            # Başka bir worker aldı; sıradakini dene
+
+    @staticmethod
+    def _stale(stale_before: datetime):
+        """Heartbeat'i kesilmiş 'running' işler (heartbeat_at'ı olmayan eski kayıtlarda started_at)"""
+        return db.and_(
+            Job.status == 'running',
+            db.func.coalesce(Job.heartbeat_at, Job.started_at) < stale_before
+        )
+
+    @staticmethod
+    def _fail_lost(stale_before: datetime) -> int:
+        """
+        Worker'ı çökmüş ve yeniden çalıştırılmayacak işleri kapatır: deneme hakkı bitenler ve
+        'post' işleri (commentThreads.insert idempotent değil; insert'ten sonra çöken bir worker'ın
+        işi tekrar çalıştırılırsa aynı yorum YouTube'a ikinci kez gönderilir).
+        """
+        failed = Job.query.filter(
+            JobService._stale(stale_before),
+            db.or_(Job.attempts >= Config.JOB_MAX_ATTEMPTS, Job.kind == 'post')
+        ).update({
+            Job.status: 'failed',
+            Job.error: 'worker lost',
+            Job.finished_at: datetime.utcnow()
+        }, synchronize_session=False)
+        db.session.commit()
+        if failed:
+            print(f"{failed} stale job(s) marked as failed: worker lost")
+        return failed
+
+    @staticmethod
+    def _start_heartbeat(job: Job) -> threading.Event:
+        """İş çalıştığı sürece heartbeat_at'ı günceller; döndürülen event set edilince durur"""
+        stop = threading.Event()
+        app = current_app._get_current_object()
+        job_id, attempt = job.id, job.attempts
+
+        def beat():
+            # Ayrı app context = ayrı session; handler'ın transaction'ına dokunulmaz
+            with app.app_context():
+                while not stop.wait(Config.JOB_HEARTBEAT_INTERVAL):
+                    try:
+                        Job.query.filter(
+                            Job.id == job_id, Job.status == 'running', Job.attempts == attempt
+                        ).update({Job.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+                        db.session.commit()
+                    except Exception as e:
+                        db.session.rollback()
+                        print(f"Job {job_id} heartbeat failed: {e}")
+
+        threading.Thread(target=beat, name=f'job-heartbeat-{job_id[:8]}', daemon=True).start()
+        return stop
+
+    @staticmethod
+    def run_job(job: Job) -> None:
+        """Execute a claimed job and store its result or error"""
+        handlers = {
+            'generate': JobService._run_generate,
+            'post': JobService._run_post,
+            'generate_batch': JobService._run_generate_batch,
+            'summarize_transcript': JobService._run_summarize_transcript
+        }
+        # Worker'daki harici çağrılar job türüyle etiketlenir
+        set_endpoint(f"job:{job.kind}")
+        heartbeat = JobService._start_heartbeat(job)
+        try:
+            result, error = handlers[job.kind](json.loads(job.payload))
+        except Exception as e:
+            db.session.rollback()
+            result, error = None, str(e)
+        finally:
+            heartbeat.set()
+
+        job.status = 'failed' if error else 'succeeded'
+        job.result = json.dumps(result, ensure_ascii=False) if result is not None else None
+        job.error = error
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+
+    @staticmethod
+    def run_worker(poll_interval: float = None, stop=None) -> None:
+        """Worker döngüsü - stop() True dönene kadar işleri sırayla çalıştırır"""
+        poll_interval = poll_interval or Config.JOB_POLL_INTERVAL
+        while not (stop and stop()):
+            job = JobService.claim_next()
+            if job is None:
+                time.sleep(poll_interval)
+                continue
+            print(f"Job {job.id} ({job.kind}) started")
+            JobService.run_job(job)
+            print(f"Job {job.id} finished: {job.status}")
+
+    # --- JOB HANDLER'LARI ---
+    @staticmethod
+    def _run_generate(payload: Dict):
+        video_url = payload['video_url']
+
+        # Duplicate kontrolü (generate route ile aynı sözleşme)
+        if CommentService.check_duplicate_comment(video_url):
+            return {
+                "status": "warning",
+                "comment_count": CommentService.get_video_comment_count(video_url),
+                "can_generate": True,
+                "can_post": False
+            }, None
+
+        comment_text, error = CommentGenerationService.generate_comment(
+            video_url, payload['language'], payload.get('comment_style', 'default')
+        )
+        if error or not comment_text:
+            return None, error or "Yorum üretilemedi"
+
+        comment_id = CommentService.add_generated_comment(video_url, comment_text, user_id=payload.get('user_id'))
+        return {
+            "status": "success",
+            "generated_text": comment_text,
+            "comment_id": comment_id,
+            "can_post": True
+        }, None
+
+    @staticmethod
+    def _run_post(payload: Dict):
+        video_url = payload['video_url']
+
+        if CommentService.check_duplicate_comment(video_url):
+            return None, f"duplicate: {CommentService.get_video_comment_count(video_url)} comments already posted"
+
+        video_id = extract_video_id(video_url)
+        if not video_id:
+            return None, "Geçersiz YouTube URL'si"
+
+        response, error = CommentGenerationService.post_comment(video_id, payload['comment_text'])
+        if error:
+            return None, error
+
+        if payload.get('comment_id'):
+            CommentService.mark_comment_as_posted(payload['comment_id'])
+        else:
+            CommentService.add_posted_comment(video_url, payload['comment_text'], user_id=payload.get('user_id'))
+        return {"status": "success", "data": response}, None
+
+    @staticmethod
+    def _run_generate_batch(payload: Dict):
+        results = CommentGenerationService.generate_batch(
+            payload['video_urls'],
+            payload['language'],
+            payload.get('comment_style', 'default'),
+            include_comments=payload.get('include_comments', True),
+            user_id=payload.get('user_id')
+        )
+        return {"status": "success", "results": results}, None
+
+    @staticmethod
+    def _run_summarize_transcript(payload: Dict):
+        """İstek yolunda özetlenemeyecek kadar uzun transcript'ler; sonuç TranscriptSummary'ye yazılır"""
+        video_id, language = payload['video_id'], payload['language']
+        transcript, error = TranscriptService.get_transcript(video_id, language)
+        if error:
+            return None, error
+        if transcript['summary']:
+            return {"status": "success", "summary": transcript['summary']}, None
+
+        summary, error = TranscriptService.summarize(video_id, language, transcript, background=True)
+        if error:
+            return None, error
+        return {"status": "success", "summary": summary}, None
@@ -1,5 +1,7 @@
-from flask import Blueprint, jsonify
-from ..ads.models import Ad
+from flask import Blueprint, Response, jsonify, request
+from ...core.config import Config
+from ..ads.services import active_ads_snapshot
+from ...integrations.translation.service import get_bundle
 
 public_routes = Blueprint('public', __name__)
 
@@ -25,7 +27,7 @@ def test_env():
 def test_youtube():
     """Test YouTube API authentication."""
     try:
-        from ..services.youtube_service import get_authenticated_service
+        from ...integrations.youtube.service import get_authenticated_service
         service = get_authenticated_service()
         return jsonify({
             "status": "success",
@@ -64,18 +66,35 @@ def debug_request():
 
 @public_routes.route('/api/public/active-ads', methods=['GET'])
 def get_active_ads():
-    """Returns a list of all active ads."""
+    """
+    Returns a list of all active ads, optionally filtered by ?position=.
+    Served from an in-memory snapshot with a strong ETag so browsers and CDNs can revalidate cheaply.
+    """
     try:
-        active_ads = Ad.query.filter_by(is_active=True).all()
-        return jsonify([
-            {
-                "id": ad.id,
-                "content": ad.content,
-                "link_url": ad.link_url,
-                "position": ad.position
-            } for ad in active_ads
-        ])
+        entry = active_ads_snapshot.get(request.args.get('position') or None)
     except Exception as e:
         print(f"Error fetching active ads: {e}")
         return jsonify([]), 500
-        
\ No newline at end of file
+
+    if request.if_none_match.contains(entry['etag']):
+        response = Response(status=304)
+    else:
+        response = Response(entry['body'], mimetype='application/json')
+    response.set_etag(entry['etag'])
+    response.headers['Cache-Control'] = f"public, max-age={Config.ADS_CACHE_MAX_AGE}"
+    return response
+
+@public_routes.route('/api/public/messages/<lang>', methods=['GET'])
+def get_message_bundle(lang):
+    """
+    Returns every localized message for a language (unknown languages fall back to English).
+    The frontend fetches this once and resolves the message_key sent in API responses.
+    """
+    bundle = get_bundle(lang)
+    if request.if_none_match.contains(bundle['etag']):
+        response = Response(status=304)
+    else:
+        response = Response(bundle['body'], mimetype='application/json')
+    response.set_etag(bundle['etag'])
+    response.headers['Cache-Control'] = f"public, max-age={Config.MESSAGES_CACHE_MAX_AGE}"
+    return response
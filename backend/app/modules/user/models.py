@@ -27,7 +27,10 @@ class User(db.Model):
     
     @staticmethod
     def get_or_create_user(session_id, ip_address=None, user_agent=None):
-        """Get existing user by session_id or create new anonymous user"""
+        """
+        Get existing user by session_id or create new anonymous user.
+        last_seen is not bumped here; user services batch those updates.
+        """
         user = User.query.filter_by(session_id=session_id).first()
         if not user:
             user = User(
@@ -37,8 +40,4 @@ class User(db.Model):
             )
             db.session.add(user)
             db.session.commit()
-        else:
-            # Update last seen
-            user.last_seen = datetime.utcnow()
-            db.session.commit()
         return user
\ No newline at end of file
@@ -1,19 +1,109 @@
 # User services
-from flask import session, request
+from flask import session, request, current_app
+from sqlalchemy import update
+from sqlalchemy.orm import Session
 from .models import User
+from ...core.config import Config
 from ...core.database import db
+from ...shared.cache import MemoryCacheBackend
+from datetime import datetime, timedelta
+import atexit
+import threading
+import time
 import uuid
 
-def get_current_user():
-    """Get or create current user based on session"""
+
+class LastSeenBuffer:
+    """
+    Collects last_seen bumps in memory and writes them with one bulk UPDATE per flush.
+    Each user is written at most once per min_interval.
+    """
+
+    def __init__(self, min_interval: float, flush_interval: float):
+        self.min_interval = timedelta(seconds=min_interval)
+        self.flush_interval = flush_interval
+        self._pending = {}  # user_id -> last_seen
+        self._written = {}  # user_id -> son kuyruğa alınan last_seen
+        self._lock = threading.Lock()
+        self._app = None
+        self._thread = None
+
+    def touch(self, user_id: int) -> None:
+        now = datetime.utcnow()
+        with self._lock:
+            last = self._written.get(user_id)
+            if last is not None and now - last < self.min_interval:
+                return
+            self._pending[user_id] = now
+            self._written[user_id] = now
+
+    def start(self, app) -> None:
+        """Flush thread'ini process başına bir kez başlatır"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._app = app
+            self._thread = threading.Thread(target=self._run, name='last-seen-flusher', daemon=True)
+            self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self) -> int:
+        """Bekleyen güncellemeleri yazar, yazılan kullanıcı sayısını döndürür"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            # min_interval'dan eski kayıtlar artık throttle için gerekmiyor
+            cutoff = datetime.utcnow() - self.min_interval
+            self._written = {user_id: seen for user_id, seen in self._written.items() if seen > cutoff}
+
+        if not pending or self._app is None:
+            return 0
+
+        try:
+            with self._app.app_context(), Session(db.engine) as db_session:
+                db_session.execute(
+                    update(User),
+                    [{'id': user_id, 'last_seen': seen} for user_id, seen in pending.items()]
+                )
+                db_session.commit()
+            return len(pending)
+        except Exception as e:
+            print(f"Error flushing last_seen updates: {e}")
+            # Bir sonraki flush'ta tekrar denenmek üzere geri koy
+            with self._lock:
+                for user_id, seen in pending.items():
+                    self._pending.setdefault(user_id, seen)
+            return 0
+
+
+# Session ID -> user ID önbelleği (process içi, kısa ömürlü)
+_user_id_cache = MemoryCacheBackend(Config.USER_CACHE_MAX_ENTRIES)
+_last_seen = LastSeenBuffer(Config.LAST_SEEN_INTERVAL, Config.LAST_SEEN_FLUSH_INTERVAL)
+
+
+def _get_session_id():
     # Generate session ID if not exists
     if 'user_session_id' not in session:
         session['user_session_id'] = str(uuid.uuid4())
-    
-    session_id = session['user_session_id']
+    return session['user_session_id']
+
+
+def _remember_user(session_id, user_id):
+    _user_id_cache.set(session_id, user_id, Config.USER_CACHE_TTL)
+    _last_seen.start(current_app._get_current_object())
+    _last_seen.touch(user_id)
+
+
+def get_current_user():
+    """Get or create current user based on session"""
+    session_id = _get_session_id()
     ip_address = request.remote_addr
     user_agent = request.headers.get('User-Agent', '')
-    
+
     # Get or create user
     try:
         user = User.get_or_create_user(
@@ -21,6 +111,7 @@ def get_current_user():
             ip_address=ip_address,
             user_agent=user_agent
         )
+        _remember_user(session_id, user.id)
         return user
     except Exception as e:
         print(f"Error in get_current_user: {e}")
@@ -29,7 +120,13 @@ def get_current_user():
 
 def get_user_id():
     """Get current user ID, fallback to 1 for compatibility"""
+    # Önbellekteyse DB'ye hiç gidilmez; last_seen toplu yazılır
+    hit, user_id = _user_id_cache.get(_get_session_id())
+    if hit:
+        _last_seen.touch(user_id)
+        return user_id
+
     user = get_current_user()
     if user:
         return user.id
-    return 1  # Default fallback
\ No newline at end of file
+    return 1  # Default fallback
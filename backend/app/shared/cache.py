@@ -0,0 +1,307 @@
+"""
+TTL cache with pluggable backends (in-process LRU or SQL table on the existing db)
+and single-flight helpers that coalesce concurrent identical calls.
+"""
+import asyncio
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..core.config import Config
+from ..core.database import db
+from .models import CacheEntry
+
+
+class CacheBackend(ABC):
+    """Backend interface - get returns (hit, value)"""
+
+    @abstractmethod
+    def get(self, key: str) -> Tuple[bool, Any]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def size(self) -> int:
+        ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Process içi LRU cache; en fazla max_entries kayıt tutar"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self):
+        return len(self._entries)
+
+
+class SQLCacheBackend(CacheBackend):
+    """
+    CacheEntry tablosunu kullanan, worker'lar arasında paylaşılan cache.
+    Request session'ını etkilememek için kendi Session'ını açar; app context gerektirir.
+    """
+
+    # accessed_at her hit'te değil, en fazla bu aralıkta bir güncellenir
+    TOUCH_INTERVAL = timedelta(minutes=5)
+    # Boyut sınırı her N yazmada bir kontrol edilir
+    EVICT_EVERY = 100
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = datetime.utcnow()
+        with Session(db.engine) as session:
+            entry = session.get(CacheEntry, key)
+            if entry is None or entry.expires_at <= now:
+                return False, None
+            value = json.loads(entry.value)
+            if now - entry.accessed_at > self.TOUCH_INTERVAL:
+                entry.accessed_at = now
+                session.commit()
+            return True, value
+
+    def set(self, key, value, ttl):
+        now = datetime.utcnow()
+        with Session(db.engine) as session:
+            session.merge(CacheEntry(
+                key=key,
+                value=json.dumps(value, ensure_ascii=False),
+                expires_at=now + timedelta(seconds=ttl),
+                accessed_at=now
+            ))
+            session.commit()
+
+        with self._lock:
+            self._writes += 1
+            should_evict = self._writes % self.EVICT_EVERY == 0
+        if should_evict:
+            self._evict(now)
+
+    def _evict(self, now):
+        """Süresi dolanları siler, sonra boyut sınırını LRU sırasıyla uygular"""
+        with Session(db.engine) as session:
+            session.query(CacheEntry).filter(CacheEntry.expires_at <= now).delete(synchronize_session=False)
+            overflow = session.query(CacheEntry).count() - self.max_entries
+            if overflow > 0:
+                oldest = (
+                    session.query(CacheEntry.key)
+                    .order_by(CacheEntry.accessed_at.asc())
+                    .limit(overflow)
+                    .subquery()
+                )
+                session.query(CacheEntry).filter(CacheEntry.key.in_(db.select(oldest.c.key))).delete(synchronize_session=False)
+            session.commit()
+
+    def delete(self, key):
+        with Session(db.engine) as session:
+            session.query(CacheEntry).filter_by(key=key).delete()
+            session.commit()
+
+    def clear(self):
+        with Session(db.engine) as session:
+            session.query(CacheEntry).delete()
+            session.commit()
+
+    def size(self):
+        with Session(db.engine) as session:
+            return session.query(CacheEntry).count()
+
+
+class TTLCache:
+    """Namespace başına TTL uygulayan ve hit/miss sayaçları tutan cache katmanı"""
+
+    def __init__(self, backend: CacheBackend, ttls: Dict[str, float]):
+        self.backend = backend
+        self.ttls = ttls
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _count(self, namespace, field):
+        with self._lock:
+            stats = self._stats.setdefault(namespace, {'hits': 0, 'misses': 0, 'sets': 0, 'errors': 0})
+            stats[field] += 1
+
+    def get(self, namespace: str, key: str) -> Tuple[bool, Any]:
+        """Returns (hit, value); backend errors are treated as a miss"""
+        try:
+            hit, value = self.backend.get(f"{namespace}:{key}")
+        except Exception as e:
+            print(f"Cache get error ({namespace}): {e}")
+            self._count(namespace, 'errors')
+            hit, value = False, None
+        self._count(namespace, 'hits' if hit else 'misses')
+        return hit, value
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value using the namespace TTL unless an explicit ttl is given"""
+        if ttl is None:
+            ttl = self.ttls.get(namespace, Config.CACHE_DEFAULT_TTL)
+        try:
+            self.backend.set(f"{namespace}:{key}", value, ttl)
+            self._count(namespace, 'sets')
+        except Exception as e:
+            print(f"Cache set error ({namespace}): {e}")
+            self._count(namespace, 'errors')
+
+    def delete(self, namespace: str, key: str) -> None:
+        try:
+            self.backend.delete(f"{namespace}:{key}")
+        except Exception as e:
+            print(f"Cache delete error ({namespace}): {e}")
+
+    def stats(self) -> Dict:
+        """Hit/miss counters per namespace (this process only)"""
+        with self._lock:
+            namespaces = {name: dict(values) for name, values in self._stats.items()}
+        for values in namespaces.values():
+            lookups = values['hits'] + values['misses']
+            values['hit_rate'] = round(values['hits'] / lookups, 4) if lookups else 0.0
+
+        try:
+            size = self.backend.size()
+        except Exception:
+            size = None
+
+        return {
+            'backend': type(self.backend).__name__,
+            'max_entries': self.backend.max_entries,
+            'size': size,
+            'namespaces': namespaces
+        }
+
+
+class SingleFlight:
+    """
+    Aynı anahtarla eşzamanlı gelen çağrılardan sadece ilki fn'i çalıştırır;
+    diğerleri onun sonucunu (veya exception'ını) paylaşır. Sadece bu process içindir.
+    """
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn, *args, **kwargs) -> Tuple[Any, bool]:
+        """Returns (result, shared) - shared is True when another caller ran fn"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """SingleFlight'ın asyncio versiyonu (tek event loop içinde coroutine'leri birleştirir)"""
+
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key: str, coro_fn, *args, **kwargs) -> Tuple[Any, bool]:
+        future = self._calls.get(key)
+        if future is not None:
+            # shield: bekleyen bir istek iptal edilirse lider çalıştırma iptal olmaz
+            return await asyncio.shield(future), True
+
+        future = self._calls[key] = asyncio.ensure_future(coro_fn(*args, **kwargs))
+        try:
+            return await asyncio.shield(future), False
+        finally:
+            if future.done():
+                self._calls.pop(key, None)
+            else:
+                future.add_done_callback(lambda _: self._calls.pop(key, None))
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> TTLCache:
+    """Process genelinde tek TTLCache örneği (Config.CACHE_BACKEND ile seçilir)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                if Config.CACHE_BACKEND == 'sql':
+                    backend = SQLCacheBackend(Config.CACHE_MAX_ENTRIES)
+                else:
+                    backend = MemoryCacheBackend(Config.CACHE_MAX_ENTRIES)
+                _cache = TTLCache(backend, Config.CACHE_TTLS)
+    return _cache
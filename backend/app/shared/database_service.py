@@ -1,5 +1,5 @@
-import json
 import os
+import threading
 from datetime import datetime
 import uuid
 
@@ -7,6 +7,8 @@ import uuid
 try:
     from ..core.database import db
     from ..modules.comment.models import Comment
+    from ..modules.comment.services import CommentService
+    from ..utils import extract_video_id
     USE_SQLALCHEMY = True
 except ImportError:
     USE_SQLALCHEMY = False
@@ -18,7 +20,13 @@ try:
 except ImportError:
     USER_TRACKING = False
 
+from .json_store import CommentLog
+
 DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'database.json')
+# JSON modunda yazmalar bu append-only log'a yapılır; database.json ilk açılışta içeri aktarılır
+LOG_PATH = os.path.join(os.path.dirname(__file__), '..', 'database.jsonl')
+JSON_COMPACT_INTERVAL = float(os.environ.get('JSON_COMPACT_INTERVAL', '300'))  # Saniye, 0 = kapalı
+JSON_COMPACT_MIN_GARBAGE = float(os.environ.get('JSON_COMPACT_MIN_GARBAGE', '0.3'))  # Eski satır oranı
 
 # Production'da PostgreSQL kullan, development'da JSON
 USE_DATABASE = os.environ.get('USE_DATABASE', 'false').lower() == 'true' or os.environ.get('DATABASE_URL') is not None
@@ -28,6 +36,21 @@ print(f"  USE_SQLALCHEMY: {USE_SQLALCHEMY}")
 print(f"  USE_DATABASE: {USE_DATABASE}")
 print(f"  DATABASE_URL exists: {os.environ.get('DATABASE_URL') is not None}")
 
+_comment_log = None
+_comment_log_lock = threading.Lock()
+
+def _get_comment_log():
+    """Process başına tek CommentLog; ilk kullanımda compaction thread'ini başlatır."""
+    global _comment_log
+    if _comment_log is None:
+        # Eşzamanlı ilk istekler iki log/compactor oluşturmasın
+        with _comment_log_lock:
+            if _comment_log is None:
+                log = CommentLog(LOG_PATH, normalize_youtube_url, legacy_path=DB_PATH)
+                log.start_compactor(JSON_COMPACT_INTERVAL, JSON_COMPACT_MIN_GARBAGE)
+                _comment_log = log
+    return _comment_log
+
 def load_comments():
     """Tüm kullanıcıların yorumlarını yükler - Public history."""
     if USE_DATABASE and USE_SQLALCHEMY:
@@ -50,19 +73,29 @@ def load_comments():
             print(f"Database error in load_comments: {e}")
             return []
     else:
-        # JSON file kullan
-        if not os.path.exists(DB_PATH):
-            with open(DB_PATH, 'w', encoding='utf-8') as f:
-                json.dump({"comments": []}, f)
-            return []
-        with open(DB_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data.get('comments', [])
+        # JSON log kullan (en yeni önce)
+        return _get_comment_log().all()
+
+def iter_comments():
+    """load_comments'in lazy versiyonu: yorumları en yeni önce tek tek üretir."""
+    if USE_DATABASE and USE_SQLALCHEMY:
+        for comment in Comment.query.order_by(Comment.created_at.desc()).yield_per(500):
+            yield {
+                "id": comment.id,
+                "text": comment.text,
+                "video_url": comment.video_url,
+                "created_at": comment.created_at.isoformat() + "Z" if comment.created_at else None,
+                "posted_at": comment.posted_at.isoformat() + "Z" if comment.posted_at else None,
+                "user_id": comment.user_id,
+                "is_posted": comment.posted_at is not None
+            }
+    else:
+        # JSON log: kayıtlar mmap'ten ihtiyaç oldukça parse edilir
+        yield from _get_comment_log().iter_comments()
 
 def save_comments(comments):
-    """Verilen yorum listesini database.json dosyasına yazar."""
-    with open(DB_PATH, 'w', encoding='utf-8') as f:
-        json.dump({"comments": comments}, f, ensure_ascii=False, indent=4)
+    """Verilen yorum listesini (en yeni önce) log'un tamamı olarak yazar."""
+    _get_comment_log().replace_all(comments)
 
 def add_generated_comment(video_url, comment_text):
     """Generate edilen yorumu ekler (henüz gönderilmemiş)."""
@@ -77,6 +110,7 @@ def add_generated_comment(video_url, comment_text):
                 id=comment_id,
                 text=comment_text,
                 video_url=video_url,
+                video_id=extract_video_id(video_url),
                 created_at=datetime.utcnow(),
                 posted_at=None,
                 user_id=user_id
@@ -89,18 +123,14 @@ def add_generated_comment(video_url, comment_text):
             db.session.rollback()
             return None
     else:
-        # JSON file kullan
-        comments = load_comments()
-        new_comment = {
+        # JSON log'a tek satır ekle
+        return _get_comment_log().append({
             "id": str(uuid.uuid4()),
             "text": comment_text,
             "video_url": video_url,
             "created_at": datetime.utcnow().isoformat() + "Z",
             "posted_at": None
-        }
-        comments.insert(0, new_comment)
-        save_comments(comments)
-        return new_comment["id"]
+        })
 
 def add_posted_comment(video_url, comment_text):
     """Başarıyla gönderilmiş yorumu ekler."""
@@ -115,6 +145,7 @@ def add_posted_comment(video_url, comment_text):
                 id=comment_id,
                 text=comment_text,
                 video_url=video_url,
+                video_id=extract_video_id(video_url),
                 created_at=datetime.utcnow(),
                 posted_at=datetime.utcnow(),
                 user_id=user_id
@@ -125,17 +156,14 @@ def add_posted_comment(video_url, comment_text):
             print(f"Database error in add_posted_comment: {e}")
             db.session.rollback()
     else:
-        # JSON file kullan
-        comments = load_comments()
-        new_comment = {
+        # JSON log'a tek satır ekle
+        _get_comment_log().append({
             "id": str(uuid.uuid4()),
             "text": comment_text,
             "video_url": video_url,
             "created_at": datetime.utcnow().isoformat() + "Z",
             "posted_at": datetime.utcnow().isoformat() + "Z"
-        }
-        comments.insert(0, new_comment)
-        save_comments(comments)
+        })
 
 def mark_comment_as_posted(comment_id):
     """Mevcut bir yorumu gönderilmiş olarak işaretler."""
@@ -153,45 +181,22 @@ def mark_comment_as_posted(comment_id):
             db.session.rollback()
             return False
     else:
-        # JSON file kullan
-        comments = load_comments()
-        for comment in comments:
-            if comment.get("id") == comment_id:
-                comment["posted_at"] = datetime.utcnow().isoformat() + "Z"
-                break
-        save_comments(comments)
+        # JSON log'a sadece posted_at değişikliğini ekle
+        return _get_comment_log().update(comment_id, posted_at=datetime.utcnow().isoformat() + "Z")
 
 def check_if_url_has_posted_comment(video_url):
     """Verilen URL için daha önce gönderilmiş bir yorum olup olmadığını kontrol eder."""
     if USE_DATABASE and USE_SQLALCHEMY:
         # SQLAlchemy kullan
         try:
-            normalized_url = normalize_youtube_url(video_url)
-            posted_comments = Comment.query.filter(
-                Comment.posted_at.isnot(None)
-            ).all()
-            
-            for comment in posted_comments:
-                stored_normalized = normalize_youtube_url(comment.video_url)
-                if stored_normalized == normalized_url:
-                    return True
-            return False
+            query = CommentService.posted_comments_query(video_url)
+            return bool(db.session.query(query.exists()).scalar())
         except Exception as e:
             print(f"Database error in check_if_url_has_posted_comment: {e}")
             return False
     else:
-        # JSON file kullan
-        comments = load_comments()
-        normalized_url = normalize_youtube_url(video_url)
-        
-        for comment in comments:
-            if comment.get('posted_at'):  # Sadece gönderilmiş yorumları kontrol et
-                stored_url = comment.get('video_url', '')
-                stored_normalized = normalize_youtube_url(stored_url)
-                
-                if stored_normalized == normalized_url:
-                    return True
-        return False
+        # JSON log: normalize edilmiş URL index'i
+        return _get_comment_log().posted_count(video_url) > 0
 
 def normalize_youtube_url(url):
     """YouTube URL'lerini standart formata çevirir."""
@@ -222,31 +227,11 @@ def get_video_comment_count(video_url):
     if USE_DATABASE and USE_SQLALCHEMY:
         # SQLAlchemy kullan
         try:
-            normalized_url = normalize_youtube_url(video_url)
-            posted_comments = Comment.query.filter(
-                Comment.posted_at.isnot(None)
-            ).all()
-            
-            count = 0
-            for comment in posted_comments:
-                stored_normalized = normalize_youtube_url(comment.video_url)
-                if stored_normalized == normalized_url:
-                    count += 1
-            
-            return count
+            query = CommentService.posted_comments_query(video_url)
+            return query.with_entities(db.func.count(Comment.id)).scalar() or 0
         except Exception as e:
             print(f"Database error in get_video_comment_count: {e}")
             return 0
     else:
-        # JSON file kullan
-        comments = load_comments()
-        normalized_url = normalize_youtube_url(video_url)
-        
-        count = 0
-        for comment in comments:
-            if comment.get('posted_at'):  # Sadece gönderilmiş yorumları say
-                stored_normalized = normalize_youtube_url(comment.get('video_url', ''))
-                if stored_normalized == normalized_url:
-                    count += 1
-        
-        return count
\ No newline at end of file
+        # JSON log: normalize edilmiş URL index'i
+        return _get_comment_log().posted_count(video_url)
\ No newline at end of file
@@ -0,0 +1,275 @@
+"""
+Append-only JSONL comment log for the JSON (no database) mode of database_service.
+
+Every write appends one line - a new comment or the changed fields of an existing one - so writes are O(1).
+The log is memory-mapped; each process keeps only an offset index (id -> line spans) and a
+normalized video URL -> posted count map, both extended incrementally when the file's size/mtime
+change. Records are parsed lazily from the mapping by the read generators.
+A lock file (fcntl.flock) serializes appends and compaction across gunicorn workers; compaction
+rewrites the live records to a temp file and os.replace()s it.
+"""
+import json
+import mmap
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: sadece process içi kilit
+    fcntl = None
+
+
+class CommentLog:
+    def __init__(self, path, normalize_url, legacy_path=None, fsync=True):
+        self.path = path
+        self.lock_path = path + '.lock'
+        self.normalize_url = normalize_url
+        self.legacy_path = legacy_path
+        self.fsync = fsync
+
+        self._lock = threading.RLock()
+        self._spans = {}  # id -> (offset, length, offset, length, ...) - ekleme sırasıyla; sonraki satırlar alan günceller
+        self._posted = {}  # gönderilmiş yorum id -> normalize edilmiş URL
+        self._posted_by_video = {}  # normalize edilmiş URL -> gönderilmiş yorum sayısı
+        self._map = None  # Dosyanın okunmuş kısmını kapsayan mmap
+        self._offset = 0  # Index'lenmiş byte sayısı
+        self._stat = None  # (inode, size, mtime_ns) - değişmediyse refresh atlanır
+        self._lines = 0  # Log'daki kayıt sayısı (compaction kararı için)
+        self._compactor = None
+
+    # --- DOSYA KİLİDİ ---
+    def _flock(self, exclusive):
+        handle = open(self.lock_path, 'a+')
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        return handle
+
+    @staticmethod
+    def _unlock(handle):
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+        handle.close()
+
+    # --- INDEX ---
+    @staticmethod
+    def _parse(mapping, spans):
+        """Bir id'nin satırlarını sırayla birleştirip kaydı oluşturur"""
+        record = {}
+        for index in range(0, len(spans), 2):
+            offset, length = spans[index], spans[index + 1]
+            record.update(json.loads(mapping[offset:offset + length]))
+        return record
+
+    def _index_line(self, record, offset, length):
+        comment_id = record['id']
+        # Yeni id sona eklenir; mevcut anahtara atama sırayı korur. Tuple'lar değişmez olduğu için
+        # generator'ların aldığı görüntü sonraki eklerden etkilenmez.
+        spans = self._spans[comment_id] = self._spans.get(comment_id, ()) + (offset, length)
+        self._lines += 1
+
+        if 'posted_at' not in record:
+            return
+        previous_key = self._posted.pop(comment_id, None)
+        if previous_key is not None:
+            self._posted_by_video[previous_key] -= 1
+        if record['posted_at']:
+            video_url = record.get('video_url')
+            if video_url is None:
+                # Sadece alan güncellemesi: URL ilk satırdan okunur
+                video_url = self._parse(self._map, spans[:2]).get('video_url', '')
+            key = self.normalize_url(video_url)
+            self._posted[comment_id] = key
+            self._posted_by_video[key] = self._posted_by_video.get(key, 0) + 1
+
+    def _reset(self):
+        # Eski mmap kapatılmaz: devam eden generator'lar kendi referanslarıyla okumaya devam eder
+        self._spans = {}
+        self._posted = {}
+        self._posted_by_video = {}
+        self._map = None
+        self._offset = 0
+        self._lines = 0
+
+    def _refresh(self):
+        """Boyut/mtime değiştiyse yeni satırları index'ler; dosya compaction ile değiştiyse baştan yükler"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset()
+            self._stat = None
+            return
+        current = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if current == self._stat:
+            return
+        if self._stat is None or stat.st_ino != self._stat[0] or stat.st_size < self._offset:
+            self._reset()
+        self._stat = current
+        if stat.st_size == self._offset:
+            return
+
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mapping = self._map
+        position = self._offset
+        while True:
+            # Yarım kalmış son satır (yazım sırasında çökme) tamamlanana kadar index'lenmez
+            end = mapping.find(b'\n', position)
+            if end == -1:
+                break
+            if end > position:
+                self._index_line(json.loads(mapping[position:end]), position, end - position)
+            position = end + 1
+        self._offset = position
+
+    def _ensure_log(self):
+        """İlk kullanımda eski database.json içeriğini log'a taşır"""
+        if os.path.exists(self.path):
+            return
+        comments = []
+        if self.legacy_path and os.path.exists(self.legacy_path):
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                comments = json.load(f).get('comments', [])
+        # database.json en yeni önce tutuyordu; log kronolojik sıradadır
+        self._write_snapshot(reversed(comments))
+
+    def _write_snapshot(self, records):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    # --- OKUMA ---
+    def _read(self):
+        with self._lock:
+            handle = self._flock(exclusive=False)
+            try:
+                if self._stat is None and not os.path.exists(self.path):
+                    # Log henüz yoksa (ilk çalıştırma) oluşturmak için exclusive kilit gerekir
+                    self._unlock(handle)
+                    handle = self._flock(exclusive=True)
+                    self._ensure_log()
+                self._refresh()
+            finally:
+                self._unlock(handle)
+
+    def _snapshot(self):
+        """(mmap, id başına span listeleri) - generator'lar kilit tutmadan bu görüntü üzerinden okur"""
+        self._read()
+        with self._lock:
+            return self._map, list(self._spans.values())
+
+    def iter_comments(self, newest_first=True):
+        """Yorumları tek tek parse ederek üretir; dosyanın tamamı belleğe alınmaz"""
+        mapping, entries = self._snapshot()
+        if newest_first:
+            entries.reverse()
+        for spans in entries:
+            yield self._parse(mapping, spans)
+
+    def all(self):
+        """Tüm yorumlar, en yeni önce (database.json'daki sırayla aynı)"""
+        return list(self.iter_comments())
+
+    def get(self, comment_id):
+        self._read()
+        with self._lock:
+            spans = self._spans.get(comment_id)
+            return self._parse(self._map, spans) if spans else None
+
+    def posted_count(self, video_url):
+        self._read()
+        with self._lock:
+            return self._posted_by_video.get(self.normalize_url(video_url), 0)
+
+    def __len__(self):
+        self._read()
+        return len(self._spans)
+
+    # --- YAZMA ---
+    def _append(self, record):
+        """Tek satır ekler; kilit altında önce diğer worker'ların eklerini index'ler"""
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            handle = self._flock(exclusive=True)
+            try:
+                self._ensure_log()
+                self._refresh()
+                with open(self.path, 'r+b') as f:
+                    # Kilit bizde: index'lenmemiş kuyruk varsa yarım kalmış bir yazımdır, atılır
+                    f.truncate(self._offset)
+                    f.seek(self._offset)
+                    f.write(line)
+                    f.flush()
+                    if self.fsync:
+                        os.fsync(f.fileno())
+                # Yeni satır, diğer worker'larınki gibi mmap üzerinden index'lenir
+                self._refresh()
+            finally:
+                self._unlock(handle)
+
+    def append(self, comment):
+        self._append(comment)
+        return comment['id']
+
+    def update(self, comment_id, **fields):
+        """Kayıt varsa sadece değişen alanları ekler (okumada birleştirilir); yoksa False"""
+        self._read()
+        with self._lock:
+            if comment_id not in self._spans:
+                return False
+            self._append({'id': comment_id, **fields})
+            return True
+
+    def replace_all(self, comments):
+        """Listeyi (en yeni önce) log'un tamamı olarak yazar - eski save_comments uyumluluğu için"""
+        with self._lock:
+            handle = self._flock(exclusive=True)
+            try:
+                self._write_snapshot(reversed(comments))
+                self._stat = None
+                self._refresh()
+            finally:
+                self._unlock(handle)
+
+    # --- COMPACTION ---
+    def garbage_ratio(self):
+        with self._lock:
+            return 1 - len(self._spans) / self._lines if self._lines else 0.0
+
+    def compact(self, min_garbage_ratio=0.0):
+        """Her id'yi tek satıra indirir; True döndürürse dosya değişti"""
+        with self._lock:
+            handle = self._flock(exclusive=True)
+            try:
+                self._ensure_log()
+                self._refresh()
+                if self._lines == len(self._spans) or self.garbage_ratio() < min_garbage_ratio:
+                    return False
+                mapping = self._map
+                self._write_snapshot(self._parse(mapping, spans) for spans in list(self._spans.values()))
+                self._stat = None
+                self._refresh()
+                return True
+            finally:
+                self._unlock(handle)
+
+    def start_compactor(self, interval, min_garbage_ratio):
+        """Arka planda periyodik compaction (process başına bir daemon thread)"""
+        if self._compactor is not None or interval <= 0:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.compact(min_garbage_ratio)
+                except Exception as e:
+                    print(f"JSON log compaction failed: {e}")
+
+        self._compactor = threading.Thread(target=loop, name='json-log-compactor', daemon=True)
+        self._compactor.start()
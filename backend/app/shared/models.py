@@ -0,0 +1,17 @@
+# Shared infrastructure models
+from ..core.database import db
+from datetime import datetime
+
+class CacheEntry(db.Model):
+    """SQL cache backend satırı - value JSON olarak saklanır"""
+    key = db.Column(db.String(255), primary_key=True)
+    value = db.Column(db.Text, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    accessed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+class QuotaUsage(db.Model):
+    """YouTube Data API quota harcaması - quota günü (Pasifik saati) ve API metodu başına"""
+    day = db.Column(db.Date, primary_key=True)
+    method = db.Column(db.String(64), primary_key=True)
+    units = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
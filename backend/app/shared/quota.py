@@ -0,0 +1,196 @@
+"""
+YouTube Data API daily quota budget persisted in the QuotaUsage table
+"""
+import atexit
+import threading
+import time
+from datetime import datetime, date
+from typing import Dict
+from zoneinfo import ZoneInfo
+
+from flask import current_app, has_app_context
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.config import Config
+from ..core.database import db
+from .models import QuotaUsage
+
+# YouTube quota'sı Pasifik saatiyle gece yarısı sıfırlanır
+QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')
+
+
+class QuotaExceeded(Exception):
+    """Günlük bütçe, çağrının maliyetini karşılamadığında fırlatılır (istek gönderilmez)"""
+
+    def __init__(self, method, units, remaining):
+        super().__init__(f"YouTube API daily quota budget exhausted ({method} needs {units} units, {remaining} left)")
+        self.method = method
+        self.units = units
+        self.remaining = remaining
+
+
+def quota_day() -> date:
+    return datetime.now(QUOTA_TIMEZONE).date()
+
+
+class QuotaBudget:
+    """
+    Collects spent units per (day, method) in memory and writes them with one atomic increment per
+    row every flush_interval seconds, so YouTube calls never wait on (or hold) a second DB connection.
+    Budget checks use a per-process view of today's total that is re-read every refresh_interval
+    seconds, plus the units this process has not flushed yet.
+    """
+
+    def __init__(self, daily_budget: int, optional_reserve: int, refresh_interval: float, flush_interval: float):
+        self.daily_budget = daily_budget
+        self.optional_reserve = optional_reserve
+        self.refresh_interval = refresh_interval
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._day = None
+        self._used = 0
+        self._refreshed_at = 0.0
+        self._pending = {}  # (day, method) -> henüz yazılmamış birim
+        self._flushing = {}  # Yazılmakta olan birimler (commit'e kadar okumalarda sayılır)
+        self._app = None
+        self._thread = None
+
+    def start(self, app) -> None:
+        """Flush thread'ini process başına bir kez başlatır"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._app = app
+            self._thread = threading.Thread(target=self._run, name='quota-flusher', daemon=True)
+            self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def record(self, method: str, units: int) -> None:
+        if self._thread is None and has_app_context():
+            self.start(current_app._get_current_object())
+
+        day = quota_day()
+        with self._lock:
+            self._pending[(day, method)] = self._pending.get((day, method), 0) + units
+            if self._day == day:
+                # Bir sonraki okumaya kadar kendi harcamamızı da yansıt
+                self._used += units
+
+    def _unflushed(self, day) -> int:
+        """Bu process'in bugün için henüz commit edilmemiş birimleri (lock altında çağrılır)"""
+        return sum(units for (pending_day, _), units in self._pending.items() if pending_day == day) + \
+            sum(units for (pending_day, _), units in self._flushing.items() if pending_day == day)
+
+    def flush(self) -> int:
+        """Bekleyen birimleri yazar, yazılan satır sayısını döndürür"""
+        with self._lock:
+            if not self._pending or self._app is None:
+                return 0
+            pending, self._pending = self._pending, {}
+            self._flushing = pending
+
+        written = set()
+        try:
+            with self._app.app_context():
+                self._persist(pending, written)
+            return len(pending)
+        except Exception as e:
+            print(f"Quota usage could not be recorded: {e}")
+            # Sadece commit edilmemiş satırlar bir sonraki flush'ta tekrar denenir (yazılanlar iki kez sayılmasın)
+            with self._lock:
+                for key, units in pending.items():
+                    if key not in written:
+                        self._pending[key] = self._pending.get(key, 0) + units
+            return len(written)
+        finally:
+            with self._lock:
+                self._flushing = {}
+
+    def _persist(self, pending, written):
+        """Her (gün, method) satırı ayrı commit edilir; commit edilen anahtarlar written'a eklenir"""
+        now = datetime.utcnow()
+        with Session(db.engine) as session:
+            for (day, method), units in pending.items():
+                for _ in range(2):
+                    updated = session.query(QuotaUsage).filter_by(day=day, method=method).update(
+                        {QuotaUsage.units: QuotaUsage.units + units, QuotaUsage.updated_at: now},
+                        synchronize_session=False
+                    )
+                    if not updated:
+                        session.add(QuotaUsage(day=day, method=method, units=units, updated_at=now))
+                    try:
+                        session.commit()
+                        written.add((day, method))
+                        break
+                    except IntegrityError:
+                        # Başka bir worker günün satırını aynı anda oluşturdu; UPDATE ile tekrar dene
+                        session.rollback()
+
+    def used(self) -> int:
+        day = quota_day()
+        with self._lock:
+            if self._day == day and time.monotonic() - self._refreshed_at < self.refresh_interval:
+                return self._used
+
+        try:
+            with Session(db.engine) as session:
+                used = session.query(func.coalesce(func.sum(QuotaUsage.units), 0)).filter(QuotaUsage.day == day).scalar()
+        except Exception as e:
+            print(f"Quota usage could not be read: {e}")
+            with self._lock:
+                return self._used if self._day == day else self._unflushed(day)
+
+        with self._lock:
+            self._day = day
+            self._used = int(used) + self._unflushed(day)
+            self._refreshed_at = time.monotonic()
+            return self._used
+
+    def remaining(self) -> int:
+        return max(0, self.daily_budget - self.used())
+
+    def can_spend(self, units: int) -> bool:
+        return self.remaining() >= units
+
+    def allows_optional(self) -> bool:
+        """Kanal istatistikleri ve mevcut yorumlar gibi isteğe bağlı çağrılar yalnızca rezerv üzerindeyken yapılır"""
+        return self.remaining() > self.optional_reserve
+
+    def status(self) -> Dict:
+        self.flush()
+        day = quota_day()
+        with Session(db.engine) as session:
+            rows = session.query(QuotaUsage.method, QuotaUsage.units).filter(QuotaUsage.day == day).all()
+        by_method = {method: units for method, units in rows}
+        used = sum(by_method.values())
+
+        with self._lock:
+            self._day = day
+            self._used = used
+            self._refreshed_at = time.monotonic()
+
+        return {
+            'day': day.isoformat(),
+            'timezone': str(QUOTA_TIMEZONE),
+            'daily_budget': self.daily_budget,
+            'used': used,
+            'remaining': max(0, self.daily_budget - used),
+            'optional_reserve': self.optional_reserve,
+            'optional_enrichment_enabled': self.daily_budget - used > self.optional_reserve,
+            'by_method': by_method
+        }
+
+
+quota_budget = QuotaBudget(
+    daily_budget=Config.YOUTUBE_DAILY_QUOTA,
+    optional_reserve=Config.YOUTUBE_QUOTA_OPTIONAL_RESERVE,
+    refresh_interval=Config.YOUTUBE_QUOTA_REFRESH_INTERVAL,
+    flush_interval=Config.YOUTUBE_QUOTA_FLUSH_INTERVAL
+)
@@ -0,0 +1,94 @@
+"""
+Shared helpers used across modules and migrations
+"""
+import re
+from typing import Dict, List, Optional
+
+# Video ID pattern'leri (sıra önemli - ilk eşleşen kazanır)
+_VIDEO_ID_PATTERNS = [
+    re.compile(r'(?:v=|/)([0-9A-Za-z_-]{11}).*'),
+    re.compile(r'(?:embed/)([0-9A-Za-z_-]{11})'),
+    re.compile(r'(?:watch\?v=)([0-9A-Za-z_-]{11})'),
+    re.compile(r'(?:youtu\.be/)([0-9A-Za-z_-]{11})'),
+]
+
+
+def extract_video_id(url: Optional[str]) -> Optional[str]:
+    """Extract the 11 character YouTube video ID from any supported URL format"""
+    if not url:
+        return None
+
+    for pattern in _VIDEO_ID_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            return match.group(1)
+
+    return None
+
+
+# Cümle sonları (Latin ve CJK noktalama) - düz metin transcript'ler için bölme noktaları
+_SENTENCE_END = re.compile(r'(?<=[.!?\u3002\uff01\uff1f])\s+')
+
+# Kaba token tahmini: ~4 karakter/token
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate used for chunk budgeting (no tokenizer round-trip)"""
+    return max(1, -(-len(text) // CHARS_PER_TOKEN))
+
+
+def _text_to_segments(text: str, max_tokens: int) -> List[Dict]:
+    """Zaman damgası olmayan metni cümle sınırlarından, gerekirse kelime sınırlarından böler"""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    segments = []
+    for sentence in _SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(' ', 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            segments.append({'text': sentence[:cut], 'start': None})
+            sentence = sentence[cut:].strip()
+        if sentence:
+            segments.append({'text': sentence, 'start': None})
+    return segments
+
+
+def chunk_transcript(segments, max_tokens: int) -> List[Dict]:
+    """
+    Group transcript segments into chunks of at most ~max_tokens.
+
+    segments is either plain text or a list of {'text', 'start', 'duration'} dicts; chunks never
+    split a timestamped segment. Returns [{'text', 'start', 'end'}] with start/end in seconds
+    (None for plain text); end is the last segment's start + duration.
+    """
+    if isinstance(segments, str):
+        segments = _text_to_segments(segments, max_tokens)
+
+    chunks = []
+    current, tokens = [], 0
+    for segment in segments:
+        segment_tokens = estimate_tokens(segment['text'])
+        if current and tokens + segment_tokens > max_tokens:
+            chunks.append(current)
+            current, tokens = [], 0
+        current.append(segment)
+        tokens += segment_tokens
+    if current:
+        chunks.append(current)
+
+    return [
+        {
+            'text': ' '.join(segment['text'] for segment in chunk),
+            'start': chunk[0].get('start'),
+            'end': _segment_end(chunk[-1])
+        } for chunk in chunks
+    ]
+
+
+def _segment_end(segment: Dict) -> Optional[float]:
+    start = segment.get('start')
+    if start is None:
+        return None
+    # Süresi bilinmeyen (eski kayıtlardan gelen) parçalarda bitiş başlangıç kabul edilir
+    return start + (segment.get('duration') or 0)
@@ -0,0 +1,10 @@
+from app.asgi import create_asgi_app
+from app.core.config import Config
+
+# Async serving mode: uvicorn asgi:app --host 0.0.0.0 --port 5000
+# (generate/post/history async, diğer route'lar mount edilen Flask uygulamasından)
+app = create_asgi_app(Config)
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, port=5000)
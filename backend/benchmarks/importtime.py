@@ -0,0 +1,142 @@
+"""
+Worker boot profile: runs `python -X importtime` on a fresh interpreter that imports the app and calls
+create_app() (or the ASGI / job worker entry point), then summarizes where the boot time goes.
+
+Report:
+  - wall time of the imports and of create_app() in the child process
+  - self import time grouped by top-level package (flask, sqlalchemy, google, ...)
+  - the slowest imports by cumulative time (a package's own time plus everything it pulled in)
+
+Usage (backend klasöründen):
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --target asgi --top 30
+    python -m benchmarks.importtime --raw /tmp/importtime.txt     # ham -X importtime çıktısı
+    python -m benchmarks.importtime --max-boot-ms 1500             # aşılırsa exit code 1
+
+Modüller alt süreçte ilk kez import edildiği için ölçüm her çalıştırmada soğuk açılışı yansıtır
+(bytecode cache'i hariç: __pycache__ yoksa ilk çalıştırma derleme süresini de içerir).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    'wsgi': "from app import create_app\nfrom app.core.config import Config",
+    'asgi': "from app.asgi import create_asgi_app as create_app\nfrom app.core.config import Config",
+    'worker': "from app import create_app\nfrom app.core.config import Config\nimport app.modules.jobs.services",
+}
+
+CHILD_TEMPLATE = """
+import json, time
+started = time.perf_counter()
+{imports}
+imported = time.perf_counter()
+create_app(Config)
+created = time.perf_counter()
+print(json.dumps({{'import_ms': (imported - started) * 1000, 'create_app_ms': (created - imported) * 1000}}))
+"""
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time profile of a CommendAI worker boot")
+    parser.add_argument('--target', choices=sorted(TARGETS), default='wsgi')
+    parser.add_argument('--top', type=int, default=20, help="Listelenecek en yavaş import sayısı")
+    parser.add_argument('--database-url', help="Varsayılan: geçici SQLite dosyası")
+    parser.add_argument('--raw', help="Ham -X importtime çıktısını bu dosyaya yaz")
+    parser.add_argument('--output', help="Özeti JSON olarak bu dosyaya yaz")
+    parser.add_argument('--max-boot-ms', type=float, help="Import + create_app bu süreyi aşarsa exit code 1")
+    return parser.parse_args(argv)
+
+
+def child_environment(args):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = BACKEND_DIR + os.pathsep + env.get('PYTHONPATH', '')
+    env['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(tempfile.gettempdir(), 'commendai-importtime.db')}"
+    for name, value in {
+        'SECRET_KEY': 'importtime-secret',
+        'ADMIN_PASSWORD': 'importtime-admin',
+        'GEMINI_API_KEY': 'importtime-key',
+        'YOUTUBE_API_KEY': 'importtime-key',
+    }.items():
+        env.setdefault(name, value)
+    return env
+
+
+def parse_importtime(stderr):
+    """`import time: self [us] | cumulative | imported package` satırlarını (name, self_us, cumulative_us) olarak döndürür"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+def summarize(entries, top):
+    by_package = defaultdict(int)
+    for name, self_us, _ in entries:
+        by_package[name.split('.')[0]] += self_us
+    packages = sorted(by_package.items(), key=lambda item: item[1], reverse=True)
+    slowest = sorted(entries, key=lambda entry: entry[2], reverse=True)[:top]
+    return {
+        'total_self_ms': sum(self_us for _, self_us, _ in entries) / 1000,
+        'module_count': len(entries),
+        'packages': [{'package': name, 'self_ms': us / 1000} for name, us in packages[:top]],
+        'slowest_imports': [{'module': name, 'self_ms': s / 1000, 'cumulative_ms': c / 1000} for name, s, c in slowest],
+    }
+
+
+def print_report(target, timings, summary):
+    print(f"Target: {target}")
+    print(f"  imports      {timings['import_ms']:9.1f} ms")
+    print(f"  create_app   {timings['create_app_ms']:9.1f} ms")
+    print(f"  total        {timings['import_ms'] + timings['create_app_ms']:9.1f} ms")
+    print(f"  modules imported: {summary['module_count']} (self time {summary['total_self_ms']:.1f} ms)")
+    print()
+    print(f"{'package':<40}{'self ms':>10}")
+    for row in summary['packages']:
+        print(f"{row['package']:<40}{row['self_ms']:>10.1f}")
+    print()
+    print(f"{'module':<60}{'self ms':>10}{'cum ms':>10}")
+    for row in summary['slowest_imports']:
+        print(f"{row['module']:<60}{row['self_ms']:>10.1f}{row['cumulative_ms']:>10.1f}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    code = CHILD_TEMPLATE.format(imports=TARGETS[args.target])
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=BACKEND_DIR,
+                            env=child_environment(args), capture_output=True, text=True)
+    if args.raw:
+        with open(args.raw, 'w', encoding='utf-8') as f:
+            f.write(result.stderr)
+    if result.returncode != 0:
+        print(result.stdout)
+        print(result.stderr[-4000:], file=sys.stderr)
+        return result.returncode
+
+    # create_app print() çıktıları da stdout'a düşer; ölçüm son satırdadır
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    summary = summarize(parse_importtime(result.stderr), args.top)
+    print_report(args.target, timings, summary)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'target': args.target, 'timings': timings, **summary}, f, indent=2)
+
+    boot_ms = timings['import_ms'] + timings['create_app_ms']
+    if args.max_boot_ms is not None and boot_ms > args.max_boot_ms:
+        print(f"\nBoot time {boot_ms:.1f} ms exceeds --max-boot-ms {args.max_boot_ms:.1f}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+Deterministic local stand-ins for the YouTube Data API client, youtube-transcript-api and the Gemini model.
+
+The stubs replace only the network edge (googleapiclient request objects, transcript list, GenerativeModel),
+so the real service code - caching, quota budget, limiter, metrics, parsing - still runs during a benchmark.
+"""
+import asyncio
+import random
+import threading
+import time
+
+
+class StubProfile:
+    """Gecikme (ms) ve hata oranı ayarları; seed ile tekrarlanabilir"""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, error_code=503, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self):
+        """(delay_seconds, should_fail) - thread'ler arasında paylaşılan seed'li RNG'den"""
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+        return max(0.0, self.latency_ms + jitter) / 1000.0, fail
+
+
+class StubAPIError(Exception):
+    """google.api_core / googleapiclient hatalarını taklit eder (.code limiter retry'ları için)"""
+
+    def __init__(self, service, code):
+        super().__init__(f"{code} stub {service} error")
+        self.code = code
+
+
+# --- YOUTUBE DATA API ---
+class _StubRequest:
+    def __init__(self, profile, service, payload):
+        self.profile = profile
+        self.service = service
+        self.payload = payload
+
+    def execute(self):
+        delay, fail = self.profile.draw()
+        time.sleep(delay)
+        if fail:
+            raise StubAPIError(self.service, self.profile.error_code)
+        return self.payload()
+
+
+class _StubResource:
+    def __init__(self, profile, handlers):
+        self.profile = profile
+        self.handlers = handlers
+
+    def __getattr__(self, method):
+        handler = self.handlers[method]
+        return lambda **params: _StubRequest(self.profile, 'youtube', lambda: handler(**params))
+
+
+class StubYouTubeClient:
+    """googleapiclient `youtube` servis nesnesinin kullanılan alt kümesi (videos/channels/commentThreads)"""
+
+    def __init__(self, profile):
+        self.profile = profile
+        self._posted = 0
+        self._lock = threading.Lock()
+
+    def videos(self):
+        return _StubResource(self.profile, {'list': self._videos_list})
+
+    def channels(self):
+        return _StubResource(self.profile, {'list': self._channels_list})
+
+    def commentThreads(self):
+        return _StubResource(self.profile, {'list': self._comments_list, 'insert': self._comments_insert})
+
+    def _videos_list(self, part, id):
+        items = []
+        for video_id in id.split(','):
+            items.append({
+                'id': video_id,
+                'snippet': {
+                    'title': f"Benchmark video {video_id}",
+                    'description': "Stub description " * 20,
+                    'channelTitle': "Benchmark Channel",
+                    'channelId': f"UC{video_id}",
+                    'tags': ['benchmark', 'stub'],
+                    'categoryId': '28',
+                    'publishedAt': '2025-01-01T00:00:00Z'
+                },
+                'contentDetails': {'duration': 'PT12M30S'},
+                'statistics': {'viewCount': '12345', 'likeCount': '678', 'commentCount': '90'}
+            })
+        return {'items': items}
+
+    def _channels_list(self, part, id):
+        return {'items': [{'id': channel_id, 'statistics': {'subscriberCount': '4200'}} for channel_id in id.split(',')]}
+
+    def _comments_list(self, part, videoId, maxResults=20, order='relevance'):
+        return {'items': [
+            {'snippet': {'topLevelComment': {'snippet': {
+                'authorDisplayName': f"viewer{index}",
+                'textDisplay': f"Stub comment {index} about {videoId}"
+            }}}} for index in range(min(maxResults, 10))
+        ]}
+
+    def _comments_insert(self, part, body):
+        with self._lock:
+            self._posted += 1
+            comment_id = f"stub-comment-{self._posted}"
+        return {'id': comment_id, 'snippet': body['snippet']}
+
+
+# --- YOUTUBE TRANSCRIPT API ---
+class _StubTranscript:
+    def __init__(self, profile, segment_count):
+        self.profile = profile
+        self.segment_count = segment_count
+
+    def fetch(self):
+        delay, fail = self.profile.draw()
+        time.sleep(delay)
+        if fail:
+            raise StubAPIError('transcript', self.profile.error_code)
+        return [
+            {'text': f"Stub transcript sentence number {index}.", 'start': index * 4.0, 'duration': 4.0}
+            for index in range(self.segment_count)
+        ]
+
+
+class StubTranscriptList:
+    def __init__(self, profile, segment_count):
+        self._transcript = _StubTranscript(profile, segment_count)
+
+    def find_transcript(self, languages):
+        return self._transcript
+
+    def find_generated_transcript(self, languages):
+        return self._transcript
+
+
+# --- GEMINI ---
+class _StubUsage:
+    def __init__(self, prompt_tokens, output_tokens):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = output_tokens
+        self.total_token_count = prompt_tokens + output_tokens
+
+
+class _StubResponse:
+    def __init__(self, text, prompt_tokens):
+        self.text = text
+        self.usage_metadata = _StubUsage(prompt_tokens, len(text) // 4)
+
+
+class StubGenerativeModel:
+    """genai.GenerativeModel yerine geçer; constructor imzası gemini service'in kullandığıyla aynı"""
+
+    profile = StubProfile()
+
+    def __init__(self, model_name=None, system_instruction=None, **kwargs):
+        self.model_name = model_name
+        self._system_instruction = system_instruction
+
+    def _reply(self, prompt):
+        prefix = len(self._system_instruction or '') // 4
+        text = "Stub generated comment for benchmarking.\nNote: This comment was generated by AI."
+        return _StubResponse(text, prefix + len(prompt) // 4)
+
+    def generate_content(self, prompt, stream=False):
+        delay, fail = self.profile.draw()
+        time.sleep(delay)
+        if fail:
+            raise StubAPIError('gemini', self.profile.error_code)
+        response = self._reply(prompt)
+        return iter([response]) if stream else response
+
+    async def generate_content_async(self, prompt):
+        delay, fail = self.profile.draw()
+        await asyncio.sleep(delay)
+        if fail:
+            raise StubAPIError('gemini', self.profile.error_code)
+        return self._reply(prompt)
+
+
+def install(youtube_profile, transcript_profile, gemini_profile, transcript_segments=200):
+    """Stub'ları app modüllerine yerleştirir (create_app'ten önce veya sonra çağrılabilir)"""
+    import google.generativeai as genai
+    from youtube_transcript_api import YouTubeTranscriptApi
+
+    from app.integrations.gemini import service as gemini_service
+    from app.integrations.youtube import service as youtube_service
+
+    youtube_client = StubYouTubeClient(youtube_profile)
+    youtube_service.get_authenticated_service = lambda: youtube_client
+
+    transcript_list = StubTranscriptList(transcript_profile, transcript_segments)
+    YouTubeTranscriptApi.list_transcripts = staticmethod(lambda video_id: transcript_list)
+
+    StubGenerativeModel.profile = gemini_profile
+    genai.GenerativeModel = StubGenerativeModel
+    gemini_service.model = StubGenerativeModel(gemini_service.Config.GEMINI_MODEL)
+    gemini_service._model_loaded = True
+    gemini_service.comment_models.clear()
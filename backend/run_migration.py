@@ -30,6 +30,14 @@ def run_migration():
     
     # Run the migrations
     try:
+        # Workers AUTO_CREATE_SCHEMA=false ile açılır; eksik tablolar deploy başına burada bir kez oluşturulur
+        print("=== Creating missing tables ===")
+        from app import create_app
+        from app.core.config import Config
+        from app.core.database import create_schema
+        create_schema(create_app(Config))
+        print("✅ Schema is up to date")
+        
         print("=== Running Comment table migration ===")
         from app.migrations.add_created_at_column import migrate_database
         migrate_database()
@@ -40,6 +48,21 @@ def run_migration():
         migrate_user_table()
         print("✅ User table migration completed")
         
+        print("=== Running Comment video_id migration ===")
+        from app.migrations.add_video_id_column import migrate_video_id_column
+        migrate_video_id_column()
+        print("✅ Comment video_id migration completed")
+        
+        print("=== Running history index migration ===")
+        from app.migrations.add_history_indexes import migrate_history_indexes
+        migrate_history_indexes()
+        print("✅ History index migration completed")
+        
+        print("=== Running transcript segments migration ===")
+        from app.migrations.add_transcript_segments_column import migrate_transcript_segments_column
+        migrate_transcript_segments_column()
+        print("✅ Transcript segments migration completed")
+        
         return True
     except Exception as e:
         print(f"Migration failed: {e}")
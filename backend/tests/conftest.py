@@ -0,0 +1,18 @@
+"""
+Testler backend klasöründen çalıştırılır: python -m pytest tests
+app paketi import edilirken Config zorunlu ortam değişkenlerini ister; testler gerçek servislere gitmez.
+"""
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+for name, value in {
+    'SECRET_KEY': 'test-secret',
+    'ADMIN_PASSWORD': 'test-admin',
+    'GEMINI_API_KEY': 'test-key',
+    'YOUTUBE_API_KEY': 'test-key',
+}.items():
+    os.environ.setdefault(name, value)
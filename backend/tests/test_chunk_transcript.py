@@ -0,0 +1,44 @@
+from app.utils import CHARS_PER_TOKEN, chunk_transcript
+
+
+def _segment(start, words, duration=2.0):
+    return {'text': ' '.join(['word'] * words), 'start': start, 'duration': duration}
+
+
+def test_timestamped_segments_are_grouped_without_splitting():
+    # Her segment ~5 token; 12 token'lık bütçeye iki segment sığar
+    segments = [_segment(index * 2.0, 4, duration=1.5) for index in range(5)]
+    chunks = chunk_transcript(segments, max_tokens=12)
+
+    assert [chunk['start'] for chunk in chunks] == [0.0, 4.0, 8.0]
+    # Bitiş, son segmentin başlangıcı + süresi
+    assert [chunk['end'] for chunk in chunks] == [3.5, 7.5, 9.5]
+    assert ' '.join(chunk['text'] for chunk in chunks) == ' '.join(segment['text'] for segment in segments)
+
+
+def test_oversized_segment_becomes_its_own_chunk():
+    segments = [_segment(0.0, 2), _segment(2.0, 40), _segment(4.0, 2)]
+    chunks = chunk_transcript(segments, max_tokens=10)
+
+    assert [chunk['start'] for chunk in chunks] == [0.0, 2.0, 4.0]
+    assert chunks[1]['text'] == segments[1]['text']
+
+
+def test_segments_without_duration_end_at_their_start():
+    segments = [{'text': 'legacy segment', 'start': 7.0}]
+    assert chunk_transcript(segments, max_tokens=100) == [{'text': 'legacy segment', 'start': 7.0, 'end': 7.0}]
+
+
+def test_plain_text_is_split_on_sentences_then_words():
+    long_sentence = ' '.join(['lorem'] * 60)
+    text = f"First sentence. Second one! {long_sentence}"
+    chunks = chunk_transcript(text, max_tokens=20)
+
+    assert all(chunk['start'] is None and chunk['end'] is None for chunk in chunks)
+    assert all(len(chunk['text']) <= 20 * CHARS_PER_TOKEN for chunk in chunks)
+    assert ' '.join(chunk['text'] for chunk in chunks).split() == text.split()
+
+
+def test_empty_input_has_no_chunks():
+    assert chunk_transcript([], max_tokens=100) == []
+    assert chunk_transcript('', max_tokens=100) == []
@@ -0,0 +1,26 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.modules.comment.services import CommentService
+
+
+def test_cursor_round_trip():
+    comment = SimpleNamespace(created_at=datetime(2024, 5, 1, 12, 30, 15, 123456), id='c0ffee-1')
+    cursor = CommentService._encode_cursor(comment)
+
+    # URL'de taşınır: padding ve URL dışı karakter yok
+    assert '=' not in cursor and '+' not in cursor and '/' not in cursor
+    assert CommentService._decode_cursor(cursor) == (comment.created_at, 'c0ffee-1')
+
+
+def test_cursor_id_is_returned_as_string():
+    comment = SimpleNamespace(created_at=datetime(2024, 1, 1), id=42)
+    assert CommentService._decode_cursor(CommentService._encode_cursor(comment)) == (datetime(2024, 1, 1), '42')
+
+
+@pytest.mark.parametrize('cursor', ['', 'not-base64!', 'bm90IGpzb24', 'WyJ4Il0'])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        CommentService._decode_cursor(cursor)
@@ -0,0 +1,108 @@
+import json
+import multiprocessing
+
+import pytest
+
+from app.shared.json_store import CommentLog, fcntl
+
+
+def _open(path):
+    return CommentLog(str(path), str.lower, fsync=False)
+
+
+def _read_lines(path):
+    with open(path, 'rb') as f:
+        return [json.loads(line) for line in f.read().split(b'\n') if line]
+
+
+def _append_many(path, worker, count):
+    log = _open(path)
+    for index in range(count):
+        log.append({
+            'id': f"{worker}-{index}",
+            'video_url': 'https://youtu.be/VIDEO',
+            'text': 'x' * 200,
+            'posted_at': '2024-01-01T00:00:00Z' if index % 2 else None
+        })
+
+
+@pytest.mark.skipif(fcntl is None, reason="Process'ler arası kilit fcntl gerektirir")
+def test_append_from_multiple_processes(tmp_path):
+    path = tmp_path / 'database.jsonl'
+    workers, count = 4, 50
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=_append_many, args=(str(path), worker, count)) for worker in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+    # Her satır tam bir kayıt olmalı: araya girmiş/yarım satır yok
+    lines = _read_lines(path)
+    assert len(lines) == workers * count
+    assert {line['id'] for line in lines} == {f"{w}-{i}" for w in range(workers) for i in range(count)}
+
+    log = _open(path)
+    assert len(log) == workers * count
+    assert log.posted_count('HTTPS://YOUTU.BE/VIDEO') == workers * count // 2
+
+
+def test_torn_last_line_is_ignored_and_truncated(tmp_path):
+    path = tmp_path / 'database.jsonl'
+    log = _open(path)
+    log.append({'id': 'a', 'video_url': 'u', 'text': 'first'})
+    log.append({'id': 'b', 'video_url': 'u', 'text': 'second'})
+
+    # Yazım sırasında çöken bir process'in bıraktığı yarım satır
+    with open(path, 'ab') as f:
+        f.write(b'{"id": "c", "text": "tor')
+
+    reader = _open(path)
+    assert [comment['id'] for comment in reader.all()] == ['b', 'a']
+
+    reader.append({'id': 'd', 'video_url': 'u', 'text': 'third'})
+    assert [line['id'] for line in _read_lines(path)] == ['a', 'b', 'd']
+    assert _open(path).get('c') is None
+
+
+def test_compaction_merges_updates_into_one_line(tmp_path):
+    path = tmp_path / 'database.jsonl'
+    log = _open(path)
+    log.append({'id': 'a', 'video_url': 'https://youtu.be/V', 'text': 'hello', 'posted_at': None})
+    log.append({'id': 'b', 'video_url': 'https://youtu.be/W', 'text': 'other', 'posted_at': None})
+    assert log.update('a', posted_at='2024-01-01T00:00:00Z')
+    assert log.update('a', text='edited')
+    assert not log.update('missing', text='x')
+
+    other = _open(path)
+    assert len(other) == 2
+
+    assert log.garbage_ratio() == pytest.approx(0.5)
+    assert not log.compact(min_garbage_ratio=0.6)
+    assert log.compact(min_garbage_ratio=0.5)
+    assert not log.compact()
+
+    lines = _read_lines(path)
+    assert len(lines) == 2
+    assert {line['id'] for line in lines} == {'a', 'b'}
+
+    # Diğer process'in index'i dosya değişimini (yeni inode) fark edip baştan yüklenir
+    record = other.get('a')
+    assert record['text'] == 'edited'
+    assert record['posted_at'] == '2024-01-01T00:00:00Z'
+    assert other.posted_count('https://youtu.be/V') == 1
+    assert other.posted_count('https://youtu.be/W') == 0
+    assert [comment['id'] for comment in other.all()] == ['b', 'a']
+
+
+def test_legacy_database_json_is_imported_once(tmp_path):
+    legacy = tmp_path / 'database.json'
+    legacy.write_text(json.dumps({'comments': [
+        {'id': 'new', 'video_url': 'u', 'text': '2'},
+        {'id': 'old', 'video_url': 'u', 'text': '1'},
+    ]}), encoding='utf-8')
+
+    log = CommentLog(str(tmp_path / 'database.jsonl'), str.lower, legacy_path=str(legacy), fsync=False)
+    assert [comment['id'] for comment in log.all()] == ['new', 'old']
+    assert [line['id'] for line in _read_lines(tmp_path / 'database.jsonl')] == ['old', 'new']
@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+
+from app.shared.cache import SingleFlight
+
+
+def _run_concurrently(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls, results = [], []
+    lock = threading.Lock()
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return 'value'
+
+    def caller():
+        result = flight.do('key', work)
+        with lock:
+            results.append(result)
+
+    threads = _run_concurrently(8, caller)
+    # Lider fn içinde beklerken diğerleri aynı çağrıya bağlanır
+    while not calls:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(results, key=lambda item: item[1]) == [('value', False)] + [('value', True)] * 7
+
+
+def test_error_is_raised_for_every_waiter():
+    flight = SingleFlight()
+    release = threading.Event()
+    started = threading.Event()
+    errors = []
+
+    def work():
+        started.set()
+        release.wait(5)
+        raise RuntimeError('boom')
+
+    def caller():
+        try:
+            flight.do('key', work)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = _run_concurrently(1, caller)
+    started.wait(5)
+    followers = _run_concurrently(3, caller)
+    release.set()
+    for thread in leader + followers:
+        thread.join(5)
+
+    assert errors == ['boom'] * 4
+
+
+def test_finished_call_is_not_reused():
+    flight = SingleFlight()
+    counter = iter(range(10))
+
+    assert flight.do('key', lambda: next(counter)) == (0, False)
+    assert flight.do('key', lambda: next(counter)) == (1, False)
+    assert flight.do('other', lambda: next(counter)) == (2, False)
+
+    with pytest.raises(ValueError):
+        flight.do('key', int, 'not a number')
+    assert flight.do('key', lambda: 'recovered') == ('recovered', False)
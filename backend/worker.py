@@ -0,0 +1,24 @@
+import signal
+
+from app import create_app
+from app.core.config import Config
+from app.modules.jobs.services import JobService
+
+# Uygulama fabrikasını çağırarak uygulamayı oluştur (veritabanı ve modeller için)
+app = create_app(Config)
+
+_stopping = False
+
+def _handle_stop(signum, frame):
+    """SIGTERM/SIGINT geldiğinde mevcut işi bitirip çık."""
+    global _stopping
+    _stopping = True
+
+# Bu betik doğrudan çalıştırıldığında job worker'ını başlat
+if __name__ == '__main__':
+    signal.signal(signal.SIGTERM, _handle_stop)
+    signal.signal(signal.SIGINT, _handle_stop)
+    print("Job worker started")
+    with app.app_context():
+        JobService.run_worker(stop=lambda: _stopping)
+    print("Job worker stopped")
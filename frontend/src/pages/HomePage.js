@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import '../styles/main.css';
 import { generateComment, postCommentToYouTube, getHistory } from '../services/api';
 import CommentForm from '../components/CommentForm';
@@ -23,6 +23,7 @@ function HomePage() {
   const [statusMessage, setStatusMessage] = useState(t('statusReady'));
   const [error, setError] = useState(null);
   const [history, setHistory] = useState([]);
+  const lastGeneratedKey = useRef(null); // Ekrandaki yorumun üretildiği video + dil
   
   
   // --- LOGIC / FUNCTIONS ---
@@ -47,13 +48,16 @@ function HomePage() {
 
   const handleGenerateComment = async (e) => {
     e.preventDefault();
+    // Aynı video için tekrar basılırsa cache'lenmiş yorum yerine yeni bir varyasyon istenir
+    const requestKey = `${videoUrl}|${language}`;
+    const fresh = Boolean(generatedComment) && lastGeneratedKey.current === requestKey;
     setIsLoading(true);
     setGeneratedComment('');
     setStatusMessage(t('statusGenerating'));
     setError(null);
 
     try {
-      const response = await generateComment(videoUrl, language, currentLanguage);
+      const response = await generateComment(videoUrl, language, currentLanguage, fresh);
       
       // Response'un yapısını kontrol et - string mi object mi?
       if (typeof response === 'string') {
@@ -86,6 +90,7 @@ function HomePage() {
       if (commentText) {
         setGeneratedComment(commentText);
         setCurrentCommentId(commentId);
+        lastGeneratedKey.current = requestKey;
       }
       
       if (response.status !== 'warning') {
@@ -28,12 +28,14 @@ axios.interceptors.response.use(
 );
 
 // Yorum fonksiyonları
-export const generateComment = async (videoUrl, language, interfaceLanguage = 'tr') => {
+// fresh: aynı video için yeni bir varyasyon iste (sunucudaki kısa süreli sonuç cache'ini atlar)
+export const generateComment = async (videoUrl, language, interfaceLanguage = 'tr', fresh = false) => {
   const response = await axios.post(`${API_URL}/generate_comment`, {
     video_url: videoUrl,
     language: language,
     comment_style: 'default',
-    interface_language: interfaceLanguage
+    interface_language: interfaceLanguage,
+    fresh: fresh
   });
   return response.data; // Tüm response'u döndür (comment_id dahil)
 };